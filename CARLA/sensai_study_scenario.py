@@ -1,4 +1,8 @@
+import logging
+import os
 import random
+import time
+
 import py_trees
 import carla
 
@@ -14,6 +18,17 @@ from srunner.scenariomanager.scenarioatomics.atomic_criteria import CollisionTes
 
 from agents.navigation.local_planner import RoadOption
 
+logger = logging.getLogger(__name__)
+if not logging.getLogger().handlers:  # scenario_runner leaves logging unconfigured
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.propagate = False
+logger.setLevel(os.getenv("SENSAI_CARLA_LOG_LEVEL", "INFO").upper())
+
+# Per-tick checks log at DEBUG, at most once per vehicle per interval
+TICK_LOG_INTERVAL_SEC = 1.0
+
 FORBIDDEN_ROADS = {
     19: None,
     24: [-1],
@@ -876,9 +891,7 @@ class EgoInRadius(py_trees.behaviour.Behaviour):
         distance = ego_loc.distance(self.center)
 
         if distance <= self.radius:
-            print(
-                f"[Trigger] Ego vehicle is within range! (Distance: {distance:.2f} m)"
-            )
+            logger.info("[Trigger] Ego vehicle is within range! (Distance: %.2f m)", distance)
             return py_trees.common.Status.SUCCESS
         else:
             return py_trees.common.Status.RUNNING
@@ -894,6 +907,7 @@ class DestroyVehicleOnRoadID(py_trees.behaviour.Behaviour):
         self.forbidden_roads = FORBIDDEN_ROADS
         self.map = None
         self.destroyed = False
+        self._last_check_log = 0.0
 
     def initialise(self):
         self.world = CarlaDataProvider.get_world()
@@ -920,7 +934,11 @@ class DestroyVehicleOnRoadID(py_trees.behaviour.Behaviour):
         road_id = waypoint.road_id
         lane_id = waypoint.lane_id
 
-        print(f"[CHECK] veh={self.vehicle.id} road={road_id} lane={lane_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            now = time.monotonic()
+            if now - self._last_check_log >= TICK_LOG_INTERVAL_SEC:
+                self._last_check_log = now
+                logger.debug("[CHECK] veh=%s road=%s lane=%s", self.vehicle.id, road_id, lane_id)
 
         if road_id in self.forbidden_roads:
             forbidden_lanes = self.forbidden_roads[road_id]
@@ -934,8 +952,11 @@ class DestroyVehicleOnRoadID(py_trees.behaviour.Behaviour):
             destroy = True
 
             if destroy:
-                print(
-                    f"[DestroyVehicleOnRoadID] Vehicle {self.vehicle.id} on road_id {road_id}, lane_id {lane_id} -> destroy"
+                logger.info(
+                    "[DestroyVehicleOnRoadID] Vehicle %s on road_id %s, lane_id %s -> destroy",
+                    self.vehicle.id,
+                    road_id,
+                    lane_id,
                 )
 
             # self.vehicle.set_autopilot(False)
@@ -1,10 +1,46 @@
+from typing import Any, Dict
+
 import gradio as gr
 
-from audio_io import warm_up_models
 from data import SCENARIO_LABEL_TO_ID, SCENARIO_LOOKUP, get_scenario_text
-from handlers import handle_checkin, handle_run, save_condition
+from handlers import (
+    handle_asr_swap,
+    handle_checkin,
+    handle_profile_toggle,
+    handle_run,
+    handle_session_active,
+    handle_stream_chunk,
+    handle_stream_stop,
+    handle_turn_waterfall,
+    save_condition,
+)
 from llm_client import test_llm_connection
-from settings import DEFAULT_ENDPOINT, DEFAULT_MODEL, LANG_CHOICES
+from log_config import configure_logging
+from settings import (
+    ASR_COMPUTE_TYPE,
+    ASR_MODEL_SIZE,
+    ASR_STREAMING,
+    DEFAULT_ENDPOINT,
+    DEFAULT_MODEL,
+    EVENT_CONCURRENCY,
+    LANG_CHOICES,
+    METRICS,
+    QUEUE_MAX_SIZE,
+    SERVER_NAME,
+    SERVER_PORT,
+    TTS_WORKERS,
+    WARMUP_GATE,
+    WARMUP_ON_START,
+)
+from metrics import serve_with_metrics
+from model_governor import get_governor
+from results_writer import get_results_writer
+from session_journal import start_journal
+from thread_budget import pin_app_process
+from warmup import get_warmup, warm_up_models
+
+WHISPER_SIZES = ["tiny", "tiny.en", "base", "base.en", "small", "small.en", "medium", "medium.en", "large-v3"]
+WHISPER_COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
 
 CUSTOM_CSS = """
 /* Subtle condition coloring for response boxes */
@@ -53,6 +89,8 @@ TRANSLATIONS = {
         "bsss": ["Erfahrungs-Suche", "Thrill & Adventure", "Enthemmung", "Langeweile-Anfälligkeit"],
         "erq": ["Cognitive Reappraisal", "Expressive Suppression"],
         "audio_label": "Mikrofon (Push-to-talk)",
+        "stream_label": "Mikrofon (Streaming, Live-Transkript)",
+        "auto_submit": "Bei Sprechende automatisch senden",
         "run_button": "Antwort(en) generieren",
         "transcript_label": "Fahrer-Transkript",
         "persona_label": "Persona-Zusammenfassung",
@@ -74,6 +112,12 @@ TRANSLATIONS = {
         "save2": "Condition 2 speichern",
         "save1_status": "Speicherstatus (Condition 1)",
         "save2_status": "Speicherstatus (Condition 2)",
+        "asr_pool": "Whisper-Modelle (Operator)",
+        "asr_swap_lang": "Sprache",
+        "asr_swap_size": "Whisper-Modell",
+        "asr_swap_compute": "Compute-Typ",
+        "asr_swap_button": "Modell wechseln",
+        "asr_pool_status": "Whisper-Modellstatus",
     },
     "en": {
         "participant_id": "Participant ID",
@@ -95,6 +139,8 @@ TRANSLATIONS = {
         "bsss": ["Experience Seeking", "Thrill & Adventure", "Disinhibition", "Boredom Susceptibility"],
         "erq": ["Cognitive Reappraisal", "Expressive Suppression"],
         "audio_label": "Microphone (push to talk)",
+        "stream_label": "Microphone (streaming, live transcript)",
+        "auto_submit": "Auto-submit when speech ends",
         "run_button": "Generate response(s)",
         "transcript_label": "Driver transcript",
         "persona_label": "Persona summary",
@@ -116,10 +162,21 @@ TRANSLATIONS = {
         "save2": "Save Condition 2",
         "save1_status": "Save status (Condition 1)",
         "save2_status": "Save status (Condition 2)",
+        "asr_pool": "Whisper models (operator)",
+        "asr_swap_lang": "Language",
+        "asr_swap_size": "Whisper model",
+        "asr_swap_compute": "Compute type",
+        "asr_swap_button": "Swap model",
+        "asr_pool_status": "Whisper model status",
     },
 }
 
 
+def _limit(event: str) -> Dict[str, Any]:
+    """Queue options for an event type: one worker pool per type, shared by all of its triggers."""
+    return {"concurrency_limit": EVENT_CONCURRENCY.get(event, 1), "concurrency_id": event}
+
+
 def build_interface():
     scenario_choices = [(f"{s['title']} ({s['id']})", s["id"]) for s in SCENARIO_LOOKUP.values()]
     scenario_label_map = {label: sid for label, sid in scenario_choices}
@@ -148,6 +205,17 @@ def build_interface():
                 interactive=False,
             )
             warmup_btn = gr.Button("Warmup starten", variant="secondary")
+        with gr.Accordion(tr["asr_pool"], open=False) as asr_pool_box:
+            with gr.Row():
+                asr_swap_lang = gr.Radio(LANG_CHOICES, value=default_lang, label=tr["asr_swap_lang"])
+                asr_swap_size = gr.Dropdown(
+                    WHISPER_SIZES, value=ASR_MODEL_SIZE, label=tr["asr_swap_size"], allow_custom_value=True
+                )
+                asr_swap_compute = gr.Dropdown(
+                    WHISPER_COMPUTE_TYPES, value=ASR_COMPUTE_TYPE, label=tr["asr_swap_compute"]
+                )
+                asr_swap_btn = gr.Button(tr["asr_swap_button"], variant="secondary")
+            asr_pool_status = gr.Textbox(label=tr["asr_pool_status"], interactive=False)
 
         with gr.Tab("Experiment"):
             with gr.Row():
@@ -202,7 +270,7 @@ def build_interface():
 
             gr.Markdown("### Gesprächseinstieg (Check-in)")
             with gr.Row():
-                checkin_button = gr.Button(tr["checkin_button"], variant="secondary")
+                checkin_button = gr.Button(tr["checkin_button"], variant="secondary", interactive=not WARMUP_GATE)
                 checkin_status = gr.Textbox(label=tr["checkin_text"], lines=2)
                 checkin_audio = gr.Audio(label=tr["checkin_audio"], type="filepath")
             checkin_prompt_box = gr.Textbox(label=tr["checkin_prompt"], lines=3)
@@ -215,13 +283,26 @@ def build_interface():
                     label=tr["audio_label"],
                     format="wav",
                 )
+                audio_stream = gr.Audio(
+                    sources=["microphone"],
+                    streaming=True,
+                    label=tr["stream_label"],
+                    visible=ASR_STREAMING,
+                )
                 manual_text = gr.Textbox(
                     label=tr["text_input"],
                     lines=4,
                     placeholder=tr["text_placeholder"],
                 )
 
-            run_button = gr.Button(tr["run_button"], variant="primary")
+            auto_submit = gr.Checkbox(
+                label=tr["auto_submit"], value=False, visible=ASR_STREAMING, interactive=not WARMUP_GATE
+            )
+            stream_state = gr.State(None)
+            stream_result = gr.State(None)  # last streamed utterance + detected language, cleared by the run
+            stream_trigger = gr.Textbox(visible=False)
+
+            run_button = gr.Button(tr["run_button"], variant="primary", interactive=not WARMUP_GATE)
 
             transcript_box = gr.Textbox(label=tr["transcript_label"], lines=3)
             persona_box = gr.Textbox(label=tr["persona_label"], lines=3)
@@ -239,58 +320,91 @@ def build_interface():
             cond1_prompt_box = gr.Textbox(label=tr["prompt1"], lines=6)
             cond2_prompt_box = gr.Textbox(label=tr["prompt2"], lines=6)
 
+            gr.Markdown("### Debug: Stage Timings")
+            stage_waterfall = gr.HTML()
+            with gr.Row():
+                profile_toggle = gr.Checkbox(label="Profile my turns (CPU + allocations)", value=False)
+                profile_status = gr.Markdown()
+            profile_toggle.change(handle_profile_toggle, inputs=[profile_toggle], outputs=profile_status, queue=False)
+
             state = gr.State({})
 
-            run_button.click(
-                lambda: gr.update(interactive=False),
-                inputs=None,
-                outputs=run_button,
-                queue=False,
-            ).then(
-                handle_run,
-                inputs=[
-                    participant_id,
-                    scenario_dropdown,
-                    o,
-                    c,
-                    e_slider,
-                    a_slider,
-                    n_slider,
-                    dbq_violations,
-                    dbq_errors,
-                    dbq_lapses,
-                    bsss_experience,
-                    bsss_thrill,
-                    bsss_disinhibition,
-                    bsss_boredom,
-                    erq_reappraisal,
-                    erq_suppression,
-                    run_mode,
-                    language,
-                    endpoint_url,
-                    model_name,
-                    audio_in,
-                    manual_text,
-                    state,
-                ],
-                outputs=[
-                    transcript_box,
-                    persona_box,
-                    cond1_text,
-                    cond1_audio,
-                    cond2_text,
-                    cond2_audio,
-                    cond1_prompt_box,
-                    cond2_prompt_box,
-                    cond1_chat,
-                    cond2_chat,
-                    state,
-                ],
-            ).then(
-                lambda: gr.update(interactive=True),
-                inputs=None,
-                outputs=run_button,
-                queue=False,
+            run_inputs = [
+                participant_id,
+                scenario_dropdown,
+                o,
+                c,
+                e_slider,
+                a_slider,
+                n_slider,
+                dbq_violations,
+                dbq_errors,
+                dbq_lapses,
+                bsss_experience,
+                bsss_thrill,
+                bsss_disinhibition,
+                bsss_boredom,
+                erq_reappraisal,
+                erq_suppression,
+                run_mode,
+                language,
+                endpoint_url,
+                model_name,
+                audio_in,
+                manual_text,
+                state,
+                stream_result,
+            ]
+            run_outputs = [
+                transcript_box,
+                persona_box,
+                cond1_text,
+                cond1_audio,
+                cond2_text,
+                cond2_audio,
+                cond1_prompt_box,
+                cond2_prompt_box,
+                cond1_chat,
+                cond2_chat,
+                state,
+                stream_result,
+            ]
+
+            for trigger, api_name in ((run_button.click, "run_turn"), (stream_trigger.change, False)):
+                trigger(
+                    lambda: gr.update(interactive=False),
+                    inputs=None,
+                    outputs=run_button,
+                    queue=False,
+                ).then(
+                    handle_run,
+                    inputs=run_inputs,
+                    outputs=run_outputs,
+                    api_name=api_name,
+                    **_limit("run"),
+                ).then(
+                    handle_turn_waterfall,
+                    inputs=[state],
+                    outputs=stage_waterfall,
+                    queue=False,
+                ).then(
+                    lambda: gr.update(interactive=True),
+                    inputs=None,
+                    outputs=run_button,
+                    queue=False,
+                )
+
+            audio_stream.stream(
+                handle_stream_chunk,
+                inputs=[audio_stream, stream_state, language, auto_submit],
+                outputs=[transcript_box, stream_result, stream_state, stream_trigger],
+                **_limit("stream"),
+            )
+            audio_stream.stop_recording(
+                handle_stream_stop,
+                inputs=[stream_state, auto_submit],
+                outputs=[transcript_box, stream_result, stream_state, stream_trigger],
+                **_limit("stream"),
             )
 
             save1 = gr.Button(tr["save1"])
@@ -302,11 +416,13 @@ def build_interface():
                 lambda st: save_condition("condition1", st),
                 inputs=[state],
                 outputs=save1_status,
+                **_limit("save"),
             )
             save2.click(
                 lambda st: save_condition("condition2", st),
                 inputs=[state],
                 outputs=save2_status,
+                **_limit("save"),
             )
 
             checkin_button.click(
@@ -338,7 +454,9 @@ def build_interface():
                     endpoint_url,
                     model_name,
                 ],
-                outputs=[checkin_status, checkin_audio, checkin_prompt_box],
+                outputs=[checkin_status, checkin_audio, checkin_prompt_box, stage_waterfall],
+                api_name="checkin",
+                **_limit("checkin"),
             ).then(
                 lambda: gr.update(interactive=True),
                 inputs=None,
@@ -351,10 +469,49 @@ def build_interface():
             inputs=[endpoint_url, model_name],
             outputs=llm_status,
         )
+        # Run buttons stay locked until every warmup stage has finished; the page polls the warmup state.
+        # A failed stage unlocks them too: turns degrade (e.g. text only without XTTS) and the box shows the failure.
+        warmup_settled = gr.State(False)
+        gated = [run_button, checkin_button, auto_submit]
+
+        def unlock_if_ready():
+            unlock = gr.update(interactive=True) if WARMUP_GATE and get_warmup().done() else gr.update()
+            return unlock, unlock, unlock
+
+        def poll_warmup(settled: bool):
+            warmup = get_warmup()
+            if settled or not warmup.stages():
+                return gr.update(), gr.update(), gr.update(), gr.update(), settled
+            return (warmup.format_status(), *unlock_if_ready(), warmup.done())
+
+        demo.load(
+            poll_warmup,
+            inputs=warmup_settled,
+            outputs=[warmup_status, *gated, warmup_settled],
+            every=2,
+        )
         warmup_btn.click(
             warm_up_models,
             inputs=None,
             outputs=warmup_status,
+            **_limit("warmup"),
+        ).then(
+            unlock_if_ready,
+            inputs=None,
+            outputs=gated,
+            queue=False,
+        )
+        participant_id.blur(
+            handle_session_active,
+            inputs=[participant_id, language],
+            outputs=None,
+            queue=False,
+        )
+        asr_swap_btn.click(
+            handle_asr_swap,
+            inputs=[asr_swap_lang, asr_swap_size, asr_swap_compute],
+            outputs=asr_pool_status,
+            **_limit("warmup"),
         )
 
         def translate(lang: str, scenario_label_value: str):
@@ -367,7 +524,10 @@ def build_interface():
                 gr.update(label=t["model"]),
                 gr.update(label=t["lang_label"]),
                 gr.update(label="LLM Status / Troubleshooting", value=t["llm_status_value"]),
-                gr.update(label="Modell-Warmup (Whisper + TTS)", value=t["warmup_value"]),
+                gr.update(
+                    label="Modell-Warmup (Whisper + TTS)",
+                    value=get_warmup().format_status() if get_warmup().stages() else t["warmup_value"],
+                ),
                 gr.update(label=t["scenario_label"]),
                 gr.update(label=t["scenario_text_label"], value=scen_text_val),
                 gr.update(label=t["run_mode_label"], choices=t["run_mode_choices"]),
@@ -386,6 +546,8 @@ def build_interface():
                 gr.update(label=t["erq"][0]),
                 gr.update(label=t["erq"][1]),
                 gr.update(label=t["audio_label"]),
+                gr.update(label=t["stream_label"]),
+                gr.update(label=t["auto_submit"]),
                 gr.update(label=t["text_input"], placeholder=t["text_placeholder"]),
                 gr.update(value=t["run_button"]),
                 gr.update(label=t["transcript_label"]),
@@ -406,6 +568,12 @@ def build_interface():
                 gr.update(label=t["save1_status"]),
                 gr.update(value=t["save2"]),
                 gr.update(label=t["save2_status"]),
+                gr.update(label=t["asr_pool"]),
+                gr.update(label=t["asr_swap_lang"]),
+                gr.update(label=t["asr_swap_size"]),
+                gr.update(label=t["asr_swap_compute"]),
+                gr.update(value=t["asr_swap_button"]),
+                gr.update(label=t["asr_pool_status"]),
             )
 
         language.change(
@@ -436,6 +604,8 @@ def build_interface():
                 erq_reappraisal,
                 erq_suppression,
                 audio_in,
+                audio_stream,
+                auto_submit,
                 manual_text,
                 run_button,
                 transcript_box,
@@ -456,12 +626,30 @@ def build_interface():
                 save1_status,
                 save2,
                 save2_status,
+                asr_pool_box,
+                asr_swap_lang,
+                asr_swap_size,
+                asr_swap_compute,
+                asr_swap_btn,
+                asr_pool_status,
             ],
         )
 
+    # Requests beyond QUEUE_MAX_SIZE are turned away instead of piling up behind a busy station
+    demo.queue(max_size=QUEUE_MAX_SIZE)
     return demo
 
 
 if __name__ == "__main__":
+    configure_logging()
+    pin_app_process(include_tts=TTS_WORKERS <= 0)
+    if WARMUP_ON_START:
+        get_warmup().start()
+    get_governor().start()
+    get_results_writer().start()  # recovers rows journaled before a crash
+    start_journal()
     interface = build_interface()
-    interface.launch()
+    if METRICS:
+        serve_with_metrics(interface, SERVER_NAME, SERVER_PORT)
+    else:
+        interface.launch()
@@ -0,0 +1,137 @@
+"""Shared Whisper serving layer for several stations.
+
+Transcription jobs go into a bounded queue with one FIFO per session. Worker
+threads (one per CTranslate2 worker) pick sessions round-robin, so a station
+that submits many segments in a row cannot starve the others.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from settings import ASR_NUM_WORKERS, ASR_QUEUE_SIZE
+
+_STATS_WINDOW = 200
+_ANONYMOUS = "_anonymous"
+
+
+class _Job:
+    __slots__ = ("fn", "args", "future", "enqueued", "record")
+
+    def __init__(self, fn: Callable[..., Any], args: Tuple[Any, ...], future: Future, record: bool) -> None:
+        self.fn = fn
+        self.args = args
+        self.future = future
+        self.enqueued = time.perf_counter()
+        self.record = record
+
+
+class ASRService:
+    """Bounded, per-session fair queue in front of the Whisper model."""
+
+    def __init__(self, num_workers: int = ASR_NUM_WORKERS, max_queue: int = ASR_QUEUE_SIZE) -> None:
+        self.num_workers = max(1, num_workers)
+        self.max_queue = max(1, max_queue)
+        self._sessions: "OrderedDict[str, Deque[_Job]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._queued = 0
+        self._busy = 0
+        self._completed = 0
+        self._rejected = 0
+        self._waits: Deque[float] = deque(maxlen=_STATS_WINDOW)
+        self._decodes: Deque[float] = deque(maxlen=_STATS_WINDOW)
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"asr-worker-{idx}", daemon=True)
+            for idx in range(self.num_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, session_id: Optional[str], fn: Callable[..., Any], *args: Any, record: bool = True) -> Future:
+        """Queue ``fn(*args)`` for a session. The future fails if the queue is full.
+
+        ``record=False`` (streaming partials) keeps the job out of the wait/decode figures.
+        """
+        future: Future = Future()
+        key = session_id or _ANONYMOUS
+        with self._cond:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                future.set_exception(RuntimeError(f"ASR queue full ({self.max_queue} pending)"))
+                return future
+            self._sessions.setdefault(key, deque()).append(_Job(fn, args, future, record))
+            self._queued += 1
+            self._cond.notify()
+        return future
+
+    def _next_job(self) -> _Job:
+        with self._cond:
+            while not self._sessions:
+                self._cond.wait()
+            # Round-robin: take the oldest session's head job, then move it to the back.
+            key, jobs = next(iter(self._sessions.items()))
+            job = jobs.popleft()
+            del self._sessions[key]
+            if jobs:
+                self._sessions[key] = jobs
+            self._queued -= 1
+            self._busy += 1
+            return job
+
+    def _worker(self) -> None:
+        while True:
+            job = self._next_job()
+            started = time.perf_counter()
+            try:
+                result = job.fn(*job.args)
+            except Exception as exc:  # pragma: no cover - runtime safeguard
+                job.future.set_exception(exc)
+            else:
+                job.future.set_result(result)
+            finished = time.perf_counter()
+            with self._cond:
+                self._busy -= 1
+                self._completed += 1
+                if job.record:
+                    self._waits.append(started - job.enqueued)
+                    self._decodes.append(finished - started)
+
+    def stats(self) -> Dict[str, float]:
+        """Queue wait versus decode time over the recent window."""
+        with self._cond:
+            waits = sorted(self._waits)
+            decodes = sorted(self._decodes)
+            return {
+                "workers": float(self.num_workers),
+                "queue_depth": float(self._queued),
+                "busy": float(self._busy),
+                "sessions_waiting": float(len(self._sessions)),
+                "completed": float(self._completed),
+                "rejected": float(self._rejected),
+                "queue_wait_mean_sec": sum(waits) / len(waits) if waits else 0.0,
+                "queue_wait_p95_sec": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                "decode_mean_sec": sum(decodes) / len(decodes) if decodes else 0.0,
+                "decode_p95_sec": decodes[int(0.95 * (len(decodes) - 1))] if decodes else 0.0,
+            }
+
+
+_service: Optional[ASRService] = None
+_service_lock = threading.Lock()
+
+
+def get_asr_service() -> ASRService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = ASRService()
+    return _service
+
+
+def format_asr_stats(stats: Dict[str, float]) -> str:
+    return (
+        f"ASR: {int(stats['workers'])} workers, queue={int(stats['queue_depth'])}, "
+        f"wait mean={stats['queue_wait_mean_sec']:.2f}s p95={stats['queue_wait_p95_sec']:.2f}s, "
+        f"decode mean={stats['decode_mean_sec']:.2f}s p95={stats['decode_p95_sec']:.2f}s"
+    )
@@ -0,0 +1,128 @@
+"""Streaming push-to-talk transcription.
+
+Microphone chunks are resampled to 16 kHz mono, segmented by a frame-energy
+voice activity gate and decoded segment by segment while the driver is still
+speaking. The open segment is periodically decoded with greedy search to give a
+partial hypothesis.
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, List, Optional, Tuple
+
+import numpy as np
+
+from audio_io import transcribe_array
+from audio_preproc import TARGET_SAMPLE_RATE, frame_energy_db, to_mono_16k
+from settings import (
+    ASR_BEAM_SIZE,
+    ASR_END_OF_SPEECH_MS,
+    ASR_PARTIAL_INTERVAL_MS,
+    ASR_VAD_SILENCE_MS,
+    ASR_VAD_THRESHOLD_DB,
+)
+
+FRAME_MS = 30
+_FRAME = TARGET_SAMPLE_RATE * FRAME_MS // 1000
+_PREROLL_FRAMES = 7  # ~200 ms kept before the first voiced frame
+
+
+class StreamingTranscriber:
+    """Incremental transcriber for one push-to-talk utterance."""
+
+    def __init__(self, language_hint: Optional[str] = None, session_id: Optional[str] = None) -> None:
+        self.language_hint = language_hint
+        self.session_id = session_id
+        self.detected_lang: Optional[str] = None
+        self.submitted = False
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._segment: List[np.ndarray] = []
+        self._preroll: Deque[np.ndarray] = deque(maxlen=_PREROLL_FRAMES)
+        self._in_speech = False
+        self._speech_seen = False
+        self._silence_ms = 0.0
+        self._since_partial_ms = 0.0
+        self._finals: List["Future[Tuple[str, Optional[str], Optional[str]]]"] = []
+        self._partial: Optional["Future[Tuple[str, Optional[str], Optional[str]]]"] = None
+        # One decode thread per utterance keeps segment results in order.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asr-stream")
+
+    def feed(self, sample_rate: int, samples: np.ndarray) -> Tuple[str, bool]:
+        """Add a mic chunk. Returns (current transcript, end_of_speech)."""
+        self._pending = np.concatenate([self._pending, to_mono_16k(sample_rate, samples)])
+        n_frames = len(self._pending) // _FRAME
+        if n_frames:
+            frames = self._pending[: n_frames * _FRAME].reshape(n_frames, _FRAME)
+            self._pending = self._pending[n_frames * _FRAME :]
+            voiced = frame_energy_db(frames) > ASR_VAD_THRESHOLD_DB
+            for frame, is_voiced in zip(frames, voiced):
+                self._step(frame, bool(is_voiced))
+        return self.text(), self.end_of_speech()
+
+    def _step(self, frame: np.ndarray, voiced: bool) -> None:
+        if voiced:
+            if not self._in_speech:
+                self._segment.extend(self._preroll)
+                self._preroll.clear()
+            self._in_speech = True
+            self._speech_seen = True
+            self._silence_ms = 0.0
+            self._segment.append(frame)
+        elif self._in_speech:
+            self._segment.append(frame)
+            self._silence_ms += FRAME_MS
+            if self._silence_ms >= ASR_VAD_SILENCE_MS:
+                self._close_segment()
+        else:
+            self._preroll.append(frame)
+            if self._speech_seen:
+                self._silence_ms += FRAME_MS
+        if self._in_speech:
+            self._since_partial_ms += FRAME_MS
+            if self._since_partial_ms >= ASR_PARTIAL_INTERVAL_MS and (self._partial is None or self._partial.done()):
+                self._since_partial_ms = 0.0
+                audio = np.concatenate(self._segment)
+                self._partial = self._executor.submit(
+                    transcribe_array, audio, self.language_hint, 1, self.session_id, True
+                )
+
+    def _close_segment(self) -> None:
+        if self._segment:
+            audio = np.concatenate(self._segment)
+            self._finals.append(self._executor.submit(transcribe_array, audio, self.language_hint, ASR_BEAM_SIZE, self.session_id))
+        self._segment = []
+        self._in_speech = False
+        self._partial = None
+        self._since_partial_ms = 0.0
+
+    def end_of_speech(self) -> bool:
+        return self._speech_seen and not self._in_speech and self._silence_ms >= ASR_END_OF_SPEECH_MS
+
+    def text(self) -> str:
+        """Finished segments in order, followed by the latest partial hypothesis."""
+        parts: List[str] = []
+        all_done = True
+        for future in self._finals:
+            if not future.done():
+                all_done = False
+                break
+            text, _, lang = future.result()
+            if text:
+                parts.append(text)
+            if lang:
+                self.detected_lang = lang
+        if all_done and self._partial is not None and self._partial.done():
+            partial_text = self._partial.result()[0]
+            if partial_text:
+                parts.append(f"{partial_text} …")
+        return " ".join(parts).strip()
+
+    def finish(self) -> str:
+        """Flush the open segment, wait for all decodes and return the final transcript."""
+        if self._in_speech:
+            self._close_segment()
+        self._partial = None
+        for future in self._finals:
+            future.result()
+        text = self.text()
+        self._executor.shutdown(wait=False)
+        return text
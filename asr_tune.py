@@ -0,0 +1,220 @@
+"""Benchmark Whisper configurations and persist the best profile.
+
+Usage:
+    python asr_tune.py --corpus corpus/                 # <lang>/<name>.wav + <name>.txt
+    python asr_tune.py --corpus manifest.jsonl          # {"audio", "text", "language"} per line
+    python asr_tune.py --synthesize corpus/             # build an EN/DE corpus from scenarios.json via XTTS
+
+For every candidate (model size x compute type x beam size x CPU threads) the
+corpus is decoded once after a warmup decode. The report lists real-time factor,
+p50/p95 latency and WER. The fastest configuration (by p95) whose WER is within
+``--max-wer-delta`` of the best WER is written to ``ASR_PROFILE_PATH``, which
+``get_whisper`` loads at start-up.
+"""
+import argparse
+import itertools
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from settings import ASR_PROFILE_PATH
+
+DEFAULT_SIZES = ["tiny", "base", "small"]
+DEFAULT_COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+DEFAULT_BEAM_SIZES = [1, 5]
+
+
+def normalize_words(text: str) -> List[str]:
+    cleaned = re.sub(r"[^\w\s']", " ", text.lower())
+    return cleaned.split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Levenshtein distance over words divided by the reference length."""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, r_word in enumerate(ref, start=1):
+        cur = [i] + [0] * len(hyp)
+        for j, h_word in enumerate(hyp, start=1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r_word != h_word))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def load_corpus(source: Path) -> List[Dict[str, Any]]:
+    """Read a manifest (.jsonl) or a directory of wav files with .txt references."""
+    items: List[Dict[str, Any]] = []
+    if source.is_file():
+        for line in source.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            audio = Path(entry["audio"])
+            if not audio.is_absolute():
+                audio = source.parent / audio
+            items.append({"audio": str(audio), "text": entry.get("text", ""), "language": entry.get("language")})
+        return items
+    for wav in sorted(source.rglob("*.wav")):
+        ref = wav.with_suffix(".txt")
+        if not ref.exists():
+            continue
+        lang = wav.parent.name if wav.parent.name in ("en", "de") else None
+        items.append({"audio": str(wav), "text": ref.read_text(encoding="utf-8").strip(), "language": lang})
+    return items
+
+
+def synthesize_corpus(target: Path) -> int:
+    """Render every scenario text (EN and DE) with XTTS as a reference corpus."""
+    import soundfile as sf  # type: ignore[import-untyped]
+
+    from audio_io import synthesize_pcm
+    from data import SCENARIOS
+
+    count = 0
+    for scenario in SCENARIOS:
+        for lang, key in (("en", "text"), ("de", "text_de")):
+            text = str(scenario.get(key) or "").strip()
+            if not text:
+                continue
+            out_dir = target / lang
+            out_dir.mkdir(parents=True, exist_ok=True)
+            pcm, sample_rate = synthesize_pcm(text, lang)
+            sf.write(str(out_dir / f"{scenario['id']}.wav"), pcm, sample_rate)
+            (out_dir / f"{scenario['id']}.txt").write_text(text, encoding="utf-8")
+            count += 1
+    return count
+
+
+def audio_duration(path: str) -> float:
+    import soundfile as sf  # type: ignore[import-untyped]
+
+    return float(sf.info(path).duration)
+
+
+def run_config(
+    corpus: List[Dict[str, Any]], size: str, compute_type: str, beam_size: int, cpu_threads: int
+) -> Dict[str, Any]:
+    from faster_whisper import WhisperModel  # type: ignore[import-untyped]
+
+    load_start = time.perf_counter()
+    model = WhisperModel(size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+    load_sec = time.perf_counter() - load_start
+
+    def decode(item: Dict[str, Any]) -> str:
+        segments, _ = model.transcribe(item["audio"], beam_size=beam_size, language=item.get("language"))
+        return " ".join(seg.text.strip() for seg in segments).strip()
+
+    decode(corpus[0])  # warmup: first-call allocations are not part of the measurement
+    latencies: List[float] = []
+    errors: List[float] = []
+    audio_total = 0.0
+    for item in corpus:
+        start = time.perf_counter()
+        hypothesis = decode(item)
+        latencies.append(time.perf_counter() - start)
+        errors.append(word_error_rate(item["text"], hypothesis))
+        audio_total += audio_duration(item["audio"])
+    return {
+        "model_size": size,
+        "compute_type": compute_type,
+        "beam_size": beam_size,
+        "cpu_threads": cpu_threads,
+        "load_sec": load_sec,
+        "rtf": sum(latencies) / audio_total if audio_total else 0.0,
+        "p50_sec": percentile(latencies, 50),
+        "p95_sec": percentile(latencies, 95),
+        "wer": sum(errors) / len(errors) if errors else 0.0,
+    }
+
+
+def choose_profile(results: List[Dict[str, Any]], max_wer_delta: float) -> Optional[Dict[str, Any]]:
+    if not results:
+        return None
+    best_wer = min(r["wer"] for r in results)
+    acceptable = [r for r in results if r["wer"] <= best_wer + max_wer_delta]
+    return min(acceptable, key=lambda r: (r["p95_sec"], r["rtf"]))
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    lines = [f"{'size':<8} {'compute':<13} {'beam':>4} {'thr':>4} {'RTF':>6} {'p50 s':>7} {'p95 s':>7} {'WER':>6}"]
+    for r in results:
+        lines.append(
+            f"{r['model_size']:<8} {r['compute_type']:<13} {r['beam_size']:>4} {r['cpu_threads']:>4} "
+            f"{r['rtf']:>6.3f} {r['p50_sec']:>7.2f} {r['p95_sec']:>7.2f} {r['wer']:>6.3f}"
+        )
+    return "\n".join(lines)
+
+
+def _csv(value: str, cast: Any) -> List[Any]:
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, help="Corpus directory or .jsonl manifest")
+    parser.add_argument("--synthesize", type=Path, help="Render a scenario corpus into this directory first")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES))
+    parser.add_argument("--compute-types", default=",".join(DEFAULT_COMPUTE_TYPES))
+    parser.add_argument("--beam-sizes", default=",".join(str(b) for b in DEFAULT_BEAM_SIZES))
+    parser.add_argument("--cpu-threads", default="0", help="Comma-separated thread counts (0 = library default)")
+    parser.add_argument("--max-wer-delta", type=float, default=0.02)
+    parser.add_argument("--report", type=Path, help="Write all results as JSON")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the chosen profile")
+    args = parser.parse_args(argv)
+
+    corpus_path: Optional[Path] = args.corpus
+    if args.synthesize:
+        print(f"Synthesized {synthesize_corpus(args.synthesize)} utterances into {args.synthesize}")
+        corpus_path = corpus_path or args.synthesize
+    if corpus_path is None:
+        parser.error("--corpus or --synthesize is required")
+    corpus = load_corpus(corpus_path)
+    if not corpus:
+        parser.error(f"No utterances with references found in {corpus_path}")
+
+    results: List[Dict[str, Any]] = []
+    grid: List[Tuple[str, str, int, int]] = list(
+        itertools.product(
+            _csv(args.sizes, str),
+            _csv(args.compute_types, str),
+            _csv(args.beam_sizes, int),
+            _csv(args.cpu_threads, int),
+        )
+    )
+    for size, compute_type, beam_size, cpu_threads in grid:
+        print(f"-> {size} / {compute_type} / beam={beam_size} / threads={cpu_threads} ({len(corpus)} utterances)")
+        try:
+            results.append(run_config(corpus, size, compute_type, beam_size, cpu_threads))
+        except Exception as exc:  # pragma: no cover - unsupported compute type etc.
+            print(f"   skipped: {exc}")
+
+    print(format_table(results))
+    if args.report:
+        args.report.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    chosen = choose_profile(results, args.max_wer_delta)
+    if chosen is None:
+        print("No configuration finished.")
+        return 1
+    profile = {k: chosen[k] for k in ("model_size", "compute_type", "beam_size", "cpu_threads")}
+    print(f"Chosen profile: {profile} (RTF {chosen['rtf']:.3f}, p95 {chosen['p95_sec']:.2f}s, WER {chosen['wer']:.3f})")
+    if not args.no_save:
+        ASR_PROFILE_PATH.write_text(json.dumps(profile, indent=2), encoding="utf-8")
+        print(f"Saved to {ASR_PROFILE_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+"""Output encoding for synthesized speech.
+
+Remote stations receive every TTS clip over the network, so the delivery format
+is configurable: uncompressed WAV, OGG (Vorbis or Opus), FLAC or MP3. Encoding
+runs inline on the calling TTS executor thread (libsndfile releases the GIL), so
+stations encode in parallel; its cost and output size are tracked per utterance.
+"""
+import contextlib
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from settings import TTS_OUTPUT_FORMAT
+
+# format name -> (file suffix, libsndfile format, libsndfile subtype)
+FORMATS: Dict[str, Tuple[str, str, str]] = {
+    "wav": (".wav", "WAV", "PCM_16"),
+    "ogg": (".ogg", "OGG", "VORBIS"),
+    "opus": (".ogg", "OGG", "OPUS"),
+    "flac": (".flac", "FLAC", "PCM_16"),
+    "mp3": (".mp3", "MP3", "MPEG_LAYER_III"),
+}
+
+
+def normalize_peak(pcm: np.ndarray) -> np.ndarray:
+    """Peak-normalize like ``tts_to_file`` did, returning float32 in [-1, 1]."""
+    peak = float(np.max(np.abs(pcm))) if pcm.size else 0.0
+    return (pcm * (32767 / max(0.01, peak)) / 32768.0).astype(np.float32)
+
+
+def _write_wav(out_path: Path, pcm: np.ndarray, sample_rate: int) -> None:
+    scaled = (normalize_peak(pcm) * 32768.0).clip(-32768, 32767).astype(np.int16)
+    with contextlib.closing(wave.open(str(out_path), "w")) as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(scaled.tobytes())
+
+
+def _encode(out_base: Path, pcm: np.ndarray, sample_rate: int, fmt: str) -> Tuple[Path, Optional[str]]:
+    """Write ``pcm`` in ``fmt``; falls back to WAV if libsndfile lacks the codec."""
+    suffix, major, subtype = FORMATS.get(fmt, FORMATS["wav"])
+    out_path = out_base.with_suffix(suffix)
+    if major == "WAV":
+        _write_wav(out_path, pcm, sample_rate)
+        return out_path, None
+    try:
+        import soundfile as sf  # type: ignore[import-untyped]
+
+        sf.write(str(out_path), normalize_peak(pcm), sample_rate, format=major, subtype=subtype)
+        return out_path, None
+    except Exception as exc:
+        out_path.unlink(missing_ok=True)
+        wav_path = out_base.with_suffix(".wav")
+        _write_wav(wav_path, pcm, sample_rate)
+        return wav_path, f"{fmt} encoding unavailable ({exc}); sent WAV"
+
+
+class CodecStats:
+    """Bytes per utterance and encode time for the configured format."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.utterances = 0
+        self.bytes_out = 0
+        self.pcm16_bytes = 0
+        self.encode_sec = 0.0
+        self.fallbacks = 0
+
+    def record(self, bytes_out: int, n_samples: int, encode_sec: float, fell_back: bool) -> None:
+        with self._lock:
+            self.utterances += 1
+            self.bytes_out += bytes_out
+            self.pcm16_bytes += n_samples * 2
+            self.encode_sec += encode_sec
+            self.fallbacks += int(fell_back)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            n = max(1, self.utterances)
+            return {
+                "utterances": float(self.utterances),
+                "bytes_per_utterance": self.bytes_out / n,
+                "compression_ratio": self.pcm16_bytes / self.bytes_out if self.bytes_out else 0.0,
+                "encode_ms_mean": 1000.0 * self.encode_sec / n,
+                "fallbacks": float(self.fallbacks),
+            }
+
+
+CODEC_STATS = CodecStats()
+
+
+def encode_speech(
+    out_base: Path, pcm: np.ndarray, sample_rate: int, fmt: str = TTS_OUTPUT_FORMAT
+) -> Tuple[str, Optional[str]]:
+    """Encode on the calling thread. Returns (path, warning)."""
+    started = time.perf_counter()
+    path, warning = _encode(out_base, pcm, sample_rate, fmt)
+    CODEC_STATS.record(path.stat().st_size, int(pcm.size), time.perf_counter() - started, warning is not None)
+    return str(path), warning
+
+
+def format_codec_stats(stats: Dict[str, float]) -> str:
+    return (
+        f"TTS delivery ({TTS_OUTPUT_FORMAT}): {stats['bytes_per_utterance'] / 1024:.1f} KiB/utterance, "
+        f"x{stats['compression_ratio']:.1f} vs PCM16, encode {stats['encode_ms_mean']:.1f} ms"
+    )
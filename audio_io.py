@@ -1,11 +1,17 @@
+import contextvars
 import os
+import re
 import threading
+import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Generator, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 import wave
 import contextlib
 
+import numpy as np
+import torch  # type: ignore[import-untyped]
 from faster_whisper import WhisperModel  # type: ignore[import-untyped]
 from TTS.api import TTS  # type: ignore[import-untyped]
 try:
@@ -15,7 +21,30 @@ except Exception:  # pragma: no cover - defensive import
     add_safe_globals = None  # type: ignore[assignment]
     XttsConfig = None
 
-from settings import TMP_DIR
+from asr_service import get_asr_service
+from audio_codec import encode_speech
+from audio_preproc import PREPROC_STATS, load_and_prepare
+from model_bundle import get_bundle
+from model_governor import ManagedModel, get_governor, rss_mb
+from model_server import get_model_client
+from metrics import ASR_PARTIAL_SECONDS, ASR_SECONDS, ERRORS, TTS_SECONDS, TTS_SILENCE
+from session_journal import journal_event
+from spans import add_span, span
+from settings import (
+    ASR_BEAM_SIZE,
+    ASR_PREPROCESS,
+    TMP_DIR,
+    TTS_CPU_PROFILE,
+    TTS_CROSSFADE_MS,
+    TTS_SENTENCE_GAP_MS,
+    TTS_SENTENCE_JOIN,
+    TTS_SPLIT_SENTENCES,
+    TTS_WORKERS,
+)
+from thread_budget import tts_threads
+from tts_cpu import apply_cpu_profile, render_fast
+from tts_pool import get_tts_pool
+from whisper_pool import WhisperPool, format_pool_status
 
 
 class AudioModels:
@@ -26,9 +55,13 @@ class AudioModels:
     
     def __init__(self) -> None:
         """Private constructor. Use get_instance() instead."""
-        self._whisper_model: Optional[WhisperModel] = None
+        self._whisper_pool: Optional[WhisperPool] = None
         self._tts_model: Optional[TTS] = None
         self._tts_default_speaker: Optional[str] = None
+        self._tts_last_used = 0.0
+        self._tts_rss_mb = 0.0
+        self._tts_in_flight = 0
+        self._tts_use_lock = threading.Lock()
         self._whisper_lock = threading.Lock()
         self._tts_lock = threading.Lock()
     
@@ -41,30 +74,47 @@ class AudioModels:
                     cls._instance = cls()
         return cls._instance
     
-    def get_whisper(self) -> WhisperModel:
-        """Get or initialize Whisper model (thread-safe)."""
-        if self._whisper_model is None:
+    def get_whisper_pool(self) -> WhisperPool:
+        """Get or create the Whisper model pool (thread-safe)."""
+        if self._whisper_pool is None:
             with self._whisper_lock:
-                if self._whisper_model is None:
-                    self._whisper_model = WhisperModel("base", device="cpu", compute_type="int8")
-        return self._whisper_model
+                if self._whisper_pool is None:
+                    self._whisper_pool = WhisperPool()
+        return self._whisper_pool
+
+    def get_whisper(self, language: Optional[str] = None) -> WhisperModel:
+        """Get or initialize the Whisper model routed for ``language`` (thread-safe)."""
+        pool = self.get_whisper_pool()
+        return pool.get(pool.key_for_language(language))
     
     def get_tts(self) -> Tuple[TTS, Optional[str]]:
         """Get or initialize TTS model and default speaker (thread-safe)."""
+        self._tts_last_used = time.monotonic()
         if self._tts_model is None:
             with self._tts_lock:
                 if self._tts_model is None:
+                    rss_before = rss_mb()
                     try:
                         if add_safe_globals is not None and XttsConfig:
                             try:
                                 add_safe_globals([XttsConfig])
                             except Exception:
                                 pass
-                        self._tts_model = TTS(
-                            model_name="tts_models/multilingual/multi-dataset/xtts_v2",
-                            progress_bar=False,
-                            gpu=False,
-                        )
+                        bundle = get_bundle()
+                        if bundle is not None:
+                            xtts_dir = bundle.xtts_dir()
+                            model = TTS(
+                                model_path=str(xtts_dir),
+                                config_path=str(xtts_dir / "config.json"),
+                                progress_bar=False,
+                                gpu=False,
+                            )
+                        else:
+                            model = TTS(
+                                model_name="tts_models/multilingual/multi-dataset/xtts_v2",
+                                progress_bar=False,
+                                gpu=False,
+                            )
                     except ImportError as exc:
                         msg = str(exc)
                         if "BeamSearchScorer" in msg or "transformers" in msg:
@@ -78,7 +128,7 @@ class AudioModels:
                             ) from exc
                         raise
                     try:
-                        sm = self._tts_model.synthesizer.tts_model.speaker_manager
+                        sm = model.synthesizer.tts_model.speaker_manager
                         if sm and getattr(sm, "speakers", None):
                             names = list(sm.speakers.keys())
                             if names:
@@ -88,13 +138,87 @@ class AudioModels:
                     env_speaker = os.getenv("TTS_SPEAKER_NAME")
                     if env_speaker:
                         self._tts_default_speaker = env_speaker
+                    if TTS_CPU_PROFILE:
+                        apply_cpu_profile(model, set_threads=TTS_WORKERS <= 0)
+                    elif TTS_WORKERS <= 0 and tts_threads():
+                        torch.set_num_threads(tts_threads())
+                    self._tts_model = model
+                    self._tts_rss_mb = max(0.0, rss_mb() - rss_before)
         return self._tts_model, self._tts_default_speaker
 
+    @contextlib.contextmanager
+    def tts_in_use(self) -> Iterator[None]:
+        """Mark an in-process render as running, so the governor keeps the model loaded."""
+        with self._tts_use_lock:
+            self._tts_in_flight += 1
+        try:
+            yield
+        finally:
+            with self._tts_use_lock:
+                self._tts_in_flight -= 1
+                self._tts_last_used = time.monotonic()
+
+    def unload_tts(self) -> bool:
+        """Drop the in-process XTTS model unless a render is running."""
+        with self._tts_use_lock:
+            if self._tts_in_flight:
+                return False
+            with self._tts_lock:
+                if self._tts_model is None:
+                    return False
+                self._tts_model = None
+                return True
+
+    def managed_models(self) -> List[ManagedModel]:
+        """Loaded models with usage and memory figures for the governor."""
+        models: List[ManagedModel] = []
+        if self._whisper_pool is not None:
+            pool = self._whisper_pool
+            for key, last_used, in_use, rss in pool.loaded():
+                models.append(
+                    ManagedModel(f"Whisper {key[0]}/{key[2]}", last_used, in_use, rss, lambda k=key: pool.unload(k))
+                )
+        if self._tts_model is not None:
+            busy = self._tts_in_flight > 0
+            models.append(ManagedModel("XTTS", self._tts_last_used, busy, self._tts_rss_mb, self.unload_tts))
+        tts_pool = get_tts_pool()
+        if tts_pool is not None and tts_pool.running:
+            busy = tts_pool.stats()["in_flight"] > 0
+            models.append(
+                ManagedModel("XTTS workers", tts_pool.last_used, busy, tts_pool.rss_mb(), _shutdown_pool(tts_pool))
+            )
+        return models
+
+
+def _shutdown_pool(pool: Any) -> Callable[[], bool]:
+    def unload() -> bool:
+        return pool.shutdown(idle_only=True)
+
+    return unload
+
 
 # Convenience functions for backward compatibility
-def get_whisper() -> WhisperModel:
-    """Get Whisper model instance."""
-    return AudioModels.get_instance().get_whisper()
+def get_whisper(language: Optional[str] = None) -> WhisperModel:
+    """Get Whisper model instance for a response language."""
+    return AudioModels.get_instance().get_whisper(language)
+
+
+def swap_whisper_model(language: str, size: str, compute_type: str) -> str:
+    """Route a language to another Whisper checkpoint without restarting the app."""
+    if language != "en" and size.endswith(".en"):
+        return f"English-only model {size} cannot transcribe '{language}'."
+    client = get_model_client()
+    if client is not None:
+        try:
+            return client.call("swap_whisper_model", language, size, compute_type)  # type: ignore[no-any-return]
+        except Exception as exc:  # pragma: no cover - runtime safeguard
+            return f"ASR swap failed: {exc}"
+    pool = AudioModels.get_instance().get_whisper_pool()
+    try:
+        pool.swap(language, size, compute_type)
+    except Exception as exc:  # pragma: no cover - runtime safeguard
+        return f"ASR swap failed: {exc}"
+    return format_pool_status(pool.status())
 
 
 def get_tts() -> Tuple[TTS, Optional[str]]:
@@ -102,46 +226,306 @@ def get_tts() -> Tuple[TTS, Optional[str]]:
     return AudioModels.get_instance().get_tts()
 
 
-def transcribe_audio(audio_path: Optional[str], language_hint: Optional[str] = None) -> Tuple[str, Optional[str], Optional[str]]:
-    if not audio_path or not Path(audio_path).exists():
-        return "", "No audio captured. Using scenario text instead.", None
+def managed_models() -> List[ManagedModel]:
+    return AudioModels.get_instance().managed_models()
+
+
+def prefetch_models(language: Optional[str] = None) -> None:
+    """Load the Whisper route for ``language`` and XTTS ahead of the first turn."""
+    client = get_model_client()
+    if client is not None:
+        client.call("prefetch_models", language)
+        return
+    whisper_pool = AudioModels.get_instance().get_whisper_pool()
+    whisper_pool.get(whisper_pool.key_for_language(language if language in ("en", "de") else None))
+    tts_pool = get_tts_pool()
+    if tts_pool is not None:
+        tts_pool.wait_ready()
+    else:
+        get_tts()
+
+
+def notify_session_active(language: Optional[str] = None) -> None:
+    """A participant session started: reload unloaded models in the background."""
+    get_governor().prefetch(language)
+
+
+def _decode_now(source: Any, language_hint: Optional[str], beam_size: int) -> Tuple[str, Optional[str], Optional[str]]:
     lang = language_hint if language_hint in ("en", "de") else None
     try:
-        model = get_whisper()
-        segments, info = model.transcribe(audio_path, beam_size=5, language=lang, task="transcribe")
-        text = " ".join([seg.text.strip() for seg in segments]).strip()
+        with AudioModels.get_instance().get_whisper_pool().use(lang) as model:
+            segments, info = model.transcribe(source, beam_size=beam_size, language=lang, task="transcribe")
+            text = " ".join([seg.text.strip() for seg in segments]).strip()
         detected_lang = getattr(info, "language", None)
         return text, None, detected_lang
     except Exception as exc:  # pragma: no cover - runtime safeguard
         return "", f"Transcription failed: {exc}", None
 
 
-def synthesize_speech(text: str, language: str, tag: str) -> Tuple[Optional[str], Optional[str]]:
-    if not text or not str(text).strip():
-        return None, "No text provided for TTS."
-    tts, speaker = get_tts()
-    out_path = TMP_DIR / f"{tag}_{uuid.uuid4().hex}.wav"
-    tts_kwargs = {"text": text, "language": language, "file_path": str(out_path)}
+def _decode(
+    source: Any, language_hint: Optional[str], beam_size: int, session_id: Optional[str], partial: bool = False
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """Run a decode on the shared ASR service so stations are scheduled fairly.
+
+    Streaming partials (``partial``) are timed in their own histogram and journaled as
+    ``asr_partial``, so they do not skew the transcription latency figures.
+    """
+    started = time.perf_counter()
+    with span("asr_partial" if partial else "asr_decode"):
+        result = _decode_routed(source, language_hint, beam_size, session_id, partial)
+    (ASR_PARTIAL_SECONDS if partial else ASR_SECONDS).observe(time.perf_counter() - started)
+    if result[1]:
+        ERRORS.inc("asr")
+    journal_event(
+        "asr_partial" if partial else "asr",
+        source=source if isinstance(source, str) else f"{len(source) / 16000:.2f}s of samples",
+        language_hint=language_hint,
+        beam_size=beam_size,
+        text=result[0],
+        error=result[1],
+        detected_lang=result[2],
+        latency_sec=time.perf_counter() - started,
+    )
+    return result
+
+
+def _decode_routed(
+    source: Any, language_hint: Optional[str], beam_size: int, session_id: Optional[str], partial: bool = False
+) -> Tuple[str, Optional[str], Optional[str]]:
+    client = get_model_client()
+    if client is not None:
+        try:
+            return client.call(  # type: ignore[no-any-return]
+                "decode", source, language_hint, beam_size, session_id, partial
+            )
+        except Exception as exc:  # pragma: no cover - runtime safeguard
+            return "", f"Transcription failed: {exc}", None
+    future = get_asr_service().submit(
+        session_id, _decode_now, source, language_hint, beam_size, record=not partial
+    )
+    try:
+        return future.result()  # type: ignore[no-any-return]
+    except Exception as exc:  # pragma: no cover - runtime safeguard
+        return "", f"Transcription failed: {exc}", None
+
+
+NO_SPEECH = "No speech detected."
+
+
+def transcribe_audio(
+    audio_path: Optional[str],
+    language_hint: Optional[str] = None,
+    session_id: Optional[str] = None,
+    report: Optional[Dict[str, float]] = None,
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """Transcribe a recorded clip. ``report`` (if given) receives the pre-stage savings.
+
+    A clip without speech (rejected before decoding, or decoded to nothing) returns ``NO_SPEECH`` as the error.
+    """
+    if not audio_path or not Path(audio_path).exists():
+        return "", "No audio captured. Using scenario text instead.", None
+    with span("asr_preprocess"):
+        clip = load_and_prepare(audio_path) if ASR_PREPROCESS else None
+    if clip is None:
+        return _no_speech_if_empty(_decode(audio_path, language_hint, ASR_BEAM_SIZE, session_id))
+    if clip.empty:
+        clip_report = PREPROC_STATS.record(clip, None)
+        if report is not None:
+            report.update(clip_report)
+        return "", NO_SPEECH, None
+    started = time.perf_counter()
+    result = _decode(clip.samples, language_hint, ASR_BEAM_SIZE, session_id)
+    clip_report = PREPROC_STATS.record(clip, time.perf_counter() - started)
+    if report is not None:
+        report.update(clip_report)
+    return _no_speech_if_empty(result)
+
+
+def _no_speech_if_empty(result: Tuple[str, Optional[str], Optional[str]]) -> Tuple[str, Optional[str], Optional[str]]:
+    text, error, lang = result
+    if not text.strip() and not error:
+        return "", NO_SPEECH, lang
+    return result
+
+
+def transcribe_array(
+    samples: np.ndarray,
+    language_hint: Optional[str] = None,
+    beam_size: int = ASR_BEAM_SIZE,
+    session_id: Optional[str] = None,
+    partial: bool = False,
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """Transcribe 16 kHz mono float32 samples already in memory (``partial``: a streaming hypothesis)."""
+    if samples is None or not len(samples):
+        return "", "No audio captured. Using scenario text instead.", None
+    return _decode(np.asarray(samples, dtype=np.float32), language_hint, beam_size, session_id, partial)
+
+
+def _speaker_kwargs(tts: TTS, speaker: Optional[str]) -> Dict[str, Any]:
+    """Speaker selection shared by in-process and pooled synthesis."""
+    kwargs: Dict[str, Any] = {}
     if speaker:
-        tts_kwargs["speaker"] = speaker
+        kwargs["speaker"] = speaker
     else:
         try:
             sm = tts.synthesizer.tts_model.speaker_manager
             if sm and getattr(sm, "speakers", None):
                 names = list(sm.speakers.keys())
                 if names:
-                    tts_kwargs["speaker"] = names[0]
+                    kwargs["speaker"] = names[0]
         except Exception:
             pass
     speaker_wav = os.getenv("TTS_SPEAKER_WAV")
     if speaker_wav and Path(speaker_wav).exists():
-        tts_kwargs["speaker_wav"] = speaker_wav
+        kwargs["speaker_wav"] = speaker_wav
+    return kwargs
+
+
+# The XTTS model is not documented as thread-safe, and concurrent renders on CPU
+# only compete for torch's intra-op threads: renders in one process take turns.
+_render_lock = threading.Lock()
+
+
+def synthesize_pcm(text: str, language: str) -> Tuple[np.ndarray, int]:
+    """Render text in this process (one render at a time). Returns (float32 samples, sample rate)."""
+    with AudioModels.get_instance().tts_in_use(), _render_lock:
+        tts, speaker = get_tts()
+        if TTS_CPU_PROFILE:
+            return render_fast(tts, text, language, **_speaker_kwargs(tts, speaker))
+        wav = tts.tts(text=text, language=language, **_speaker_kwargs(tts, speaker))
+        sample_rate = int(tts.synthesizer.output_sample_rate)
+    return np.asarray(wav, dtype=np.float32), sample_rate
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split on sentence-final punctuation, keeping the punctuation."""
+    parts = re.split(r"(?<=[.!?])\s+", str(text).strip())
+    return [p.strip() for p in parts if p.strip()]
+
+
+def join_pcm(
+    chunks: List[np.ndarray],
+    sample_rate: int,
+    mode: str = TTS_SENTENCE_JOIN,
+    crossfade_ms: float = TTS_CROSSFADE_MS,
+    gap_ms: float = TTS_SENTENCE_GAP_MS,
+) -> np.ndarray:
+    """Join sentence clips with an equal-gain linear crossfade or a silence gap."""
+    chunks = [np.asarray(c, dtype=np.float32) for c in chunks if c is not None and len(c)]
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    if mode == "silence":
+        gap = np.zeros(int(sample_rate * gap_ms / 1000.0), dtype=np.float32)
+        pieces: List[np.ndarray] = []
+        for idx, chunk in enumerate(chunks):
+            if idx:
+                pieces.append(gap)
+            pieces.append(chunk)
+        return np.concatenate(pieces)
+
+    fade = int(sample_rate * crossfade_ms / 1000.0)
+    total = sum(len(c) for c in chunks) - fade * (len(chunks) - 1)
+    out = np.zeros(max(total, 0), dtype=np.float32)
+    pos = 0
+    for idx, chunk in enumerate(chunks):
+        overlap = min(fade, len(chunk), pos) if idx else 0
+        if overlap:
+            ramp = np.linspace(0.0, 1.0, overlap, dtype=np.float32)
+            out[pos - overlap : pos] = out[pos - overlap : pos] * (1.0 - ramp) + chunk[:overlap] * ramp
+        end = pos - overlap + len(chunk)
+        if end > len(out):
+            out = np.concatenate([out, np.zeros(end - len(out), dtype=np.float32)])
+        out[pos : end] = chunk[overlap:]
+        pos = end
+    return out[:pos]
+
+
+def _render_sentences(sentences: List[str], language: str) -> Tuple[np.ndarray, int]:
+    """Render sentences (concurrently on the worker pool, else one after another) and join them."""
+    pool = get_tts_pool()
+    if pool is not None:
+        futures = [pool.submit(sentence, language) for sentence in sentences]
+        rendered = [future.result() for future in futures]
+    else:
+        rendered = [synthesize_pcm(sentence, language) for sentence in sentences]
+    sample_rate = rendered[0][1]
+    return join_pcm([pcm for pcm, _ in rendered], sample_rate), sample_rate
+
+
+def render_speech(text: str, language: str, split: Optional[bool] = None) -> Tuple[np.ndarray, int]:
+    """Render a reply to PCM (model server, TTS pool or in-process). Returns (samples, sample rate)."""
+    client = get_model_client()
+    if client is not None:
+        return client.call("render_speech", text, language, split)  # type: ignore[no-any-return]
+    pool = get_tts_pool()
+    split = TTS_SPLIT_SENTENCES if split is None else split
+    sentences = split_sentences(text) if split else []
+    if len(sentences) > 1:
+        return _render_sentences(sentences, language)
+    if pool is not None:
+        return pool.synthesize(text, language)
+    return synthesize_pcm(text, language)
+
+
+SpeechResult = Tuple[Optional[str], Optional[str], Optional[str]]  # (path, error, note)
+
+
+def synthesize_speech(text: str, language: str, tag: str, split: Optional[bool] = None) -> SpeechResult:
+    """Render and encode a reply. ``note`` reports a playable but degraded clip (e.g. WAV instead of Opus)."""
+    if not text or not str(text).strip():
+        return None, "No text provided for TTS.", None
+    if get_model_client() is None and get_tts_pool() is None:
+        get_tts()
+    out_base = TMP_DIR / f"{tag}_{uuid.uuid4().hex}"
     try:
-        tts.tts_to_file(**tts_kwargs)
-        return str(out_path), None
+        with span("tts_render"):
+            pcm, sample_rate = render_speech(text, language, split)
+        with span("tts_encode"):
+            out_path, note = encode_speech(out_base, pcm, sample_rate)
+        return out_path, None, note
     except Exception as exc:  # pragma: no cover - runtime safeguard
+        TTS_SILENCE.inc()
         fallback_path = _write_silence_wav(tag)
-        return fallback_path, f"TTS error: {exc}"
+        return fallback_path, f"TTS error: {exc}", None
+
+
+_speech_executor: Optional[ThreadPoolExecutor] = None
+_speech_executor_lock = threading.Lock()
+
+
+def submit_speech(text: str, language: str, tag: str) -> "Future[SpeechResult]":
+    """Run ``synthesize_speech`` on the shared executor used by all sessions."""
+    global _speech_executor
+    if _speech_executor is None:
+        with _speech_executor_lock:
+            if _speech_executor is None:
+                _speech_executor = ThreadPoolExecutor(
+                    max_workers=max(2, 2 * TTS_WORKERS), thread_name_prefix="tts"
+                )
+    # The copied context carries the journal's session IDs and the turn's trace into the executor thread.
+    submitted = time.perf_counter()
+    return _speech_executor.submit(contextvars.copy_context().run, _journaled_speech, text, language, tag, submitted)
+
+
+def _journaled_speech(text: str, language: str, tag: str, submitted: float) -> SpeechResult:
+    started = time.perf_counter()
+    add_span("tts_queue_wait", submitted, started)
+    with span("tts_synthesis"):
+        path, error, note = synthesize_speech(text, language, tag)
+    TTS_SECONDS.observe(time.perf_counter() - started)
+    if error:
+        ERRORS.inc("tts")
+    journal_event(
+        "tts",
+        text=text,
+        language=language,
+        tag=tag,
+        path=path,
+        error=error,
+        note=note,
+        latency_sec=time.perf_counter() - started,
+    )
+    return path, error, note
 
 
 def _write_silence_wav(tag: str, duration_sec: float = 1.0, sample_rate: int = 16000) -> str:
@@ -155,22 +539,3 @@ def _write_silence_wav(tag: str, duration_sec: float = 1.0, sample_rate: int = 1
         wf.writeframes(b"\x00\x00" * frames)
     return str(out_path)
 
-
-def warm_up_models() -> Generator[str, None, None]:
-    """Warm up models with progress updates for Gradio UI."""
-    yield "Starting warmup..."
-    
-    try:
-        yield "Loading Whisper model (speech-to-text)..."
-        get_whisper()
-        yield "✓ Whisper loaded successfully"
-    except Exception as exc:  # pragma: no cover - runtime safeguard
-        yield f"✗ Whisper error: {exc}"
-        return
-    
-    try:
-        yield "Loading XTTS model (text-to-speech). First download may take 1-2 minutes..."
-        get_tts()
-        yield "✓ XTTS loaded successfully. Models ready!"
-    except Exception as exc:  # pragma: no cover - runtime safeguard
-        yield f"✗ TTS error: {exc}"
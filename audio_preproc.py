@@ -0,0 +1,197 @@
+"""Vectorized clean-up of push-to-talk clips before Whisper.
+
+Clips are resampled once to 16 kHz mono (low-passed first when downsampling),
+leading/trailing silence is cut with a frame-energy gate, loudness is
+normalized on the voiced frames, and clips with too little speech are rejected
+before they reach the model. A clip where no frame passes the gate (a quiet
+mic) is normalized and decoded whole instead.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from settings import (
+    ASR_MIN_SPEECH_MS,
+    ASR_TARGET_RMS_DB,
+    ASR_TRIM_PAD_MS,
+    ASR_VAD_FLOOR_MARGIN_DB,
+    ASR_VAD_THRESHOLD_DB,
+)
+
+TARGET_SAMPLE_RATE = 16000
+FRAME_MS = 30
+_FRAME = TARGET_SAMPLE_RATE * FRAME_MS // 1000
+# Anti-alias filter for downsampling: flat up to 7.2 kHz, stopband from the 8 kHz Nyquist.
+_PASSBAND_HZ = 7200.0
+_STOPBAND_HZ = TARGET_SAMPLE_RATE / 2.0
+
+
+def lowpass(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Windowed-sinc (Blackman, ~74 dB stopband) low-pass below the 16 kHz Nyquist, by FFT convolution."""
+    transition = (_STOPBAND_HZ - _PASSBAND_HZ) / sample_rate
+    n_taps = int(np.ceil(5.5 / transition)) | 1
+    cutoff = (_PASSBAND_HZ + _STOPBAND_HZ) / 2.0 / sample_rate
+    t = np.arange(n_taps) - (n_taps - 1) / 2.0
+    kernel = 2.0 * cutoff * np.sinc(2.0 * cutoff * t) * np.blackman(n_taps)
+    kernel /= kernel.sum()
+    n_full = len(samples) + n_taps - 1
+    n_fft = 1 << (n_full - 1).bit_length()
+    filtered = np.fft.irfft(np.fft.rfft(samples, n_fft) * np.fft.rfft(kernel, n_fft), n_fft)
+    offset = (n_taps - 1) // 2
+    return filtered[offset : offset + len(samples)].astype(np.float32)
+
+
+def to_mono_16k(sample_rate: int, samples: np.ndarray) -> np.ndarray:
+    """Convert int16/float, mono/stereo audio to 16 kHz mono float32."""
+    data = np.asarray(samples)
+    if np.issubdtype(data.dtype, np.integer):
+        data = data.astype(np.float32) / float(np.iinfo(data.dtype).max)
+    else:
+        data = data.astype(np.float32)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if sample_rate > TARGET_SAMPLE_RATE and len(data):
+        data = lowpass(data, sample_rate)  # content above 8 kHz would fold back into the speech band
+    if sample_rate != TARGET_SAMPLE_RATE and len(data):
+        n_out = int(round(len(data) * TARGET_SAMPLE_RATE / float(sample_rate)))
+        positions = np.linspace(0, len(data) - 1, num=max(n_out, 1))
+        data = np.interp(positions, np.arange(len(data)), data).astype(np.float32)
+    return data
+
+
+def frame_energy_db(frames: np.ndarray) -> np.ndarray:
+    """Per-frame RMS level in dBFS for a ``(n_frames, frame_len)`` array."""
+    return 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+
+
+def voiced_frames(levels_db: np.ndarray) -> np.ndarray:
+    """Frames above ``ASR_VAD_THRESHOLD_DB`` or ``ASR_VAD_FLOOR_MARGIN_DB`` above the noise floor.
+
+    The noise floor is the 10th percentile of the frame levels, so a quiet mic
+    still has its speech frames found.
+    """
+    floor_db = float(np.percentile(levels_db, 10))
+    return levels_db > min(ASR_VAD_THRESHOLD_DB, floor_db + ASR_VAD_FLOOR_MARGIN_DB)
+
+
+def _normalize(samples: np.ndarray, rms: float) -> np.ndarray:
+    gain = (10.0 ** (ASR_TARGET_RMS_DB / 20.0)) / max(rms, 1e-6)
+    peak = float(np.max(np.abs(samples))) * gain if len(samples) else 0.0
+    if peak > 0.99:
+        gain *= 0.99 / peak
+    return (samples * gain).astype(np.float32)
+
+
+@dataclass
+class PreparedClip:
+    samples: np.ndarray
+    original_sec: float
+    kept_sec: float
+    speech_sec: float
+    gated: bool = True  # False: no frame passed the gate, the whole clip is kept
+
+    @property
+    def empty(self) -> bool:
+        return self.gated and self.speech_sec * 1000.0 < ASR_MIN_SPEECH_MS
+
+    @property
+    def saved_sec(self) -> float:
+        return max(0.0, self.original_sec - self.kept_sec)
+
+
+def prepare_samples(samples: np.ndarray) -> PreparedClip:
+    """Trim silence and normalize loudness of 16 kHz mono float32 samples."""
+    original_sec = len(samples) / float(TARGET_SAMPLE_RATE)
+    n_frames = len(samples) // _FRAME
+    if not n_frames:
+        return PreparedClip(np.zeros(0, dtype=np.float32), original_sec, 0.0, 0.0)
+    frames = samples[: n_frames * _FRAME].reshape(n_frames, _FRAME)
+    voiced = voiced_frames(frame_energy_db(frames))
+    voiced_idx = np.flatnonzero(voiced)
+    if not voiced_idx.size:
+        # Nothing stands out from the noise: let Whisper decide on the untrimmed clip.
+        rms = float(np.sqrt(np.mean(samples**2)))
+        return PreparedClip(_normalize(samples, rms), original_sec, original_sec, original_sec, gated=False)
+
+    pad = int(ASR_TRIM_PAD_MS / FRAME_MS)
+    first = max(0, int(voiced_idx[0]) - pad)
+    last = min(n_frames, int(voiced_idx[-1]) + 1 + pad)
+    trimmed = samples[first * _FRAME : last * _FRAME]
+    normalized = _normalize(trimmed, float(np.sqrt(np.mean(frames[voiced] ** 2))))
+    return PreparedClip(
+        normalized,
+        original_sec,
+        len(normalized) / float(TARGET_SAMPLE_RATE),
+        voiced_idx.size * FRAME_MS / 1000.0,
+    )
+
+
+def load_and_prepare(audio_path: str) -> Optional[PreparedClip]:
+    """Read a clip and prepare it; ``None`` if the format cannot be decoded here."""
+    try:
+        import soundfile as sf  # type: ignore[import-untyped]
+
+        data, sample_rate = sf.read(audio_path, dtype="float32", always_2d=False)
+    except Exception:
+        return None
+    return prepare_samples(to_mono_16k(int(sample_rate), data))
+
+
+class PreprocStats:
+    """Running totals of trimmed audio and estimated decode time saved."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.clips = 0
+        self.rejected = 0
+        self.audio_in_sec = 0.0
+        self.audio_kept_sec = 0.0
+        self.decoded_audio_sec = 0.0
+        self.decode_sec = 0.0
+
+    def record(self, clip: PreparedClip, decode_sec: Optional[float]) -> Dict[str, float]:
+        """Add one clip; returns its per-turn report."""
+        rejected = decode_sec is None
+        saved_sec = clip.original_sec if rejected else clip.saved_sec
+        with self._lock:
+            self.clips += 1
+            self.audio_in_sec += clip.original_sec
+            if rejected:
+                self.rejected += 1
+            else:
+                self.audio_kept_sec += clip.kept_sec
+                self.decoded_audio_sec += clip.kept_sec
+                self.decode_sec += decode_sec or 0.0
+            rtf = self.decode_sec / self.decoded_audio_sec if self.decoded_audio_sec else 0.0
+        return {
+            "audio_sec": clip.original_sec,
+            "kept_sec": 0.0 if rejected else clip.kept_sec,
+            "saved_sec": saved_sec,
+            "decode_sec": decode_sec or 0.0,
+            "decode_saved_sec": saved_sec * rtf,
+        }
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            rtf = self.decode_sec / self.decoded_audio_sec if self.decoded_audio_sec else 0.0
+            saved = self.audio_in_sec - self.audio_kept_sec
+            return {
+                "clips": float(self.clips),
+                "rejected": float(self.rejected),
+                "audio_in_sec": self.audio_in_sec,
+                "audio_saved_sec": saved,
+                "decode_rtf": rtf,
+                "decode_saved_sec": saved * rtf,
+            }
+
+
+PREPROC_STATS = PreprocStats()
+
+
+def format_report(report: Dict[str, float]) -> str:
+    return (
+        f"ASR pre-stage: {report['saved_sec']:.1f}s of {report['audio_sec']:.1f}s trimmed, "
+        f"~{report['decode_saved_sec']:.2f}s decode saved"
+    )
@@ -0,0 +1,223 @@
+"""Re-transcribe recorded sessions in bulk.
+
+Usage:
+    python batch_transcribe.py recordings/                 # every audio file below the directory
+    python batch_transcribe.py manifest.jsonl              # {"audio": ..., "language": ...} per line
+    python batch_transcribe.py recordings/ --workers 4 --batch-size 8
+
+Files are spread over a process pool; every worker loads Whisper once and uses
+faster-whisper's batched pipeline when available. Results are appended to a
+JSONL file next to ``results.csv`` (one line per recording, with segment
+timings), so an interrupted run resumes where it stopped.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from settings import ASR_BEAM_SIZE, ASR_COMPUTE_TYPE, ASR_MODEL_SIZE, RESULTS_PATH
+
+AUDIO_SUFFIXES = {".wav", ".flac", ".mp3", ".ogg", ".m4a", ".webm"}
+DEFAULT_OUTPUT = RESULTS_PATH.with_name("transcripts.jsonl")
+
+_model: Any = None
+_pipeline: Any = None
+_options: Dict[str, Any] = {}
+
+
+def collect_inputs(source: Path) -> List[Dict[str, Any]]:
+    """List recordings from a directory or a .jsonl/.txt manifest."""
+    if source.is_dir():
+        return [
+            {"audio": str(p), "language": p.parent.name if p.parent.name in ("en", "de") else None}
+            for p in sorted(source.rglob("*"))
+            if p.suffix.lower() in AUDIO_SUFFIXES
+        ]
+    items: List[Dict[str, Any]] = []
+    for line in source.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        entry = json.loads(line) if line.startswith("{") else {"audio": line}
+        audio = Path(entry["audio"])
+        if not audio.is_absolute():
+            audio = source.parent / audio
+        items.append({"audio": str(audio), "language": entry.get("language")})
+    return items
+
+
+def completed_paths(output: Path) -> Set[str]:
+    """Recordings already present in the output file (for resuming).
+
+    A torn last line from an interrupted run is cut off, so the records this
+    run appends start on a line of their own.
+    """
+    done: Set[str] = set()
+    if not output.exists():
+        return done
+    data = output.read_bytes()
+    keep = data.rfind(b"\n") + 1
+    if keep < len(data):
+        with open(output, "rb+") as fh:
+            fh.truncate(keep)
+    for line in data[:keep].splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if not entry.get("error"):
+            done.add(entry["audio"])
+    return done
+
+
+def _init_worker(size: str, compute_type: str, cpu_threads: int, beam_size: int, batch_size: int) -> None:
+    global _model, _pipeline, _options
+    from faster_whisper import WhisperModel  # type: ignore[import-untyped]
+
+    from model_bundle import resolve_whisper
+
+    source, local_only = resolve_whisper(size)
+    _model = WhisperModel(
+        source, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads, local_files_only=local_only
+    )
+    _pipeline = None
+    if batch_size > 1:
+        try:
+            from faster_whisper import BatchedInferencePipeline  # type: ignore[import-untyped]
+
+            _pipeline = BatchedInferencePipeline(model=_model)
+        except ImportError:
+            _pipeline = None
+    _options = {"beam_size": beam_size, "batch_size": batch_size}
+
+
+def _transcribe_one(item: Dict[str, Any]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        if _pipeline is not None:
+            segments, info = _pipeline.transcribe(
+                item["audio"],
+                language=item.get("language"),
+                beam_size=_options["beam_size"],
+                batch_size=_options["batch_size"],
+            )
+        else:
+            segments, info = _model.transcribe(
+                item["audio"], language=item.get("language"), beam_size=_options["beam_size"]
+            )
+        seg_list = [{"start": round(s.start, 2), "end": round(s.end, 2), "text": s.text.strip()} for s in segments]
+    except Exception as exc:  # pragma: no cover - corrupt file etc.
+        return {"audio": item["audio"], "error": str(exc), "decode_sec": time.perf_counter() - start}
+    return {
+        "audio": item["audio"],
+        "language": getattr(info, "language", None),
+        "duration_sec": float(getattr(info, "duration", 0.0) or 0.0),
+        "decode_sec": round(time.perf_counter() - start, 3),
+        "text": " ".join(s["text"] for s in seg_list).strip(),
+        "segments": seg_list,
+    }
+
+
+def run_batch(
+    items: List[Dict[str, Any]],
+    output: Path,
+    workers: int,
+    size: str,
+    compute_type: str,
+    cpu_threads: int,
+    beam_size: int,
+    batch_size: int,
+) -> Dict[str, float]:
+    """Transcribe ``items`` and append results to ``output``; returns throughput figures."""
+    audio_sec = 0.0
+    finished = 0
+    failed = 0
+    started = time.perf_counter()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "a", encoding="utf-8") as fh, ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(size, compute_type, cpu_threads, beam_size, batch_size),
+    ) as pool:
+        # Keep a bounded number of files in flight so an interrupt loses little work.
+        pending = set()
+        queue = iter(items)
+        for item in queue:
+            pending.add(pool.submit(_transcribe_one, item))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                fh.write(json.dumps(result, ensure_ascii=False) + "\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+                if result.get("error"):
+                    failed += 1
+                else:
+                    finished += 1
+                    audio_sec += result["duration_sec"]
+                nxt = next(queue, None)
+                if nxt is not None:
+                    pending.add(pool.submit(_transcribe_one, nxt))
+            elapsed = time.perf_counter() - started
+            print(
+                f"\r{finished + failed}/{len(items)} files, "
+                f"{audio_sec / elapsed if elapsed else 0.0:.1f} audio-h/h",
+                end="",
+                flush=True,
+            )
+    print()
+    wall = time.perf_counter() - started
+    return {
+        "files": float(finished),
+        "failed": float(failed),
+        "audio_hours": audio_sec / 3600.0,
+        "wall_hours": wall / 3600.0,
+        "audio_hours_per_hour": audio_sec / wall if wall else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", type=Path, help="Directory of recordings or a manifest file")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--model-size", default=ASR_MODEL_SIZE)
+    parser.add_argument("--compute-type", default=ASR_COMPUTE_TYPE)
+    parser.add_argument("--beam-size", type=int, default=ASR_BEAM_SIZE)
+    parser.add_argument("--batch-size", type=int, default=8, help="Batched pipeline size (1 = sequential decode)")
+    parser.add_argument("--cpu-threads", type=int, default=2, help="CTranslate2 threads per worker process")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (0 = cores / cpu-threads)")
+    args = parser.parse_args(argv)
+
+    items = collect_inputs(args.source)
+    done = completed_paths(args.output)
+    todo = [item for item in items if item["audio"] not in done]
+    print(f"{len(items)} recordings, {len(done)} already transcribed, {len(todo)} to go -> {args.output}")
+    if not todo:
+        return 0
+    workers = args.workers or max(1, (os.cpu_count() or 1) // max(1, args.cpu_threads))
+    stats = run_batch(
+        todo,
+        args.output,
+        workers,
+        args.model_size,
+        args.compute_type,
+        args.cpu_threads,
+        args.beam_size,
+        args.batch_size,
+    )
+    print(
+        f"Done: {int(stats['files'])} files ({int(stats['failed'])} failed), "
+        f"{stats['audio_hours']:.2f} audio-h in {stats['wall_hours'] * 60:.1f} min "
+        f"= {stats['audio_hours_per_hour']:.1f} audio-hours per hour"
+    )
+    return 0 if not stats["failed"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
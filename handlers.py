@@ -1,134 +1,149 @@
-import csv
 import datetime
 import time
-from concurrent.futures import Future, ThreadPoolExecutor
+import uuid
+from concurrent.futures import Future
 from typing import Any, Dict, Generator, List, Optional, Tuple
 
 import gradio as gr  # type: ignore[import-untyped]
 
-from audio_io import synthesize_speech, transcribe_audio
+from asr_stream import StreamingTranscriber
+from audio_io import (
+    NO_SPEECH,
+    SpeechResult,
+    notify_session_active,
+    submit_speech,
+    swap_whisper_model,
+    transcribe_audio,
+)
+from audio_preproc import format_report
 from data import SCENARIO_LABEL_TO_ID, SCENARIO_LOOKUP
 from llm_client import (
     call_llm,
     filter_by_language,
+    get_usage,
     looks_wrong_language,
+    reset_usage,
     rewrite_for_language,
     sanitize_llm_output,
     truncate_response,
 )
+from metrics import TURN_SECONDS
+from profiler import profiled, set_session_profiling
 from prompts import base_system_prompt, build_persona_summary, checkin_prompts, user_prompt
-from settings import RESULTS_PATH
-
-
-def ensure_results_file() -> None:
-    if RESULTS_PATH.exists():
-        return
-    header = [
-        "timestamp",
-        "participant_id",
-        "scenario_id",
-        "condition",
-        "O",
-        "C",
-        "E",
-        "A",
-        "N",
-        "dbq_violations",
-        "dbq_errors",
-        "dbq_lapses",
-        "bsss_experience",
-        "bsss_thrill",
-        "bsss_disinhibition",
-        "bsss_boredom",
-        "erq_reappraisal",
-        "erq_suppression",
-        "persona_summary",
-        "driver_transcript",
-        "llm_response",
-        "latency_sec",
-    ]
-    with open(RESULTS_PATH, "w", newline="", encoding="utf-8") as fh:
-        writer = csv.writer(fh)
-        writer.writerow(header)
+from results_writer import get_results_writer
+from session_journal import bind_session, journal_event, session_fields
+from session_store import get_session_store
+from settings import PROFILE_DIR
+from spans import render_waterfall, span, start_trace
 
 
 def append_result_row(row: Dict[str, Any]) -> str:
-    ensure_results_file()
-    with open(RESULTS_PATH, "a", newline="", encoding="utf-8") as fh:
-        writer = csv.writer(fh)
-        writer.writerow(
-            [
-                row.get("timestamp"),
-                row.get("participant_id"),
-                row.get("scenario_id"),
-                row.get("condition"),
-                row.get("O"),
-                row.get("C"),
-                row.get("E"),
-                row.get("A"),
-                row.get("N"),
-                row.get("dbq_violations"),
-                row.get("dbq_errors"),
-                row.get("dbq_lapses"),
-                row.get("bsss_experience"),
-                row.get("bsss_thrill"),
-                row.get("bsss_disinhibition"),
-                row.get("bsss_boredom"),
-                row.get("erq_reappraisal"),
-                row.get("erq_suppression"),
-                row.get("persona_summary"),
-                row.get("driver_transcript"),
-                row.get("llm_response"),
-                row.get("latency_sec"),
-            ]
-        )
+    """Hand the row to the background results writer; returns once it is journaled."""
+    writer = get_results_writer()
+    writer.submit(row)
+    error = writer.error()
+    if error:
+        return f"Saved to the pending journal only; writing results is failing and being retried ({error})."
     return "Saved."
 
 
-def _history_to_messages(history: List[Dict[str, str]]) -> List[Dict[str, str]]:
-    """Convert stored history to gr.Chatbot message format (role/content dicts)."""
-    messages: List[Dict[str, str]] = []
-    for msg in history:
-        role = (msg or {}).get("role")
-        content = (msg or {}).get("content")
-        if not role or content is None:
-            continue
-        messages.append({"role": role, "content": content})
-    print(f"DEBUG _history_to_messages: input={history}, output={messages}")  # DEBUG
-    return messages
+def _last_turn(state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fields of the station's last turn, kept in the session store under the key in ``state``."""
+    session = get_session_store().lookup((state or {}).get("session"))
+    return session.last_turn if session is not None else {}
 
 
 def save_condition(condition_key: str, state: Dict[str, Any]) -> str:
-    if not state or not state.get("conditions") or condition_key not in state["conditions"]:
+    turn = _last_turn(state)
+    if not turn.get("conditions") or condition_key not in turn["conditions"]:
         return "Nothing to save. Run the experiment first."
-    condition_info = state["conditions"][condition_key]
+    condition_info = turn["conditions"][condition_key]
     row = {
         "timestamp": datetime.datetime.utcnow().isoformat(),
-        "participant_id": state.get("participant_id", ""),
-        "scenario_id": state.get("scenario_id", ""),
+        "participant_id": turn.get("participant_id", ""),
+        "scenario_id": turn.get("scenario_id", ""),
         "condition": condition_info.get("condition", condition_key),
-        "O": state.get("O"),
-        "C": state.get("C"),
-        "E": state.get("E"),
-        "A": state.get("A"),
-        "N": state.get("N"),
-        "dbq_violations": state.get("dbq_violations"),
-        "dbq_errors": state.get("dbq_errors"),
-        "dbq_lapses": state.get("dbq_lapses"),
-        "bsss_experience": state.get("bsss_experience"),
-        "bsss_thrill": state.get("bsss_thrill"),
-        "bsss_disinhibition": state.get("bsss_disinhibition"),
-        "bsss_boredom": state.get("bsss_boredom"),
-        "erq_reappraisal": state.get("erq_reappraisal"),
-        "erq_suppression": state.get("erq_suppression"),
-        "persona_summary": state.get("persona_summary", ""),
-        "driver_transcript": state.get("transcript", ""),
+        "O": turn.get("O"),
+        "C": turn.get("C"),
+        "E": turn.get("E"),
+        "A": turn.get("A"),
+        "N": turn.get("N"),
+        "dbq_violations": turn.get("dbq_violations"),
+        "dbq_errors": turn.get("dbq_errors"),
+        "dbq_lapses": turn.get("dbq_lapses"),
+        "bsss_experience": turn.get("bsss_experience"),
+        "bsss_thrill": turn.get("bsss_thrill"),
+        "bsss_disinhibition": turn.get("bsss_disinhibition"),
+        "bsss_boredom": turn.get("bsss_boredom"),
+        "erq_reappraisal": turn.get("erq_reappraisal"),
+        "erq_suppression": turn.get("erq_suppression"),
+        "persona_summary": turn.get("persona_summary", ""),
+        "driver_transcript": turn.get("transcript", ""),
         "llm_response": condition_info.get("llm_response", ""),
         "latency_sec": condition_info.get("latency", 0.0),
+        "turn_id": turn.get("turn_id"),
     }
     return append_result_row(row)
 
 
+def handle_asr_swap(language: str, size: str, compute_type: str) -> str:
+    size = (size or "").strip()
+    if not size:
+        return "Please choose a Whisper model size."
+    return swap_whisper_model(language, size, compute_type)
+
+
+def handle_session_active(participant_id: str, language: str) -> None:
+    """Reload models the governor unloaded as soon as a participant ID is entered."""
+    if (participant_id or "").strip():
+        notify_session_active(language)
+
+
+def _session_id(request: Optional[gr.Request]) -> Optional[str]:
+    """Gradio session hash used to schedule ASR fairly across stations."""
+    return getattr(request, "session_hash", None) if request is not None else None
+
+
+def handle_stream_chunk(
+    chunk: Optional[Tuple[int, Any]],
+    stream_state: Optional[StreamingTranscriber],
+    language: str,
+    auto_submit: bool,
+    request: gr.Request = None,  # type: ignore[assignment]
+) -> Tuple[Any, Any, Optional[StreamingTranscriber], Any]:
+    """Feed one streamed mic chunk. Returns (transcript_box, stream_result, stream_state, trigger)."""
+    if chunk is None:
+        return gr.update(), gr.update(), stream_state, gr.update()
+    transcriber = stream_state
+    if not isinstance(transcriber, StreamingTranscriber) or transcriber.submitted:
+        transcriber = StreamingTranscriber(language_hint=language, session_id=_session_id(request))
+    sample_rate, samples = chunk
+    text, end_of_speech = transcriber.feed(sample_rate, samples)
+    if end_of_speech and auto_submit:
+        final_text = transcriber.finish()
+        transcriber.submitted = True
+        if final_text:
+            return final_text, _stream_result(transcriber, final_text), transcriber, uuid.uuid4().hex
+    return (text or gr.update()), gr.update(), transcriber, gr.update()
+
+
+def handle_stream_stop(
+    stream_state: Optional[StreamingTranscriber],
+    auto_submit: bool,
+) -> Tuple[Any, Any, None, Any]:
+    """Finalize the streamed utterance when push-to-talk is released."""
+    if not isinstance(stream_state, StreamingTranscriber) or stream_state.submitted:
+        return gr.update(), gr.update(), None, gr.update()
+    final_text = stream_state.finish()
+    trigger = uuid.uuid4().hex if auto_submit and final_text else gr.update()
+    return final_text, _stream_result(stream_state, final_text), None, trigger
+
+
+def _stream_result(transcriber: StreamingTranscriber, text: str) -> Optional[Dict[str, Any]]:
+    """Streamed transcript and Whisper's detected language, consumed by the next run."""
+    return {"text": text, "lang": transcriber.detected_lang} if text else None
+
+
 # Type aliases for clarity
 ValidationResult = Optional[Tuple[str, str, Any, None, Any, None, str, str, List[Any], List[Any], Dict[str, Any]]]
 TranscriptResult = Tuple[str, Optional[str], str]
@@ -215,18 +230,26 @@ def _get_transcript(
     manual_text: str,
     language: str,
     scenario_id: str,
+    session_id: Optional[str] = None,
+    asr_report: Optional[Dict[str, float]] = None,
+    streamed: Optional[Dict[str, Any]] = None,
 ) -> TranscriptResult:
-    """Get transcript from audio or manual text. Returns (transcript, error, detected_lang)."""
+    """Get transcript from a streamed utterance, manual text or audio. Returns (transcript, error, detected_lang)."""
     manual_text = (manual_text or "").strip()
     transcript_error: Optional[str] = None
     detected_lang: Optional[str] = None
     
-    if manual_text:
+    if streamed and (streamed.get("text") or "").strip():
+        transcript = streamed["text"].strip()
+        detected_lang = streamed.get("lang") or language
+    elif manual_text:
         transcript = manual_text
         detected_lang = language
     else:
-        transcript, transcript_error, detected_lang = transcribe_audio(audio_path, language_hint=language)
-        if not transcript:
+        transcript, transcript_error, detected_lang = transcribe_audio(
+            audio_path, language_hint=language, session_id=session_id, report=asr_report
+        )
+        if not transcript and transcript_error != NO_SPEECH:  # nothing recorded: demo with the scenario text
             transcript = SCENARIO_LOOKUP[scenario_id]["text"]
     
     response_lang = detected_lang if detected_lang in ("en", "de") else language
@@ -247,14 +270,16 @@ def _generate_llm_response(
     
     Returns: (cleaned_response, llm_error, latency, debug_prompt)
     """
-    base_system = base_system_prompt(scenario_id, response_lang)
-    system_prompt = base_system
-    if condition == "personalized":
-        system_prompt = f"{base_system} Persona hints: {persona_summary}"
-    
-    user_prompt_text = user_prompt(transcript, response_lang)
-    prompt_debug = f"SYSTEM:\\n{system_prompt}\\n\\nUSER:\\n{user_prompt_text}"
+    with span("prompt"):
+        base_system = base_system_prompt(scenario_id, response_lang)
+        system_prompt = base_system
+        if condition == "personalized":
+            system_prompt = f"{base_system} Persona hints: {persona_summary}"
+
+        user_prompt_text = user_prompt(transcript, response_lang)
+        prompt_debug = f"SYSTEM:\\n{system_prompt}\\n\\nUSER:\\n{user_prompt_text}"
     
+    reset_usage()
     start_time = time.time()
     llm_response, llm_error = call_llm(
         endpoint_url,
@@ -267,17 +292,34 @@ def _generate_llm_response(
     
     if llm_error or not llm_response:
         error_msg = f"{condition.title()} error: {llm_error or 'No response'}"
-        return error_msg, llm_error or "No response", llm_latency, prompt_debug
-    
-    cleaned_response = sanitize_llm_output(llm_response)
-    cleaned_response = filter_by_language(cleaned_response, response_lang)
-    if looks_wrong_language(cleaned_response, response_lang):
-        rewritten = rewrite_for_language(endpoint_url, model_name, cleaned_response, response_lang)
-        if rewritten:
-            cleaned_response = rewritten
-    cleaned_response = truncate_response(cleaned_response, response_lang)
-    
-    return cleaned_response, None, llm_latency, prompt_debug
+        result = (error_msg, llm_error or "No response", llm_latency, prompt_debug)
+    else:
+        with span("postprocess"):
+            cleaned_response = sanitize_llm_output(llm_response)
+            cleaned_response = filter_by_language(cleaned_response, response_lang)
+            if looks_wrong_language(cleaned_response, response_lang):
+                rewritten = rewrite_for_language(endpoint_url, model_name, cleaned_response, response_lang)
+                if rewritten:
+                    cleaned_response = rewritten
+            cleaned_response = truncate_response(cleaned_response, response_lang)
+        result = (cleaned_response, None, llm_latency, prompt_debug)
+
+    journal_event(
+        "turn",
+        endpoint=endpoint_url,
+        model=model_name,
+        scenario_id=scenario_id,
+        transcript=transcript,
+        response_lang=response_lang,
+        persona_summary=persona_summary,
+        condition=condition,
+        history=list(existing_history),
+        response=result[0],
+        error=result[1],
+        latency_sec=time.time() - start_time,
+        **get_usage(),
+    )
+    return result
 
 
 def _response_classes(condition: str) -> List[str]:
@@ -290,6 +332,7 @@ def _response_classes(condition: str) -> List[str]:
     return classes
 
 
+@profiled("handle_run")
 def handle_run(
     participant_id: str,
     scenario_label: str,
@@ -314,6 +357,8 @@ def handle_run(
     audio_path: Optional[str],
     manual_text: str = "",
     state: Optional[Dict[str, Any]] = None,
+    stream_result: Optional[Dict[str, Any]] = None,
+    request: gr.Request = None,  # type: ignore[assignment]
 ) -> Generator[Tuple[Any, ...], None, None]:
     """Main handler for experiment runs. Generates LLM responses for 1-2 conditions."""
     state = state or {}
@@ -321,42 +366,58 @@ def handle_run(
     # Validate inputs
     validation_error = _validate_inputs(endpoint_url, model_name, scenario_label)
     if validation_error:
-        yield validation_error
+        yield (*validation_error, gr.update())
         return
     
     scenario_id = SCENARIO_LABEL_TO_ID.get(scenario_label, scenario_label)
+    turn_id = uuid.uuid4().hex
+    bind_session(session_id=_session_id(request), participant_id=participant_id, turn_id=turn_id)
+    # Gradio runs every step of this generator in a fresh copy of the context, so
+    # the binding is gone after the first yield; events recorded later pass it along.
+    journal_ids = session_fields()
+    trace = start_trace("turn")
     
-    # Get conversation history
-    existing_history: Dict[str, List[Dict[str, str]]] = {}
-    for key, history in (state.get("chat_history") or {}).items():
-        try:
-            existing_history[key] = [dict(msg) for msg in history]  # shallow copy
-        except Exception:
-            existing_history[key] = []
+    # Conversation history lives in the session store; gr.State only carries its key
+    store = get_session_store()
+    session = store.get(state.get("session") or _session_id(request))
     
     # Get transcript
-    transcript, transcript_error, response_lang = _get_transcript(
-        audio_path, manual_text, language, scenario_id
-    )
+    asr_report: Dict[str, float] = {}
+    with span("asr"):
+        transcript, transcript_error, response_lang = _get_transcript(
+            audio_path, manual_text, language, scenario_id, _session_id(request), asr_report, stream_result
+        )
+    if transcript_error == NO_SPEECH:  # a rejected clip: no LLM call, nothing added to the history
+        trace.finish()
+        message = (
+            "Keine Sprache erkannt, bitte Taste drücken und erneut sprechen."
+            if response_lang == "de"
+            else "No speech detected, please press to talk and speak again."
+        )
+        if asr_report:
+            message = f"{message}\n[{format_report(asr_report)}]"
+        yield (message, *(gr.update() for _ in range(9)), state, gr.update())
+        return
 
     # Build persona summary
-    persona_summary = build_persona_summary(
-        o,
-        c,
-        e,
-        a,
-        n,
-        dbq_violations,
-        dbq_errors,
-        dbq_lapses,
-        bsss_experience,
-        bsss_thrill,
-        bsss_disinhibition,
-        bsss_boredom,
-        erq_reappraisal,
-        erq_suppression,
-        response_lang,
-    )
+    with span("persona"):
+        persona_summary = build_persona_summary(
+            o,
+            c,
+            e,
+            a,
+            n,
+            dbq_violations,
+            dbq_errors,
+            dbq_lapses,
+            bsss_experience,
+            bsss_thrill,
+            bsss_disinhibition,
+            bsss_boredom,
+            erq_reappraisal,
+            erq_suppression,
+            response_lang,
+        )
 
     # Determine which conditions to run
     order: Tuple[str, ...]
@@ -370,14 +431,14 @@ def handle_run(
     # Generate responses for each condition
     outputs: List[ConditionResult] = []
     condition_data: Dict[str, Dict[str, Any]] = {}
-    tts_futures: Dict[str, Optional[Future[Tuple[Optional[str], Optional[str]]]]] = {}
+    tts_futures: Dict[str, Optional[Future[SpeechResult]]] = {}
     prompt_debug: Dict[str, str] = {}
 
-    with ThreadPoolExecutor(max_workers=1) as tts_pool:
-        for idx, condition in enumerate(order, start=1):
-            condition_key = f"condition{idx}"
-            
-            # Generate LLM response
+    for idx, condition in enumerate(order, start=1):
+        condition_key = f"condition{idx}"
+        
+        # Generate LLM response
+        with span(f"llm {condition}"):
             llm_response, llm_error, llm_latency, debug_prompt = _generate_llm_response(
                 endpoint_url,
                 model_name,
@@ -386,171 +447,194 @@ def handle_run(
                 response_lang,
                 persona_summary,
                 condition,
-                existing_history.get(condition, []),
+                session.messages(condition),
             )
-            
-            prompt_debug[condition_key] = debug_prompt
-            
-            # Store response data
-            if llm_error:
-                outputs.append((llm_response, None, llm_latency, condition))
-                condition_data[condition_key] = {
-                    "condition": condition,
-                    "llm_response": llm_response,
-                    "audio_path": None,
-                    "latency": llm_latency,
-                    "llm_error": llm_error,
-                }
-                tts_futures[condition_key] = None
-            else:
-                outputs.append((llm_response, None, llm_latency, condition))
-                condition_data[condition_key] = {
-                    "condition": condition,
-                    "llm_response": llm_response,
-                    "audio_path": None,
-                    "latency": llm_latency,
-                    "llm_error": None,
-                }
-                # Queue TTS generation
-                tts_futures[condition_key] = tts_pool.submit(
-                    synthesize_speech, llm_response, response_lang, f"{condition}_{idx}"
+        
+        prompt_debug[condition_key] = debug_prompt
+        
+        # Store response data
+        if llm_error:
+            outputs.append((llm_response, None, llm_latency, condition))
+            condition_data[condition_key] = {
+                "condition": condition,
+                "llm_response": llm_response,
+                "audio_path": None,
+                "latency": llm_latency,
+                "llm_error": llm_error,
+            }
+            tts_futures[condition_key] = None
+        else:
+            outputs.append((llm_response, None, llm_latency, condition))
+            condition_data[condition_key] = {
+                "condition": condition,
+                "llm_response": llm_response,
+                "audio_path": None,
+                "latency": llm_latency,
+                "llm_error": None,
+            }
+            # Queue TTS generation
+            tts_futures[condition_key] = submit_speech(llm_response, response_lang, f"{condition}_{idx}")
+        
+        # Update conversation history
+        # Store raw transcript for chatbot display, but LLM gets the wrapped prompt
+        store.append(session, condition, transcript, llm_response)
+
+    while len(outputs) < 2:
+        outputs.append(("", None, 0.0, ""))
+
+    cond1, cond2 = outputs[0], outputs[1]
+    turn = {
+        "turn_id": turn_id,
+        "participant_id": participant_id,
+        "scenario_id": scenario_id,
+        "persona_summary": persona_summary,
+        "transcript": transcript,
+        "response_lang": response_lang,
+        "O": o,
+        "C": c,
+        "E": e,
+        "A": a,
+        "N": n,
+        "dbq_violations": dbq_violations,
+        "dbq_errors": dbq_errors,
+        "dbq_lapses": dbq_lapses,
+        "bsss_experience": bsss_experience,
+        "bsss_thrill": bsss_thrill,
+        "bsss_disinhibition": bsss_disinhibition,
+        "bsss_boredom": bsss_boredom,
+        "erq_reappraisal": erq_reappraisal,
+        "erq_suppression": erq_suppression,
+        "conditions": condition_data,
+        "prompts": prompt_debug,
+        "stage_timings": trace.stages(),
+    }
+    store.set_last_turn(session, turn)
+    state = {"session": session.key}
+
+    cond1_text = f"{cond1[3].replace('_', ' ').title() or 'Condition 1'}: {cond1[0]}"
+    cond2_text = f"{cond2[3].replace('_', ' ').title() or 'Condition 2'}: {cond2[0]}"
+
+    cond1_latency = f"{cond1[2]:.2f}s" if cond1[2] else ""
+    cond2_latency = f"{cond2[2]:.2f}s" if cond2[2] else ""
+
+    persona_display = persona_summary
+    transcript_display = transcript
+    if transcript_error:
+        transcript_display = f"{transcript}\\n[{transcript_error}]"
+    if asr_report:
+        transcript_display = f"{transcript_display}\n[{format_report(asr_report)}]"
+
+    cond1_display_text = f"{cond1_text}\\nLLM latency: {cond1_latency}"
+    cond2_display_text = ""
+    if len(order) > 1:
+        cond2_display_text = f"{cond2_text}\\nLLM latency: {cond2_latency}"
+
+    yield (
+        transcript_display,
+        persona_display,
+        gr.update(
+            value=cond1_display_text,
+            elem_classes=_response_classes(cond1[3]),
+        ),
+        None,
+        gr.update(
+            value=cond2_display_text,
+            elem_classes=_response_classes(cond2[3]),
+        ),
+        None,
+        prompt_debug.get("condition1", ""),
+        prompt_debug.get("condition2", ""),
+        session.messages(cond1[3]),
+        session.messages(cond2[3]),
+        state,
+        None,  # the streamed utterance is consumed
+    )
+
+    tts_note = (
+        "TTS aktuell nicht verfügbar, bitte Text lesen."
+        if response_lang == "de"
+        else "TTS unavailable right now, please read the text."
+    )
+
+    for condition_key, condition_display in (
+        ("condition1", cond1[3]),
+        ("condition2", cond2[3]),
+    ):
+        future = tts_futures.get(condition_key)
+        info = (condition_data.get(condition_key) or {}).copy()
+        if not future or info.get("llm_error"):
+            continue
+
+        try:
+            tts_path, tts_error, tts_warning = future.result()
+        except Exception as exc:  # pragma: no cover - runtime safeguard
+            tts_path, tts_error, tts_warning = None, f"TTS error: {exc}", None
+        
+        # Update condition_data properly
+        if condition_key in condition_data:
+            condition_data[condition_key]["audio_path"] = tts_path
+            condition_data[condition_key]["tts_error"] = tts_error
+            condition_data[condition_key]["tts_note"] = tts_warning
+        note = tts_note if tts_error else tts_warning
+        turn["stage_timings"] = trace.stages()
+        store.set_last_turn(session, turn)
+
+        cond1_audio_out = gr.update()
+        cond2_audio_out = gr.update()
+        cond1_text_out = gr.update()
+        cond2_text_out = gr.update()
+
+        if condition_key == "condition1":
+            cond1_audio_out = tts_path
+            if note and note not in cond1_display_text:
+                cond1_display_text = f"{cond1_display_text}\n[{note}]".strip()
+                cond1_text_out = gr.update(
+                    value=cond1_display_text,
+                    elem_classes=_response_classes(condition_display),
+                )
+        else:
+            cond2_audio_out = tts_path
+            if note and note not in cond2_display_text:
+                cond2_display_text = f"{cond2_display_text}\n[{note}]".strip()
+                cond2_text_out = gr.update(
+                    value=cond2_display_text,
+                    elem_classes=_response_classes(condition_display),
                 )
-            
-            # Update conversation history
-            # Store raw transcript for chatbot display, but LLM gets the wrapped prompt
-            new_history = list(existing_history.get(condition, []))
-            new_history.append({"role": "user", "content": transcript})
-            new_history.append({"role": "assistant", "content": llm_response})
-            existing_history[condition] = new_history
-
-        while len(outputs) < 2:
-            outputs.append(("", None, 0.0, ""))
-
-        cond1, cond2 = outputs[0], outputs[1]
-        state = {
-            "participant_id": participant_id,
-            "scenario_id": scenario_id,
-            "persona_summary": persona_summary,
-            "transcript": transcript,
-            "response_lang": response_lang,
-            "O": o,
-            "C": c,
-            "E": e,
-            "A": a,
-            "N": n,
-            "dbq_violations": dbq_violations,
-            "dbq_errors": dbq_errors,
-            "dbq_lapses": dbq_lapses,
-            "bsss_experience": bsss_experience,
-            "bsss_thrill": bsss_thrill,
-            "bsss_disinhibition": bsss_disinhibition,
-            "bsss_boredom": bsss_boredom,
-            "erq_reappraisal": erq_reappraisal,
-            "erq_suppression": erq_suppression,
-            "conditions": condition_data,
-            "prompts": prompt_debug,
-            "chat_history": existing_history,
-        }
-
-        cond1_text = f"{cond1[3].replace('_', ' ').title() or 'Condition 1'}: {cond1[0]}"
-        cond2_text = f"{cond2[3].replace('_', ' ').title() or 'Condition 2'}: {cond2[0]}"
-
-        cond1_latency = f"{cond1[2]:.2f}s" if cond1[2] else ""
-        cond2_latency = f"{cond2[2]:.2f}s" if cond2[2] else ""
-
-        persona_display = persona_summary
-        transcript_display = transcript
-        if transcript_error:
-            transcript_display = f"{transcript}\\n[{transcript_error}]"
-
-        cond1_display_text = f"{cond1_text}\\nLLM latency: {cond1_latency}"
-        cond2_display_text = ""
-        if len(order) > 1:
-            cond2_display_text = f"{cond2_text}\\nLLM latency: {cond2_latency}"
 
         yield (
-            transcript_display,
-            persona_display,
-            gr.update(
-                value=cond1_display_text,
-                elem_classes=_response_classes(cond1[3]),
-            ),
-            None,
-            gr.update(
-                value=cond2_display_text,
-                elem_classes=_response_classes(cond2[3]),
-            ),
-            None,
-            prompt_debug.get("condition1", ""),
-            prompt_debug.get("condition2", ""),
-            _history_to_messages(existing_history.get(cond1[3], [])),
-            _history_to_messages(existing_history.get(cond2[3], [])),
+            gr.update(),
+            gr.update(),
+            cond1_text_out,
+            cond1_audio_out,
+            cond2_text_out,
+            cond2_audio_out,
+            gr.update(),
+            gr.update(),
+            gr.update(),
+            gr.update(),
             state,
+            gr.update(),
         )
 
-        tts_note = (
-            "TTS aktuell nicht verfügbar, bitte Text lesen."
-            if response_lang == "de"
-            else "TTS unavailable right now, please read the text."
-        )
+    trace.finish()
+    turn["stage_timings"] = trace.stages()
+    store.set_last_turn(session, turn)
+    TURN_SECONDS.observe(turn["stage_timings"][0]["duration_ms"] / 1000)
+    journal_event("spans", stages=turn["stage_timings"], **journal_ids)
+
+
+def handle_profile_toggle(enabled: bool, request: gr.Request = None) -> str:  # type: ignore[assignment]
+    """Profile (or stop profiling) this station's turns."""
+    set_session_profiling(_session_id(request), bool(enabled))
+    return f"Profiling this session's turns into {PROFILE_DIR}" if enabled else ""
 
-        for condition_key, condition_display in (
-            ("condition1", cond1[3]),
-            ("condition2", cond2[3]),
-        ):
-            future = tts_futures.get(condition_key)
-            info = (condition_data.get(condition_key) or {}).copy()
-            if not future or info.get("llm_error"):
-                continue
-
-            try:
-                tts_path, tts_error = future.result()
-            except Exception as exc:  # pragma: no cover - runtime safeguard
-                tts_path, tts_error = None, f"TTS error: {exc}"
-            
-            # Update condition_data properly
-            if condition_key in condition_data:
-                condition_data[condition_key]["audio_path"] = tts_path
-                condition_data[condition_key]["tts_error"] = tts_error
-            state["conditions"] = condition_data
-
-            cond1_audio_out = gr.update()
-            cond2_audio_out = gr.update()
-            cond1_text_out = gr.update()
-            cond2_text_out = gr.update()
-
-            if condition_key == "condition1":
-                cond1_audio_out = tts_path
-                if tts_error and tts_note not in cond1_display_text:
-                    cond1_display_text = f"{cond1_display_text}\n[{tts_note}]".strip()
-                    cond1_text_out = gr.update(
-                        value=cond1_display_text,
-                        elem_classes=_response_classes(condition_display),
-                    )
-            else:
-                cond2_audio_out = tts_path
-                if tts_error and tts_note not in cond2_display_text:
-                    cond2_display_text = f"{cond2_display_text}\n[{tts_note}]".strip()
-                    cond2_text_out = gr.update(
-                        value=cond2_display_text,
-                        elem_classes=_response_classes(condition_display),
-                    )
-
-            yield (
-                gr.update(),
-                gr.update(),
-                cond1_text_out,
-                cond1_audio_out,
-                cond2_text_out,
-                cond2_audio_out,
-                gr.update(),
-                gr.update(),
-                gr.update(),
-                gr.update(),
-                state,
-            )
 
+def handle_turn_waterfall(state: Optional[Dict[str, Any]]) -> str:
+    """Waterfall of the last turn's stages for the debug section."""
+    return render_waterfall(_last_turn(state).get("stage_timings"))
 
+
+@profiled("handle_checkin")
 def handle_checkin(
     participant_id: str,
     scenario_label: str,
@@ -572,60 +656,70 @@ def handle_checkin(
     language: str,
     endpoint_url: str,
     model_name: str,
+    request: gr.Request = None,  # type: ignore[assignment]
 ) -> Generator[Tuple[Any, ...], None, None]:
+    bind_session(session_id=_session_id(request), participant_id=participant_id, turn_id=uuid.uuid4().hex)
+    journal_ids = session_fields()  # the binding does not survive a yield, see handle_run
     if not endpoint_url.strip():
-        yield "Bitte Endpoint eintragen.", None, ""
+        yield "Bitte Endpoint eintragen.", None, "", ""
         return
     if not model_name.strip():
-        yield "Bitte Modellnamen eintragen.", None, ""
+        yield "Bitte Modellnamen eintragen.", None, "", ""
         return
+    trace = start_trace("check-in")
     scenario_id = SCENARIO_LABEL_TO_ID.get(scenario_label, scenario_label)
     response_lang = language if language in ("en", "de") else "en"
-    persona_summary = build_persona_summary(
-        o,
-        c,
-        e,
-        a,
-        n,
-        dbq_violations,
-        dbq_errors,
-        dbq_lapses,
-        bsss_experience,
-        bsss_thrill,
-        bsss_disinhibition,
-        bsss_boredom,
-        erq_reappraisal,
-        erq_suppression,
-        response_lang,
-    )
+    with span("persona"):
+        persona_summary = build_persona_summary(
+            o,
+            c,
+            e,
+            a,
+            n,
+            dbq_violations,
+            dbq_errors,
+            dbq_lapses,
+            bsss_experience,
+            bsss_thrill,
+            bsss_disinhibition,
+            bsss_boredom,
+            erq_reappraisal,
+            erq_suppression,
+            response_lang,
+        )
     include_persona = run_mode != "non_personalized"
-    system_prompt, user_prompt_text = checkin_prompts(
-        scenario_id, response_lang, persona_summary, include_persona=include_persona
-    )
+    with span("prompt"):
+        system_prompt, user_prompt_text = checkin_prompts(
+            scenario_id, response_lang, persona_summary, include_persona=include_persona
+        )
     prompt_debug = f"SYSTEM:\n{system_prompt}\n\nUSER:\n{user_prompt_text}"
     llm_response, llm_error = call_llm(endpoint_url, model_name, system_prompt, user_prompt_text)
     if llm_error or not llm_response:
-        yield f"Check-in error: {llm_error or 'No response'}", None, prompt_debug
+        trace.finish()
+        yield f"Check-in error: {llm_error or 'No response'}", None, prompt_debug, render_waterfall(trace.stages())
         return
-    cleaned = sanitize_llm_output(llm_response)
-    cleaned = filter_by_language(cleaned, response_lang)
-    if looks_wrong_language(cleaned, response_lang):
-        rewritten = rewrite_for_language(endpoint_url, model_name, cleaned, response_lang)
-        if rewritten:
-            cleaned = rewritten
-    cleaned = truncate_response(cleaned, response_lang)
-
-    with ThreadPoolExecutor(max_workers=1) as tts_pool:
-        future = tts_pool.submit(synthesize_speech, cleaned, response_lang, "checkin")
-        yield cleaned, None, prompt_debug
-
-        try:
-            tts_path, tts_error = future.result()
-        except Exception as exc:  # pragma: no cover - runtime safeguard
-            tts_path, tts_error = None, f"TTS error: {exc}"
+    with span("postprocess"):
+        cleaned = sanitize_llm_output(llm_response)
+        cleaned = filter_by_language(cleaned, response_lang)
+        if looks_wrong_language(cleaned, response_lang):
+            rewritten = rewrite_for_language(endpoint_url, model_name, cleaned, response_lang)
+            if rewritten:
+                cleaned = rewritten
+        cleaned = truncate_response(cleaned, response_lang)
+
+    future = submit_speech(cleaned, response_lang, "checkin")
+    yield cleaned, None, prompt_debug, render_waterfall(trace.stages())
+
+    try:
+        tts_path, tts_error, tts_warning = future.result()
+    except Exception as exc:  # pragma: no cover - runtime safeguard
+        tts_path, tts_error, tts_warning = None, f"TTS error: {exc}", None
+    trace.finish()
+    journal_event("spans", stages=trace.stages(), **journal_ids)
 
     if not tts_error:
-        yield gr.update(), tts_path, gr.update()
+        text_out = f"{cleaned}\n[{tts_warning}]" if tts_warning else gr.update()
+        yield text_out, tts_path, gr.update(), render_waterfall(trace.stages())
         return
 
     tts_note = (
@@ -636,4 +730,4 @@ def handle_checkin(
     updated_text = cleaned
     if tts_note not in updated_text:
         updated_text = f"{updated_text}\n[{tts_note}]".strip()
-    yield updated_text, tts_path, gr.update()
+    yield updated_text, tts_path, gr.update(), render_waterfall(trace.stages())
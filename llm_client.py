@@ -1,9 +1,15 @@
 import re
+import threading
+import time
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import requests  # type: ignore[import-untyped]
 
+from metrics import ERRORS, LLM_SECONDS, REWRITES
+from session_journal import journal_event
+from spans import span
 from settings import DEFAULT_TEMPERATURE, DEFAULT_TOP_P, MAX_GENERATION_TOKENS
+from thread_budget import llm_threads
 
 
 def detect_api_style(base_url: str) -> str:
@@ -30,6 +36,33 @@ def normalized_url(base_url: str, style: str) -> str:
     return f"{stripped}/v1/chat/completions"
 
 
+_usage = threading.local()
+
+
+def reset_usage() -> None:
+    """Zero this thread's token counters."""
+    _usage.prompt_tokens = 0
+    _usage.completion_tokens = 0
+
+
+def get_usage() -> Dict[str, int]:
+    """Tokens used by this thread's LLM calls since the last ``reset_usage``."""
+    return {
+        "prompt_tokens": getattr(_usage, "prompt_tokens", 0),
+        "completion_tokens": getattr(_usage, "completion_tokens", 0),
+    }
+
+
+def _add_usage(style: str, data: Dict[str, Any]) -> None:
+    if style == "ollama":
+        prompt, completion = data.get("prompt_eval_count"), data.get("eval_count")
+    else:
+        usage = data.get("usage") or {}
+        prompt, completion = usage.get("prompt_tokens"), usage.get("completion_tokens")
+    _usage.prompt_tokens = getattr(_usage, "prompt_tokens", 0) + int(prompt or 0)
+    _usage.completion_tokens = getattr(_usage, "completion_tokens", 0) + int(completion or 0)
+
+
 def call_llm(
     endpoint: str,
     model: str,
@@ -37,6 +70,42 @@ def call_llm(
     user_prompt: str,
     max_tokens: int = MAX_GENERATION_TOKENS,
     chat_history: Optional[List[Dict[str, str]]] = None,
+    num_thread: Optional[int] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    started = time.perf_counter()
+    before = get_usage()
+    with span("llm_request"):
+        content, error = _request_llm(endpoint, model, system_prompt, user_prompt, max_tokens, chat_history, num_thread)
+    after = get_usage()
+    latency = time.perf_counter() - started
+    LLM_SECONDS.observe(latency, model)
+    if error:
+        ERRORS.inc("llm")
+    journal_event(
+        "llm",
+        endpoint=endpoint,
+        model=model,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        history_len=len(chat_history or []),
+        max_tokens=max_tokens,
+        response=content,
+        error=error,
+        latency_sec=latency,
+        prompt_tokens=after["prompt_tokens"] - before["prompt_tokens"],
+        completion_tokens=after["completion_tokens"] - before["completion_tokens"],
+    )
+    return content, error
+
+
+def _request_llm(
+    endpoint: str,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    max_tokens: int,
+    chat_history: Optional[List[Dict[str, str]]],
+    num_thread: Optional[int],
 ) -> Tuple[Optional[str], Optional[str]]:
     style = detect_api_style(endpoint)
     url = normalized_url(endpoint, style)
@@ -60,6 +129,9 @@ def call_llm(
             "temperature": DEFAULT_TEMPERATURE,
             "top_p": DEFAULT_TOP_P,
         }
+        num_thread = llm_threads() if num_thread is None else num_thread
+        if num_thread:
+            payload["options"]["num_thread"] = num_thread
     else:
         payload["max_tokens"] = max_tokens
         payload["temperature"] = DEFAULT_TEMPERATURE
@@ -82,6 +154,7 @@ def call_llm(
     except Exception as exc:
         return None, f"LLM request failed ({url}): {exc}"
 
+    _add_usage(style, data or {})
     if style == "ollama":
         content = (data or {}).get("message", {}).get("content")
     else:
@@ -263,7 +336,9 @@ def rewrite_for_language(endpoint: str, model: str, text: str, lang: str) -> Opt
         "No lists, no meta, no quotes."
     )
     user_prompt = f"Rewrite this as two sentences in {target}: {text}"
-    rewritten, err = call_llm(endpoint, model, system_prompt, user_prompt, max_tokens=MAX_GENERATION_TOKENS // 2)
+    REWRITES.inc()
+    with span("rewrite"):
+        rewritten, err = call_llm(endpoint, model, system_prompt, user_prompt, max_tokens=MAX_GENERATION_TOKENS // 2)
     if err or not rewritten:
         return None
     cleaned = sanitize_llm_output(rewritten)
@@ -0,0 +1,125 @@
+"""Structured, non-blocking logging for the app and the model server.
+
+``configure_logging()`` routes every record through a ``QueueHandler``; a
+``QueueListener`` thread formats and writes them, so a log call on the request
+path costs an enqueue. On top of the standard levels:
+
+- per-module levels: ``LOG_LEVELS="handlers=DEBUG,audio_io=WARNING"`` (``LOG_LEVEL`` for the rest);
+- rate limiting: at most ``LOG_RATE_LIMIT`` records per message template every
+  ``LOG_RATE_WINDOW_SEC``; the next record that passes carries the number suppressed;
+- sampling: ``logger.debug(..., extra={"sample": 0.01})`` keeps about 1 % of those records;
+- ``LOG_FORMAT=json`` writes one JSON object per line with any ``extra`` fields;
+  ``LOG_FILE`` sends the output to a file instead of stderr.
+
+Modules log through ``logging.getLogger(__name__)`` as usual.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from settings import LOG_FILE, LOG_FORMAT, LOG_LEVEL, LOG_LEVELS, LOG_RATE_LIMIT, LOG_RATE_WINDOW_SEC
+
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sample"}
+
+
+class SampleFilter(logging.Filter):
+    """Drops records whose ``sample`` extra (a probability) loses the draw."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample", None)
+        return rate is None or random.random() < float(rate)
+
+
+class RateLimitFilter(logging.Filter):
+    """At most ``limit`` records per (logger, message template) and window."""
+
+    def __init__(self, limit: int = LOG_RATE_LIMIT, window_sec: float = LOG_RATE_WINDOW_SEC) -> None:
+        super().__init__()
+        self.limit = limit
+        self.window_sec = window_sec
+        self._windows: Dict[Tuple[str, str], Tuple[float, int, int]] = {}  # start, passed, suppressed
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            start, passed, suppressed = self._windows.get(key, (now, 0, 0))
+            if now - start >= self.window_sec:
+                start, passed = now, 0
+            if passed >= self.limit:
+                self._windows[key] = (start, passed, suppressed + 1)
+                return False
+            self._windows[key] = (start, passed + 1, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _STANDARD_ATTRS})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """``time level logger: message key=value ...`` with the ``extra`` fields appended."""
+
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = " ".join(f"{k}={v}" for k, v in vars(record).items() if k not in _STANDARD_ATTRS)
+        return f"{line} {extras}" if extras else line
+
+
+def _parse_levels(value: str) -> Dict[str, str]:
+    levels: Dict[str, str] = {}
+    for item in value.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def configure_logging(filename: str = LOG_FILE) -> None:
+    """Install the queue handler on the root logger (idempotent)."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        output: logging.Handler = logging.FileHandler(filename) if filename else logging.StreamHandler()
+        output.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+        records: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        handler = logging.handlers.QueueHandler(records)
+        handler.addFilter(SampleFilter())
+        handler.addFilter(RateLimitFilter())
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL.upper())
+        for name, level in _parse_levels(LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+        _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
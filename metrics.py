@@ -0,0 +1,195 @@
+"""Prometheus-style ``/metrics`` endpoint served next to the Gradio app (``METRICS=1``).
+
+- histograms: ASR decode, LLM request, TTS synthesis and end-to-end turn latency;
+- counters: errors per stage, language rewrites, TTS fallbacks to silence,
+  cache hits and misses (Whisper models, XTTS speaker latents);
+- gauges, read at scrape time: ASR / TTS / results / journal queue depths,
+  held sessions and their size, resident models and their RSS, ``tmp_audio``
+  disk usage, process RSS, plus the preprocessing and codec running totals.
+
+Only the standard text exposition format is produced, so no client library is
+needed. With ``MODEL_SERVER_ADDRESS`` set the model gauges describe the app
+process only; the model server keeps its own figures in its status.
+"""
+import bisect
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0)
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    parts = [
+        f'{name}="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values) or ({(): 0.0} if not self.labelnames else {})
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {v:g}" for k, v in sorted(values.items())]
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}  # bucket counts..., +Inf count, sum
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(labels, [0.0] * (len(self.buckets) + 2))
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative:g}")
+            cumulative += series[len(self.buckets)]
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, inf)} {cumulative:g}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]:g}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative:g}")
+        return lines
+
+
+ASR_SECONDS = Histogram("sensai_asr_seconds", "Whisper transcription latency (queue + decode)")
+ASR_PARTIAL_SECONDS = Histogram("sensai_asr_partial_seconds", "Streaming partial decodes (queue + decode)")
+LLM_SECONDS = Histogram("sensai_llm_seconds", "LLM request latency", ["model"])
+TTS_SECONDS = Histogram("sensai_tts_seconds", "TTS synthesis latency (render + encode)")
+TURN_SECONDS = Histogram("sensai_turn_seconds", "End-to-end turn latency, until the last TTS clip")
+ERRORS = Counter("sensai_errors_total", "Failed requests per stage", ["stage"])
+REWRITES = Counter("sensai_llm_rewrites_total", "Responses rewritten for the wrong language")
+TTS_SILENCE = Counter("sensai_tts_silence_fallbacks_total", "TTS failures answered with a silent clip")
+CACHE = Counter("sensai_cache_requests_total", "Cache lookups", ["cache", "result"])
+
+_METRICS = (
+    ASR_SECONDS,
+    ASR_PARTIAL_SECONDS,
+    LLM_SECONDS,
+    TTS_SECONDS,
+    TURN_SECONDS,
+    ERRORS,
+    REWRITES,
+    TTS_SILENCE,
+    CACHE,
+)
+
+
+def _dir_bytes(path: str) -> float:
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        pass
+    return float(total)
+
+
+def _gauges() -> Iterable[Tuple[str, str, Dict[LabelValues, float], Sequence[str]]]:
+    """(name, help, {label values: value}, label names) read from the running components."""
+    import asr_service
+    import tts_pool as tts_pool_module
+    from audio_codec import CODEC_STATS
+    from audio_preproc import PREPROC_STATS
+    from model_governor import rss_mb
+    from results_writer import get_results_writer
+    from session_journal import get_journal
+    from session_store import get_session_store
+    from settings import TMP_DIR
+
+    queues: Dict[LabelValues, float] = {}
+    service = asr_service._service
+    if service is not None:
+        queues[("asr",)] = service.stats()["queue_depth"]
+    pool = tts_pool_module._pool
+    if pool is not None and pool.running:
+        queues[("tts",)] = pool.stats()["queue_depth"]
+    queues[("results",)] = get_results_writer().stats()["queued"]
+    queues[("journal",)] = get_journal().stats()["queued"]
+    yield "sensai_queue_depth", "Requests waiting per queue", queues, ["queue"]
+
+    from audio_io import managed_models
+
+    models = managed_models()
+    yield "sensai_model_resident_mb", "Resident models and their RSS at load (MB)", {
+        (m.name,): m.rss_mb for m in models
+    }, ["model"]
+    yield "sensai_models_loaded", "Number of resident models", {(): float(len(models))}, []
+    sessions = get_session_store().stats()
+    yield "sensai_sessions", "Stations with conversation state held", {(): float(sessions["sessions"])}, []
+    yield "sensai_session_store_mb", "Estimated size of the session store (MB)", {(): sessions["mb"]}, []
+    yield "sensai_tmp_audio_bytes", "Disk used by tmp_audio", {(): _dir_bytes(str(TMP_DIR))}, []
+    process = {("app",): rss_mb()}
+    if pool is not None and pool.running:
+        process[("tts_workers",)] = pool.rss_mb()
+    yield "sensai_process_rss_mb", "Resident memory per process group (MB)", process, ["process"]
+    preproc = PREPROC_STATS.snapshot()
+    yield "sensai_asr_audio_saved_seconds", "Audio trimmed before Whisper", {(): preproc["audio_saved_sec"]}, []
+    yield "sensai_asr_rejected_clips", "Clips rejected without decoding", {(): preproc["rejected"]}, []
+    codec = CODEC_STATS.snapshot()
+    yield "sensai_tts_bytes_per_utterance", "Mean size of a delivered TTS clip", {(): codec["bytes_per_utterance"]}, []
+
+
+def render() -> str:
+    """All metrics in the Prometheus text format."""
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines += metric.render()
+    for name, help_text, values, labelnames in _gauges():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        lines += [f"{name}{_labels(labelnames, k)} {v:g}" for k, v in sorted(values.items())]
+    return "\n".join(lines) + "\n"
+
+
+def serve_with_metrics(interface: Any, host: str, port: int) -> None:
+    """Mount the Gradio app on a FastAPI app that also serves ``/metrics`` and run it."""
+    import gradio as gr  # type: ignore[import-untyped]
+    import uvicorn  # type: ignore[import-untyped]
+    from fastapi import FastAPI  # type: ignore[import-untyped]
+    from fastapi.responses import PlainTextResponse  # type: ignore[import-untyped]
+
+    app = FastAPI()
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics() -> PlainTextResponse:
+        return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+    app = gr.mount_gradio_app(app, interface, path="/")
+    uvicorn.run(app, host=host, port=port)
@@ -0,0 +1,213 @@
+"""Self-contained model bundle for offline (air-gapped) machines.
+
+Usage:
+    python model_bundle.py build bundle/                   # on a machine with network access
+    python model_bundle.py build bundle/ --whisper base,small,base.en
+    python model_bundle.py verify bundle/                  # sha256 of every file against the manifest
+    MODEL_BUNDLE_DIR=bundle/ python model_bundle.py coldstart
+
+The bundle holds the Whisper (CTranslate2) checkpoints and the XTTS v2 model
+directory plus ``manifest.json`` with a sha256 and size per file. With
+``MODEL_BUNDLE_DIR`` set, models are resolved only from the bundle (no hub
+lookups, no downloads). The bundle is verified once before the first load.
+Hashing reads the files through ``mmap`` in parallel, so the verification pass
+also pulls the weights into the page cache for the loads that follow.
+Neither CTranslate2 nor the Coqui checkpoint loader accepts a memory-mapped
+file, so they still read the weights from disk (or page cache) themselves.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from settings import ASR_MODEL_ROUTES, ASR_MODEL_SIZE, MODEL_BUNDLE_DIR, MODEL_BUNDLE_VERIFY
+
+MANIFEST = "manifest.json"
+XTTS_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+_CHUNK = 8 * 1024 * 1024
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, len(mapped), _CHUNK):
+                digest.update(mapped[offset : offset + _CHUNK])
+    return digest.hexdigest()
+
+
+def _hash_tree(root: Path, rel_paths: List[str]) -> Dict[str, str]:
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+        digests = pool.map(lambda rel: sha256_file(root / rel), rel_paths)
+        return dict(zip(rel_paths, digests))
+
+
+def build_bundle(target: Path, whisper_sizes: List[str]) -> Dict[str, Any]:
+    """Download every model into ``target`` and write the manifest."""
+    from faster_whisper import download_model  # type: ignore[import-untyped]
+    from TTS.utils.manage import ModelManager  # type: ignore[import-untyped]
+
+    target.mkdir(parents=True, exist_ok=True)
+    whisper: Dict[str, str] = {}
+    for size in whisper_sizes:
+        rel = f"whisper/{size}"
+        print(f"Whisper {size} -> {target / rel}")
+        download_model(size, output_dir=str(target / rel))
+        whisper[size] = rel
+
+    print(f"XTTS v2 -> {target / 'xtts_v2'}")
+    model_dir, _, _ = ModelManager(progress_bar=True).download_model(XTTS_MODEL_NAME)
+    shutil.copytree(model_dir, target / "xtts_v2", dirs_exist_ok=True)
+
+    files = sorted(
+        str(p.relative_to(target)) for p in target.rglob("*") if p.is_file() and p.name != MANIFEST
+    )
+    digests = _hash_tree(target, files)
+    manifest = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "whisper": whisper,
+        "xtts": "xtts_v2",
+        "files": {rel: {"sha256": digests[rel], "size": (target / rel).stat().st_size} for rel in files},
+    }
+    (target / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def verify_bundle(root: Path, mode: str = "full") -> Tuple[float, Optional[str]]:
+    """Check sizes (``size``) or sizes and sha256 (``full``). Returns (seconds, error)."""
+    started = time.perf_counter()
+    try:
+        manifest = json.loads((root / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        return time.perf_counter() - started, f"Unreadable bundle manifest in {root}: {exc}"
+    files: Dict[str, Dict[str, Any]] = manifest.get("files", {})
+    problems: List[str] = []
+    for rel, meta in files.items():
+        path = root / rel
+        if not path.is_file():
+            problems.append(f"missing {rel}")
+        elif path.stat().st_size != meta["size"]:
+            problems.append(f"size mismatch {rel}")
+    if not problems and mode == "full":
+        digests = _hash_tree(root, list(files))
+        problems = [f"checksum mismatch {rel}" for rel, meta in files.items() if digests[rel] != meta["sha256"]]
+    elapsed = time.perf_counter() - started
+    if problems:
+        return elapsed, f"Model bundle {root} is damaged: " + ", ".join(problems[:5])
+    return elapsed, None
+
+
+class ModelBundle:
+    """Resolves model paths inside a verified bundle."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.manifest: Dict[str, Any] = json.loads((root / MANIFEST).read_text(encoding="utf-8"))
+        self.verify_sec = 0.0
+
+    def whisper_path(self, size: str) -> str:
+        rel = self.manifest.get("whisper", {}).get(size)
+        if rel is None:
+            raise FileNotFoundError(
+                f"Whisper '{size}' is not in the model bundle {self.root}; rebuild it with --whisper {size}"
+            )
+        return str(self.root / rel)
+
+    def xtts_dir(self) -> Path:
+        return self.root / self.manifest["xtts"]
+
+
+_bundle: Optional[ModelBundle] = None
+_bundle_lock = threading.Lock()
+
+
+def get_bundle() -> Optional[ModelBundle]:
+    """The verified bundle, or ``None`` when models come from the hub caches."""
+    global _bundle
+    if not MODEL_BUNDLE_DIR:
+        return None
+    if _bundle is None:
+        with _bundle_lock:
+            if _bundle is None:
+                root = Path(MODEL_BUNDLE_DIR)
+                verify_sec, error = 0.0, None
+                if MODEL_BUNDLE_VERIFY != "off":
+                    verify_sec, error = verify_bundle(root, MODEL_BUNDLE_VERIFY)
+                if error:
+                    raise RuntimeError(error)
+                bundle = ModelBundle(root)
+                bundle.verify_sec = verify_sec
+                _bundle = bundle
+    return _bundle
+
+
+def resolve_whisper(size: str) -> Tuple[str, bool]:
+    """(model path or size name, local_files_only) for ``WhisperModel``."""
+    bundle = get_bundle()
+    if bundle is None:
+        return size, False
+    return bundle.whisper_path(size), True
+
+
+def cold_start() -> Dict[str, float]:
+    """Verify the bundle and load every model once, timing each step."""
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    bundle = get_bundle()
+    if bundle is None:
+        raise RuntimeError("MODEL_BUNDLE_DIR is not set.")
+    timings["verify_sec"] = bundle.verify_sec
+    from faster_whisper import WhisperModel  # type: ignore[import-untyped]
+
+    for size in bundle.manifest.get("whisper", {}):
+        step = time.perf_counter()
+        WhisperModel(bundle.whisper_path(size), device="cpu", compute_type="int8", local_files_only=True)
+        timings[f"whisper_{size}_sec"] = time.perf_counter() - step
+    from audio_io import get_tts
+
+    step = time.perf_counter()
+    get_tts()
+    timings["xtts_sec"] = time.perf_counter() - step
+    timings["total_sec"] = time.perf_counter() - started
+    return timings
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Download all models into a bundle directory")
+    build.add_argument("target", type=Path)
+    default_sizes = sorted({ASR_MODEL_SIZE, *ASR_MODEL_ROUTES.values()})
+    build.add_argument("--whisper", default=",".join(default_sizes), help="Comma-separated Whisper sizes")
+    verify = sub.add_parser("verify", help="Check a bundle against its manifest")
+    verify.add_argument("root", type=Path)
+    verify.add_argument("--mode", choices=["full", "size"], default="full")
+    sub.add_parser("coldstart", help="Time verification and model loads from MODEL_BUNDLE_DIR")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        manifest = build_bundle(args.target, [s.strip() for s in args.whisper.split(",") if s.strip()])
+        total = sum(meta["size"] for meta in manifest["files"].values())
+        print(f"Bundle ready: {len(manifest['files'])} files, {total / 1e9:.2f} GB in {args.target}")
+        return 0
+    if args.command == "verify":
+        elapsed, error = verify_bundle(args.root, args.mode)
+        print(error or f"OK ({args.mode} check in {elapsed:.1f}s)")
+        return 1 if error else 0
+    timings = cold_start()
+    for name, value in timings.items():
+        print(f"{name:<24} {value:7.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,181 @@
+"""Idle unloading and memory-pressure governor for the audio models.
+
+A background thread checks the loaded models every ``MODEL_GOVERNOR_INTERVAL_SEC``:
+models idle longer than ``MODEL_IDLE_UNLOAD_SEC`` are unloaded, and while
+system memory available drops below ``MODEL_MIN_AVAILABLE_MB`` the least
+recently used idle model is unloaded, one per check. Busy models are never
+touched. When a session becomes active the models for its language are
+reloaded in the background so the first turn does not pay for the load.
+
+RSS per model is the process RSS growth measured around its load (approximate
+when models load concurrently); pooled XTTS workers are measured directly.
+"""
+import ctypes
+import gc
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from settings import MODEL_GOVERNOR_INTERVAL_SEC, MODEL_IDLE_UNLOAD_SEC, MODEL_MIN_AVAILABLE_MB
+
+
+def rss_mb(pid: Optional[int] = None) -> float:
+    """Resident set size of a process in MB (Linux ``/proc``; 0 elsewhere)."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return 0.0
+
+
+def available_mb() -> Optional[float]:
+    """System memory available for new allocations, or ``None`` if unknown."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    try:
+        import psutil  # type: ignore[import-untyped]
+
+        return float(psutil.virtual_memory().available) / (1024.0 * 1024.0)
+    except ImportError:
+        return None
+
+
+def trim_memory() -> None:
+    """Collect garbage and hand freed heap pages back to the OS (glibc only)."""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+@dataclass
+class ManagedModel:
+    name: str
+    last_used: float
+    busy: bool
+    rss_mb: float
+    unload: Callable[[], bool]
+
+
+class ModelGovernor:
+    """Unloads idle models and prefetches them when a session starts."""
+
+    def __init__(
+        self,
+        models: Callable[[], List[ManagedModel]],
+        prefetch: Callable[[Optional[str]], None],
+        idle_sec: float = MODEL_IDLE_UNLOAD_SEC,
+        min_available_mb: float = MODEL_MIN_AVAILABLE_MB,
+        interval_sec: float = MODEL_GOVERNOR_INTERVAL_SEC,
+    ) -> None:
+        self._models = models
+        self._prefetch = prefetch
+        self.idle_sec = idle_sec
+        self.min_available_mb = min_available_mb
+        self.interval_sec = interval_sec
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._prefetching = threading.Lock()
+        self.unloads: Dict[str, int] = {"idle": 0, "pressure": 0}
+        self.last_action = ""
+
+    @property
+    def enabled(self) -> bool:
+        return self.idle_sec > 0 or self.min_available_mb > 0
+
+    def start(self) -> None:
+        if self._thread is None and self.enabled:
+            self._thread = threading.Thread(target=self._loop, name="model-governor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            try:
+                self.tick()
+            except Exception as exc:  # pragma: no cover - keep the governor alive
+                self.last_action = f"governor error: {exc}"
+
+    def tick(self) -> List[str]:
+        """Run one check; returns the names of unloaded models."""
+        now = time.monotonic()
+        idle = sorted((m for m in self._models() if not m.busy), key=lambda m: m.last_used)
+        unloaded: List[str] = []
+        if self.idle_sec > 0:
+            for model in idle:
+                if now - model.last_used >= self.idle_sec and model.unload():
+                    unloaded.append(model.name)
+                    self.unloads["idle"] += 1
+        available = available_mb()
+        if self.min_available_mb > 0 and available is not None and available < self.min_available_mb:
+            for model in idle:
+                if model.name not in unloaded and model.unload():
+                    unloaded.append(model.name)
+                    self.unloads["pressure"] += 1
+                    break
+        if unloaded:
+            trim_memory()
+            self.last_action = f"unloaded {', '.join(unloaded)}"
+        return unloaded
+
+    def prefetch(self, language: Optional[str]) -> None:
+        """Reload the models for ``language`` in the background (no-op while a prefetch runs)."""
+        if not self._prefetching.acquire(blocking=False):
+            return
+
+        def _run() -> None:
+            try:
+                self._prefetch(language)
+            finally:
+                self._prefetching.release()
+
+        threading.Thread(target=_run, name="model-prefetch", daemon=True).start()
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "models": [
+                {"name": m.name, "rss_mb": m.rss_mb, "idle_sec": now - m.last_used, "busy": m.busy}
+                for m in self._models()
+            ],
+            "available_mb": available_mb(),
+            "unloads": dict(self.unloads),
+            "last_action": self.last_action,
+        }
+
+
+def format_governor_status(status: Dict[str, Any]) -> str:
+    models = ", ".join(
+        f"{m['name']} ~{m['rss_mb']:.0f} MB (" + ("busy" if m["busy"] else f"idle {m['idle_sec']:.0f}s") + ")"
+        for m in status["models"]
+    ) or "none loaded"
+    available = status["available_mb"]
+    free = f"{available:.0f} MB available" if available is not None else "available memory unknown"
+    return f"Models: {models}; {free}; unloads idle={status['unloads']['idle']} pressure={status['unloads']['pressure']}"
+
+
+_governor: Optional[ModelGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> ModelGovernor:
+    global _governor
+    if _governor is None:
+        with _governor_lock:
+            if _governor is None:
+                from audio_io import managed_models, prefetch_models
+
+                _governor = ModelGovernor(managed_models, prefetch_models)
+    return _governor
@@ -0,0 +1,223 @@
+"""Long-lived local model server.
+
+Usage:
+    python model_server.py                                # listens on localhost:6100
+    MODEL_SERVER_ADDRESS=localhost:6100 python app.py     # UI as a thin client
+
+The server owns ``AudioModels`` (Whisper pool, XTTS or the TTS worker pool)
+and warms them up once. The Gradio app forwards decodes and TTS renders over a
+``multiprocessing.connection`` socket, so restarting the UI no longer reloads
+the models. Each client thread keeps its own connection and reconnects
+transparently when the server restarts.
+
+Requests are pickled, so a connection must prove it knows the shared key.
+Without ``MODEL_SERVER_AUTHKEY`` the server generates a random key on first
+start into ``MODEL_SERVER_KEY_FILE`` (mode 0600), and the app reads it from
+there; there is no built-in default key.
+"""
+import argparse
+import logging
+import os
+import secrets
+import stat
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from settings import MODEL_SERVER_ADDRESS, MODEL_SERVER_AUTHKEY, MODEL_SERVER_KEY_FILE
+
+DEFAULT_ADDRESS = "localhost:6100"
+
+logger = logging.getLogger(__name__)
+
+Address = Union[str, Tuple[str, int]]
+
+_serving = False
+
+
+def parse_address(value: str) -> Address:
+    """``host:port`` for TCP, anything else is a Unix socket path."""
+    host, sep, port = value.rpartition(":")
+    if sep and port.isdigit() and "/" not in value:
+        return host or "localhost", int(port)
+    return value
+
+
+class ModelServerError(RuntimeError):
+    pass
+
+
+def read_authkey() -> bytes:
+    """``MODEL_SERVER_AUTHKEY`` or the key file written by the server; raises if neither is usable."""
+    if MODEL_SERVER_AUTHKEY:
+        return MODEL_SERVER_AUTHKEY
+    try:
+        if os.name == "posix" and stat.S_IMODE(MODEL_SERVER_KEY_FILE.stat().st_mode) & 0o077:
+            raise ModelServerError(f"{MODEL_SERVER_KEY_FILE} is readable by other users; chmod 600 it")
+        key = MODEL_SERVER_KEY_FILE.read_bytes().strip()
+    except FileNotFoundError:
+        raise ModelServerError(
+            f"No model server key: set MODEL_SERVER_AUTHKEY or start model_server.py to create {MODEL_SERVER_KEY_FILE}"
+        ) from None
+    if not key:
+        raise ModelServerError(f"{MODEL_SERVER_KEY_FILE} is empty")
+    return key
+
+
+def ensure_authkey() -> bytes:
+    """Server side: the configured key, else the key file, created with a random key (0600) on first start."""
+    if MODEL_SERVER_AUTHKEY:
+        return MODEL_SERVER_AUTHKEY
+    try:
+        fd = os.open(MODEL_SERVER_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return read_authkey()
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(secrets.token_hex(32))
+    return read_authkey()
+
+
+class ModelClient:
+    """Calls into the model server; one connection per calling thread."""
+
+    def __init__(self, address: Address, authkey: Optional[bytes] = None) -> None:
+        self.address = address
+        self.authkey = authkey  # None = read_authkey() at connect time, so the server may start later
+        self._local = threading.local()
+
+    def _connection(self) -> Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = Client(self.address, authkey=self.authkey or read_authkey())
+            self._local.conn = conn
+        return conn
+
+    def _drop(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Invoke ``method`` on the server; retries once on a fresh connection after a restart."""
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.send((method, args, kwargs))
+                status, payload = conn.recv()
+                break
+            except (EOFError, OSError) as exc:
+                self._drop()
+                if attempt:
+                    raise ModelServerError(f"Model server at {self.address} unreachable: {exc}") from exc
+        if status == "error":
+            raise ModelServerError(payload)
+        return payload
+
+
+_client: Optional[ModelClient] = None
+_client_lock = threading.Lock()
+
+
+def get_model_client() -> Optional[ModelClient]:
+    """Return the client, or ``None`` when models run in this process."""
+    global _client
+    if _serving or not MODEL_SERVER_ADDRESS:
+        return None
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ModelClient(parse_address(MODEL_SERVER_ADDRESS))
+    return _client
+
+
+def _methods() -> Dict[str, Callable[..., Any]]:
+    import audio_io
+    from warmup import get_warmup
+
+    def wait_warm() -> str:
+        warmup = get_warmup()
+        warmup.start()
+        while not warmup.done():
+            time.sleep(0.5)
+        if not warmup.ready():
+            raise RuntimeError(warmup.format_status())
+        return warmup.format_status()
+
+    return {
+        "ping": lambda: "pong",
+        "decode": audio_io._decode,
+        "render_speech": audio_io.render_speech,
+        "swap_whisper_model": audio_io.swap_whisper_model,
+        "prefetch_models": audio_io.prefetch_models,
+        "wait_warm": wait_warm,
+        "status": lambda: get_warmup().format_status(),
+    }
+
+
+def _handle(conn: Connection, methods: Dict[str, Callable[..., Any]]) -> None:
+    with conn:
+        while True:
+            try:
+                method, args, kwargs = conn.recv()
+            except (EOFError, OSError):
+                return
+            fn = methods.get(method)
+            try:
+                if fn is None:
+                    raise ValueError(f"unknown method {method!r}")
+                conn.send(("ok", fn(*args, **kwargs)))
+            except Exception as exc:
+                conn.send(("error", f"{type(exc).__name__}: {exc}"))
+
+
+def serve(address: Address, authkey: bytes) -> None:
+    """Load the models and answer requests until interrupted."""
+    if not authkey:
+        raise ModelServerError("Refusing to serve without an authentication key")
+    global _serving
+    _serving = True
+    from log_config import configure_logging
+    from settings import TTS_WORKERS
+    from thread_budget import pin_app_process
+    from warmup import get_warmup
+
+    pin_app_process(include_tts=TTS_WORKERS <= 0)
+    from model_governor import get_governor
+
+    configure_logging()
+    methods = _methods()
+    get_warmup().start()
+    get_governor().start()
+    with Listener(address, authkey=authkey) as listener:
+        print(f"Model server listening on {address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, OSError, EOFError) as exc:  # failed handshake, wrong authkey
+                logger.warning("Rejected connection: %s", exc)
+                continue
+            threading.Thread(target=_handle, args=(conn, methods), daemon=True).start()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--address", default=MODEL_SERVER_ADDRESS or DEFAULT_ADDRESS)
+    args = parser.parse_args(argv)
+    try:
+        serve(parse_address(args.address), ensure_authkey())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    # Run through the importable module so audio_io sees the serving flag.
+    import model_server
+
+    raise SystemExit(model_server.main())
@@ -0,0 +1,218 @@
+"""Opt-in profiling of ``handle_run`` / ``handle_checkin`` invocations.
+
+Enable it for every station with ``PROFILE_TURNS=1`` (``PROFILE_EVERY=N`` keeps
+only every N-th invocation), or for one station with the "Profile my turns"
+checkbox in the debug section. A profiled invocation gets:
+
+- a sampling CPU profile: a background thread reads ``sys._current_frames()``
+  every ``PROFILE_INTERVAL_MS`` for all threads, so TTS and ASR worker threads
+  are covered too. Time spent in native code (torch, CTranslate2) shows up
+  under the Python frame that called into it;
+- a ``tracemalloc`` snapshot, diffed against the start of the invocation.
+
+``PROFILE_DIR`` receives ``<stamp>_<name>.collapsed`` (folded stacks for
+flamegraph.pl / speedscope), ``.tracemalloc`` (``tracemalloc.Snapshot.load``)
+and ``.txt`` with the top hotspots by function and by component. One
+invocation is profiled at a time; others overlapping it run unprofiled. When
+profiling is off, the wrapper costs one flag check per invocation.
+"""
+import collections
+import functools
+import inspect
+import itertools
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, Counter, Dict, Iterator, List, Optional, Set, Tuple
+
+from settings import BASE_DIR, PROFILE_DIR, PROFILE_EVERY, PROFILE_INTERVAL_MS, PROFILE_TURNS
+
+_WAITING = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("socket.py", "accept"),
+    ("connection.py", "_recv"),
+    ("connection.py", "wait"),
+    ("_base.py", "result"),
+}
+
+_sessions: Set[str] = set()
+_counter = itertools.count(1)
+_active = threading.Lock()
+
+
+def set_session_profiling(session_id: Optional[str], enabled: bool) -> None:
+    """Profile every invocation from this Gradio session (or stop doing so)."""
+    if not session_id:
+        return
+    if enabled:
+        _sessions.add(session_id)
+    else:
+        _sessions.discard(session_id)
+
+
+def _component(filename: str) -> str:
+    path = filename.replace("\\", "/")
+    if "/torch/" in path or "/torchaudio/" in path:
+        return "torch"
+    if "/ctranslate2/" in path or "/faster_whisper/" in path:
+        return "ctranslate2 / faster-whisper"
+    if "/TTS/" in path or "/transformers/" in path:
+        return "XTTS (Coqui / transformers)"
+    if path.endswith(("/re/__init__.py", "/re.py", "/sre_compile.py")) or "/re/_" in path:
+        return "regex"
+    if "/requests/" in path or "/urllib3/" in path or path.endswith(("/socket.py", "/ssl.py")):
+        return "HTTP (LLM calls)"
+    if "/gradio/" in path or "/anyio/" in path or "/starlette/" in path:
+        return "gradio"
+    if path.startswith(str(BASE_DIR)) and "site-packages" not in path:
+        return "app (python)"
+    return "other"
+
+
+def _frame_name(frame: FrameType, line: bool = True) -> str:
+    code = frame.f_code
+    name = f"{Path(code.co_filename).name}:{code.co_name}"
+    return f"{name}:{frame.f_lineno}" if line else name
+
+
+class Profile:
+    """Samples every thread's stack until stopped; snapshots allocations."""
+
+    def __init__(self, name: str, interval_sec: float = PROFILE_INTERVAL_MS / 1000.0) -> None:
+        self.name = name
+        self.interval_sec = interval_sec
+        self.stacks: Counter[str] = collections.Counter()
+        self.leaves: Counter[Tuple[str, str]] = collections.Counter()
+        self.samples = 0
+        self.waiting = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_tracing = False
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._started_tracing = True
+        self._baseline = tracemalloc.take_snapshot()
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        self.snapshot = tracemalloc.take_snapshot()
+        if self._started_tracing:
+            tracemalloc.stop()
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        names: Dict[Optional[int], str] = {}
+        while not self._stop.wait(self.interval_sec):
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                leaf = (Path(frame.f_code.co_filename).name, frame.f_code.co_name)
+                self.samples += 1
+                if leaf in _WAITING:
+                    self.waiting += 1
+                    continue
+                stack: List[str] = []
+                current: Optional[FrameType] = frame
+                while current is not None:
+                    stack.append(_frame_name(current, line=False))
+                    current = current.f_back
+                thread = names.get(ident, str(ident))
+                self.stacks[";".join([thread] + stack[::-1])] += 1
+                self.leaves[(frame.f_code.co_filename, _frame_name(frame))] += 1
+
+    def summary(self, top: int = 15) -> str:
+        busy = sum(self.stacks.values())
+        lines = [
+            f"{self.name}: {self.elapsed:.2f}s, {self.samples} thread samples every {self.interval_sec * 1000:.0f} ms "
+            f"({busy} busy, {self.waiting} waiting on locks/queues/futures)",
+            "",
+            "Busy samples by component:",
+        ]
+        components: Counter[str] = collections.Counter()
+        for (filename, _), count in self.leaves.items():
+            components[_component(filename)] += count
+        for component, count in components.most_common():
+            lines.append(f"  {100.0 * count / max(1, busy):5.1f}%  {component}")
+        lines += ["", f"Top {top} functions (self time):"]
+        for (filename, frame), count in self.leaves.most_common(top):
+            lines.append(f"  {100.0 * count / max(1, busy):5.1f}%  {frame}  [{_component(filename)}]")
+        if self.snapshot is not None and self._baseline is not None:
+            lines += ["", f"Top {top} allocation sites (net growth during the invocation):"]
+            ignore = [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)]
+            snapshot = self.snapshot.filter_traces(ignore)
+            for stat in snapshot.compare_to(self._baseline.filter_traces(ignore), "lineno")[:top]:
+                frame = stat.traceback[0]
+                lines.append(
+                    f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+7d} blocks  {frame.filename}:{frame.lineno}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: Path = PROFILE_DIR) -> Path:
+        """Write the folded stacks, allocation snapshot and summary; returns the summary path."""
+        directory.mkdir(parents=True, exist_ok=True)
+        base = directory / f"{time.strftime('%Y%m%d-%H%M%S')}_{self.name}"
+        base.with_suffix(".collapsed").write_text(
+            "".join(f"{stack} {count}\n" for stack, count in self.stacks.items()), encoding="utf-8"
+        )
+        if self.snapshot is not None:
+            self.snapshot.dump(str(base.with_suffix(".tracemalloc")))
+        summary = base.with_suffix(".txt")
+        summary.write_text(self.summary(), encoding="utf-8")
+        return summary
+
+
+def _selected(session_id: Optional[str]) -> bool:
+    if session_id and session_id in _sessions:
+        return True
+    return PROFILE_TURNS and next(_counter) % max(1, PROFILE_EVERY) == 0
+
+
+def profiled(name: str) -> Callable[[Callable[..., Iterator[Any]]], Callable[..., Iterator[Any]]]:
+    """Decorate a generator handler so selected invocations are profiled from first to last yield."""
+
+    def decorate(fn: Callable[..., Iterator[Any]]) -> Callable[..., Iterator[Any]]:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Iterator[Any]:
+            if not (PROFILE_TURNS or _sessions):
+                yield from fn(*args, **kwargs)
+                return
+            request = signature.bind_partial(*args, **kwargs).arguments.get("request")
+            session_id = getattr(request, "session_hash", None)
+            if not _selected(session_id) or not _active.acquire(blocking=False):
+                yield from fn(*args, **kwargs)
+                return
+            profile = Profile(f"{name}_{session_id or 'env'}")
+            profile.start()
+            try:
+                yield from fn(*args, **kwargs)
+            finally:
+                profile.stop()
+                _active.release()
+                profile.write()
+
+        return wrapper
+
+    return decorate
+
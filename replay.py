@@ -0,0 +1,154 @@
+"""Replay journaled turns against other LLM models or endpoints.
+
+Usage:
+    python replay.py --target http://localhost:11434 llama3.2:3b
+    python replay.py requests.jsonl requests.jsonl.1.gz --participant P07 \\
+        --target http://localhost:11434 llama3.2:3b --target http://gpu-box:8000 mistral-7b \\
+        --concurrency 4 --out replay.csv
+
+Reads the ``turn`` events of the session journal (``session_journal.py``):
+transcript, persona, scenario, condition and chat history. Each turn is
+re-issued through the app's own ``_generate_llm_response`` (same prompts,
+clean-up and language rewrite) once per target, with ``--concurrency`` turns in
+flight. The summary compares the recorded run with every target: latency
+percentiles, token counts and errors. ``--out`` writes the outputs side by
+side, one row per turn.
+"""
+import argparse
+import csv
+import gzip
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from asr_tune import percentile
+from settings import SESSION_JOURNAL_PATH
+
+Target = Tuple[str, str]
+
+
+def load_turns(
+    paths: List[Path], participant: Optional[str] = None, session: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """``turn`` events from plain or gzipped journals, oldest first."""
+    turns: List[Dict[str, Any]] = []
+    for path in paths:
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as fh:  # type: ignore[operator]
+            for line in fh:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get("event") != "turn":
+                    continue
+                if participant is not None and event.get("participant_id") != participant:
+                    continue
+                if session is not None and event.get("session_id") != session:
+                    continue
+                turns.append(event)
+    turns.sort(key=lambda event: event.get("ts", 0))
+    return turns
+
+
+def replay_turn(turn: Dict[str, Any], target: Target) -> Dict[str, Any]:
+    from handlers import _generate_llm_response
+    from llm_client import get_usage, reset_usage
+
+    reset_usage()
+    started = time.perf_counter()
+    response, error, _llm_latency, _prompt = _generate_llm_response(
+        target[0],
+        target[1],
+        turn["scenario_id"],
+        turn["transcript"],
+        turn["response_lang"],
+        turn.get("persona_summary") or "",
+        turn["condition"],
+        turn.get("history") or [],
+    )
+    return {
+        "response": response,
+        "error": error,
+        "latency_sec": time.perf_counter() - started,
+        **get_usage(),
+    }
+
+
+def replay(turns: List[Dict[str, Any]], targets: List[Target], concurrency: int) -> List[List[Dict[str, Any]]]:
+    """Results per target, in turn order."""
+    results: List[List[Dict[str, Any]]] = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for target in targets:
+            results.append(list(pool.map(lambda turn: replay_turn(turn, target), turns)))
+    return results
+
+
+def summarize(name: str, runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    latencies = [float(run.get("latency_sec") or 0.0) for run in runs if not run.get("error")]
+    return {
+        "name": name,
+        "turns": len(runs),
+        "errors": sum(1 for run in runs if run.get("error")),
+        "p50_sec": percentile(latencies, 50),
+        "p95_sec": percentile(latencies, 95),
+        "mean_sec": sum(latencies) / len(latencies) if latencies else 0.0,
+        "prompt_tokens": sum(int(run.get("prompt_tokens") or 0) for run in runs),
+        "completion_tokens": sum(int(run.get("completion_tokens") or 0) for run in runs),
+    }
+
+
+def write_outputs(target: Path, turns: List[Dict[str, Any]], names: List[str], runs: List[List[Dict[str, Any]]]) -> None:
+    with open(target, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        header = ["turn_id", "participant_id", "scenario_id", "condition", "transcript"]
+        for name in names:
+            header += [f"{name} response", f"{name} latency_sec", f"{name} completion_tokens"]
+        writer.writerow(header)
+        for index, turn in enumerate(turns):
+            row = [turn.get(key) for key in ("turn_id", "participant_id", "scenario_id", "condition", "transcript")]
+            for per_target in runs:
+                run = per_target[index]
+                row += [run.get("response"), f"{float(run.get('latency_sec') or 0.0):.3f}", run.get("completion_tokens")]
+            writer.writerow(row)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("journals", nargs="*", type=Path, default=[SESSION_JOURNAL_PATH], help="Journal files")
+    parser.add_argument(
+        "--target", nargs=2, action="append", required=True, metavar=("ENDPOINT", "MODEL"), help="Repeatable"
+    )
+    parser.add_argument("--participant", help="Only this participant's turns")
+    parser.add_argument("--session", help="Only this Gradio session's turns")
+    parser.add_argument("--limit", type=int, default=None, help="Replay at most this many turns")
+    parser.add_argument("--concurrency", type=int, default=1, help="Turns in flight per target")
+    parser.add_argument("--out", type=Path, help="Write the outputs side by side as CSV")
+    args = parser.parse_args(argv)
+
+    turns = load_turns(args.journals, args.participant, args.session)[: args.limit]
+    if not turns:
+        print("No turns in the journal match.")
+        return 1
+    targets: List[Target] = [(endpoint, model) for endpoint, model in args.target]
+    names = ["recorded"] + [f"{model}@{endpoint}" for endpoint, model in targets]
+    runs = [turns] + replay(turns, targets, args.concurrency)
+
+    print(f"{len(turns)} turns")
+    print(f"{'run':<48} {'p50':>7} {'p95':>7} {'mean':>7} {'prompt tok':>11} {'compl tok':>10} {'errors':>7}")
+    for name, per_target in zip(names, runs):
+        row = summarize(name, per_target)
+        print(
+            f"{name[:48]:<48} {row['p50_sec']:>6.2f}s {row['p95_sec']:>6.2f}s {row['mean_sec']:>6.2f}s "
+            f"{row['prompt_tokens']:>11} {row['completion_tokens']:>10} {row['errors']:>7}"
+        )
+    if args.out:
+        write_outputs(args.out, turns, names, runs)
+        print(f"Outputs written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
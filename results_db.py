@@ -0,0 +1,294 @@
+"""SQLite results store (``RESULTS_BACKEND=sqlite`` or ``both``).
+
+Normalized schema, in WAL mode:
+
+- ``participants``: one row per participant ID;
+- ``sessions``: a participant's trait scores and persona summary (a new row whenever they change);
+- ``turns``: one driver utterance in a scenario, shared by both conditions;
+- ``conditions``: one saved condition with its LLM response and latency.
+
+Several app processes (stations) can write to the same database. WAL lets
+readers run alongside the writer, ``busy_timeout`` makes a writer wait for the
+lock instead of failing, and each batch is one ``BEGIN IMMEDIATE`` transaction.
+Every saved row carries a UID, so replaying the pending-row journal after a
+crash never adds a row twice.
+
+Usage:
+    python results_db.py export-csv results_export.csv     # same layout as results.csv
+    python results_db.py export-parquet results.parquet    # columnar, needs pyarrow
+    python results_db.py import-csv results.csv            # migrate existing CSV data
+    python results_db.py query --participant P01 --condition baseline
+"""
+import argparse
+import csv
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from results_writer import RESULTS_COLUMNS, serialize_row
+from settings import RESULTS_DB_PATH, RESULTS_FSYNC
+
+BUSY_TIMEOUT_MS = 30_000
+
+TRAIT_COLUMNS = RESULTS_COLUMNS[4:18]
+NUMERIC_COLUMNS = TRAIT_COLUMNS + ["latency_sec"]
+
+# Trait and latency columns have no declared type, so values keep the type they
+# were saved with and the CSV export matches results.csv.
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS participants (
+    participant_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id INTEGER PRIMARY KEY,
+    profile_key TEXT NOT NULL UNIQUE,
+    participant_id TEXT NOT NULL REFERENCES participants(participant_id),
+    {", ".join(TRAIT_COLUMNS)},
+    persona_summary TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS turns (
+    turn_id INTEGER PRIMARY KEY,
+    turn_key TEXT NOT NULL UNIQUE,
+    session_id INTEGER NOT NULL REFERENCES sessions(session_id),
+    scenario_id TEXT NOT NULL,
+    driver_transcript TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS conditions (
+    condition_id INTEGER PRIMARY KEY,
+    row_uid TEXT NOT NULL UNIQUE,
+    turn_id INTEGER NOT NULL REFERENCES turns(turn_id),
+    condition TEXT NOT NULL,
+    llm_response TEXT,
+    latency_sec,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_participant ON sessions(participant_id);
+CREATE INDEX IF NOT EXISTS idx_turns_session ON turns(session_id);
+CREATE INDEX IF NOT EXISTS idx_turns_scenario ON turns(scenario_id);
+CREATE INDEX IF NOT EXISTS idx_conditions_turn ON conditions(turn_id);
+CREATE INDEX IF NOT EXISTS idx_conditions_condition ON conditions(condition);
+"""
+
+SELECT_ROWS = f"""
+SELECT c.timestamp, s.participant_id, t.scenario_id, c.condition,
+       {", ".join("s." + column for column in TRAIT_COLUMNS)},
+       s.persona_summary, t.driver_transcript, c.llm_response, c.latency_sec
+FROM conditions c
+JOIN turns t ON t.turn_id = c.turn_id
+JOIN sessions s ON s.session_id = t.session_id
+"""
+
+
+def _key(*parts: Any) -> str:
+    return hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+def connect(path: Path = RESULTS_DB_PATH, fsync: str = RESULTS_FSYNC) -> sqlite3.Connection:
+    """Open the database in WAL mode with the schema in place."""
+    conn = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=" + ("NORMAL" if fsync == "never" else "FULL"))
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def insert_rows(conn: sqlite3.Connection, rows: List[Dict[str, Any]]) -> int:
+    """Insert result rows (``results.csv`` dicts) in one transaction; returns rows added."""
+    added = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for row in rows:
+            participant = str(row.get("participant_id") or "")
+            created = str(row.get("timestamp") or "")
+            traits = [row.get(column) for column in TRAIT_COLUMNS]
+            persona = row.get("persona_summary")
+            conn.execute("INSERT OR IGNORE INTO participants VALUES (?, ?)", (participant, created))
+            profile_key = _key(participant, traits, persona)
+            conn.execute(
+                f"INSERT OR IGNORE INTO sessions (profile_key, participant_id, {', '.join(TRAIT_COLUMNS)}, "
+                f"persona_summary, created_at) VALUES (?, ?, {', '.join('?' * len(TRAIT_COLUMNS))}, ?, ?)",
+                (profile_key, participant, *traits, persona, created),
+            )
+            (session_id,) = conn.execute(
+                "SELECT session_id FROM sessions WHERE profile_key = ?", (profile_key,)
+            ).fetchone()
+            scenario = str(row.get("scenario_id") or "")
+            transcript = row.get("driver_transcript")
+            turn_key = str(row.get("turn_id") or _key(profile_key, scenario, transcript))
+            conn.execute(
+                "INSERT OR IGNORE INTO turns (turn_key, session_id, scenario_id, driver_transcript, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (turn_key, session_id, scenario, transcript, created),
+            )
+            (turn_id,) = conn.execute("SELECT turn_id FROM turns WHERE turn_key = ?", (turn_key,)).fetchone()
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO conditions (row_uid, turn_id, condition, llm_response, latency_sec, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    str(row.get("row_uid") or _key(serialize_row(row))),
+                    turn_id,
+                    str(row.get("condition") or ""),
+                    row.get("llm_response"),
+                    row.get("latency_sec"),
+                    created,
+                ),
+            )
+            added += cursor.rowcount
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return added
+
+
+def iter_rows(
+    conn: sqlite3.Connection,
+    participant: Optional[str] = None,
+    scenario: Optional[str] = None,
+    condition: Optional[str] = None,
+) -> Iterator[Tuple[Any, ...]]:
+    """Result rows in ``RESULTS_COLUMNS`` order and save order, optionally filtered (indexed)."""
+    clauses: List[str] = []
+    params: List[str] = []
+    for column, value in (("s.participant_id", participant), ("t.scenario_id", scenario), ("c.condition", condition)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+    yield from conn.execute(f"{SELECT_ROWS}{where}ORDER BY c.timestamp, c.condition_id", params)
+
+
+class ResultsStore:
+    """Results writer sink for the SQLite database."""
+
+    name = "sqlite"
+
+    def __init__(self, path: Path = RESULTS_DB_PATH, fsync: str = RESULTS_FSYNC) -> None:
+        self.path = path
+        self.fsync = fsync
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def prepare(self) -> None:
+        if self._conn is None:
+            self._conn = connect(self.path, self.fsync)
+
+    def missing(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Journaled rows whose UID is not in the database yet."""
+        self.prepare()
+        assert self._conn is not None
+        uids = [str(row.get("row_uid") or "") for row in rows]
+        present = set()
+        for offset in range(0, len(uids), 500):
+            chunk = uids[offset : offset + 500]
+            query = f"SELECT row_uid FROM conditions WHERE row_uid IN ({', '.join('?' * len(chunk))})"
+            present.update(uid for (uid,) in self._conn.execute(query, chunk))
+        return [row for row, uid in zip(rows, uids) if uid not in present]
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self.prepare()
+        assert self._conn is not None
+        insert_rows(self._conn, rows)
+
+
+def export_csv(conn: sqlite3.Connection, target: Path) -> int:
+    count = 0
+    with open(target, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(RESULTS_COLUMNS)
+        for row in iter_rows(conn):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def export_parquet(conn: sqlite3.Connection, target: Path) -> Tuple[int, Optional[str]]:
+    """Columnar export with numeric trait and latency columns. Returns (rows, error)."""
+    try:
+        import pyarrow as pa  # type: ignore[import-untyped]
+        import pyarrow.parquet as pq  # type: ignore[import-untyped]
+    except ImportError:
+        return 0, "Parquet export needs pyarrow (pip install pyarrow)."
+    rows = list(iter_rows(conn))
+    columns: Dict[str, Any] = {}
+    for index, column in enumerate(RESULTS_COLUMNS):
+        values = [row[index] for row in rows]
+        if column in NUMERIC_COLUMNS:
+            columns[column] = pa.array([_to_float(v) for v in values], pa.float64())
+        elif column in ("participant_id", "scenario_id", "condition"):
+            columns[column] = pa.array([str(v) for v in values], pa.string()).dictionary_encode()
+        else:
+            columns[column] = pa.array([None if v is None else str(v) for v in values], pa.string())
+    pq.write_table(pa.table(columns), str(target), compression="zstd")
+    return len(rows), None
+
+
+def import_csv(conn: sqlite3.Connection, source: Path) -> int:
+    """Load an existing ``results.csv``; importing the same file twice adds nothing."""
+    with open(source, newline="", encoding="utf-8") as fh:
+        rows = []
+        for index, row in enumerate(csv.DictReader(fh)):
+            row["row_uid"] = _key("csv", index, serialize_row(row))
+            rows.append(row)
+    return insert_rows(conn, rows)
+
+
+_store: Optional[ResultsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResultsStore()
+    return _store
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", type=Path, default=RESULTS_DB_PATH, help="Database file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("export-csv", help="Write all rows in the results.csv layout").add_argument("target", type=Path)
+    sub.add_parser("export-parquet", help="Write all rows as Parquet").add_argument("target", type=Path)
+    sub.add_parser("import-csv", help="Load rows from a results.csv file").add_argument("source", type=Path)
+    query = sub.add_parser("query", help="Print matching rows as CSV")
+    query.add_argument("--participant")
+    query.add_argument("--scenario")
+    query.add_argument("--condition")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    if args.command == "export-csv":
+        print(f"Exported {export_csv(conn, args.target)} rows to {args.target}")
+    elif args.command == "export-parquet":
+        count, error = export_parquet(conn, args.target)
+        print(error or f"Exported {count} rows to {args.target}")
+        return 1 if error else 0
+    elif args.command == "import-csv":
+        print(f"Imported {import_csv(conn, args.source)} new rows from {args.source}")
+    else:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(RESULTS_COLUMNS)
+        writer.writerows(iter_rows(conn, args.participant, args.scenario, args.condition))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
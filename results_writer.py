@@ -0,0 +1,310 @@
+"""Background writer for the results (``results.csv`` and/or the SQLite store).
+
+Saves only append the row to a pending-row journal, queue it and return. One
+writer thread takes rows from the queue and hands them to every sink of
+``RESULTS_BACKEND`` (``csv``, ``sqlite`` or ``both``) in batches: one CSV
+write or one database transaction per batch, so rows from several stations
+never interleave. The fsync policy:
+
+- ``always``: the journal is fsynced before a save returns, the sinks after every batch;
+- ``batch`` (default): the sinks are fsynced after every batch;
+- ``never``: leave flushing to the OS.
+
+The journal is cleared once every row in it is written. On start-up, rows
+still in the journal (left by a crash) are written unless a sink already holds
+them, and a torn last CSV record is cut off first. A sink that fails (disk
+full, locked database) is retried with backoff; its rows stay journaled, and
+``error()`` reports the failure until a write succeeds again. The queue is
+drained at interpreter exit.
+"""
+import atexit
+import csv
+import io
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from metrics import ERRORS
+from settings import RESULTS_BACKEND, RESULTS_BATCH_SIZE, RESULTS_FLUSH_SEC, RESULTS_FSYNC, RESULTS_PATH
+
+RESULTS_COLUMNS = [
+    "timestamp",
+    "participant_id",
+    "scenario_id",
+    "condition",
+    "O",
+    "C",
+    "E",
+    "A",
+    "N",
+    "dbq_violations",
+    "dbq_errors",
+    "dbq_lapses",
+    "bsss_experience",
+    "bsss_thrill",
+    "bsss_disinhibition",
+    "bsss_boredom",
+    "erq_reappraisal",
+    "erq_suppression",
+    "persona_summary",
+    "driver_transcript",
+    "llm_response",
+    "latency_sec",
+]
+
+_STOP = object()
+_RETRY_MAX_SEC = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_row(row: Dict[str, Any]) -> str:
+    """One CSV record (with line terminator) in column order."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([row.get(column) for column in RESULTS_COLUMNS])
+    return buffer.getvalue()
+
+
+def _complete_length(text: str) -> int:
+    """Length of the leading run of complete CSV records (each ending in a newline outside quotes)."""
+    consumed = 0
+    complete = 0
+
+    def lines() -> Iterator[str]:
+        nonlocal consumed
+        for line in re.split(r"(?<=\n)", text):
+            if line:
+                consumed += len(line)
+                yield line
+
+    try:
+        for _ in csv.reader(lines(), strict=True):
+            if text[consumed - 1] == "\n":
+                complete = consumed
+    except csv.Error:  # unclosed quote at the end of the data
+        pass
+    return complete
+
+
+class CsvSink:
+    """Appends rows to ``results.csv``."""
+
+    name = "csv"
+
+    def __init__(self, path: Path = RESULTS_PATH, fsync: str = RESULTS_FSYNC) -> None:
+        self.path = path
+        self.fsync = fsync
+
+    def prepare(self) -> None:
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            with open(self.path, "w", newline="", encoding="utf-8") as fh:
+                csv.writer(fh).writerow(RESULTS_COLUMNS)
+            return
+        data = self.path.read_bytes()
+        text = data.decode("utf-8", errors="surrogateescape")
+        keep = len(text[: _complete_length(text)].encode("utf-8", errors="surrogateescape"))
+        if keep < len(data):  # cut a record torn by a crash mid-write
+            with open(self.path, "rb+") as fh:
+                fh.truncate(keep)
+                fh.flush()
+                os.fsync(fh.fileno())
+
+    def missing(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Journaled rows not yet in the CSV tail."""
+        records = [serialize_row(row).encode("utf-8", errors="surrogateescape") for row in rows]
+        window = sum(len(r) for r in records) * 2 + 65536
+        # Compared as bytes: the window start may fall inside a multi-byte character.
+        with open(self.path, "rb") as fh:
+            fh.seek(max(0, self.path.stat().st_size - window))
+            tail = fh.read()
+        return [row for row, record in zip(rows, records) if record not in tail]
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a", newline="", encoding="utf-8") as fh:
+            fh.write("".join(serialize_row(row) for row in rows))
+            fh.flush()
+            if self.fsync in ("always", "batch"):
+                os.fsync(fh.fileno())
+
+
+def _default_sinks() -> List[Any]:
+    sinks: List[Any] = []
+    if RESULTS_BACKEND in ("csv", "both"):
+        sinks.append(CsvSink())
+    if RESULTS_BACKEND in ("sqlite", "both"):
+        from results_db import get_results_store
+
+        sinks.append(get_results_store())
+    return sinks
+
+
+class ResultsWriter:
+    """Queue + single writer thread feeding the results sinks."""
+
+    def __init__(
+        self,
+        sinks: Optional[Sequence[Any]] = None,
+        journal_path: Path = RESULTS_PATH.with_name(RESULTS_PATH.stem + ".pending.jsonl"),
+        fsync: str = RESULTS_FSYNC,
+        batch_size: int = RESULTS_BATCH_SIZE,
+        flush_sec: float = RESULTS_FLUSH_SEC,
+    ) -> None:
+        self.sinks = list(sinks) if sinks is not None else _default_sinks()
+        self.journal_path = journal_path
+        self.fsync = fsync
+        self.batch_size = max(1, batch_size)
+        self.flush_sec = flush_sec
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._journal_lock = threading.Lock()
+        self._pending = 0
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.rows_written = 0
+        self.recovered = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            recovered = self._load_journal()  # before any new save is journaled
+            self._thread = threading.Thread(target=self._run, args=(recovered,), name="results-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def submit(self, row: Dict[str, Any]) -> None:
+        """Journal the row and queue it; returns without touching the sinks."""
+        self.start()
+        row = {**row, "row_uid": row.get("row_uid") or uuid.uuid4().hex}
+        with self._journal_lock:
+            with open(self.journal_path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(row, default=str) + "\n")
+                fh.flush()
+                if self.fsync == "always":
+                    os.fsync(fh.fileno())
+            self._pending += 1
+        self._queue.put(row)
+
+    def _load_journal(self) -> List[Dict[str, Any]]:
+        """Rows a crash left in the journal; they count as pending until every sink holds them."""
+        if not self.journal_path.exists():
+            return []
+        rows: List[Dict[str, Any]] = []
+        for line in self.journal_path.read_text(encoding="utf-8").splitlines():
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                continue  # torn journal line: the save never returned
+        with self._journal_lock:
+            self._pending += len(rows)
+        return rows
+
+    def _recover(self, rows: List[Dict[str, Any]]) -> None:
+        if rows:
+            written: Dict[str, int] = {}
+
+            def write_missing(sink: Any) -> None:
+                missing = sink.missing(rows)
+                if missing:
+                    sink.write(missing)
+                written[sink.name] = len(missing)
+
+            self._apply(write_missing)
+            self.recovered = max(written.values(), default=0)
+        self._done(len(rows))
+
+    def _apply(self, action: Callable[[Any], None]) -> None:
+        """Run ``action`` on every sink, retrying failed sinks with backoff until each has succeeded once."""
+        remaining = list(self.sinks)
+        delay = 0.5
+        while True:
+            for sink in list(remaining):
+                try:
+                    action(sink)
+                    remaining.remove(sink)
+                except Exception as exc:
+                    self.failures += 1
+                    ERRORS.inc("results")
+                    self.last_error = f"{sink.name}: {type(exc).__name__}: {exc}"
+                    logger.error("Results sink failed, retrying in %.1fs: %s", delay, self.last_error)
+            if not remaining:
+                self.last_error = None
+                return
+            time.sleep(delay)
+            delay = min(delay * 2, _RETRY_MAX_SEC)
+
+    def _done(self, count: int) -> None:
+        with self._journal_lock:
+            self._pending -= count
+            if self._pending == 0:
+                self.journal_path.write_text("", encoding="utf-8")
+
+    def _run(self, recovered: List[Dict[str, Any]]) -> None:
+        self._apply(lambda sink: sink.prepare())
+        self._recover(recovered)
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.flush_sec
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._apply(lambda sink: sink.write(batch))
+            self.batches += 1
+            self.rows_written += len(batch)
+            self._done(len(batch))
+            if stop:
+                return
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Drain the queue and stop the writer thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "queued": float(self._queue.qsize()),
+            "pending": float(self._pending),
+            "batches": float(self.batches),
+            "rows_written": float(self.rows_written),
+            "rows_per_batch": self.rows_written / self.batches if self.batches else 0.0,
+            "recovered": float(self.recovered),
+            "failures": float(self.failures),
+        }
+
+    def error(self) -> Optional[str]:
+        """The current sink failure, or ``None`` while rows are being written."""
+        return self.last_error
+
+
+_writer: Optional[ResultsWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_results_writer() -> ResultsWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ResultsWriter()
+    return _writer
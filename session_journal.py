@@ -0,0 +1,227 @@
+"""Append-only journal of every ASR, LLM and TTS request (``requests.jsonl``).
+
+Each event is one JSON line with its kind, wall-clock time, timings, prompts,
+model and the session/participant/turn IDs bound to the current context
+(``bind_session``). Recording only snapshots the fields and puts them on a
+bounded queue; a writer thread serializes and appends them in batches, so the
+hot path never waits for the disk (events are dropped and counted if the
+queue is ever full). When the file would exceed ``SESSION_JOURNAL_MAX_MB`` it
+is rotated to ``requests.jsonl.1`` (gzipped with ``SESSION_JOURNAL_COMPRESS``),
+keeping ``SESSION_JOURNAL_BACKUPS`` old files.
+
+Only the process that called ``start()`` (the app) records; elsewhere, e.g.
+in the model server, events are ignored.
+
+Usage:
+    python session_journal.py bench --events 100000   # cost of one record() call
+"""
+import argparse
+import atexit
+import contextvars
+import gzip
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from settings import (
+    SESSION_JOURNAL,
+    SESSION_JOURNAL_BACKUPS,
+    SESSION_JOURNAL_COMPRESS,
+    SESSION_JOURNAL_MAX_MB,
+    SESSION_JOURNAL_PATH,
+)
+
+_session: "contextvars.ContextVar[Dict[str, Any]]" = contextvars.ContextVar("journal_session", default={})
+_STOP = object()
+
+
+def bind_session(**fields: Any) -> None:
+    """Attach IDs (session_id, participant_id, turn_id, ...) to events recorded in this context."""
+    _session.set({**_session.get(), **fields})
+
+
+def session_fields() -> Dict[str, Any]:
+    return dict(_session.get())
+
+
+class SessionJournal:
+    """Bounded queue + writer thread appending JSON lines with size-based rotation."""
+
+    def __init__(
+        self,
+        path: Path = SESSION_JOURNAL_PATH,
+        max_bytes: int = int(SESSION_JOURNAL_MAX_MB * 1024 * 1024),
+        backups: int = SESSION_JOURNAL_BACKUPS,
+        compress: bool = SESSION_JOURNAL_COMPRESS,
+        queue_size: int = 10000,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = max(1, backups)
+        self.compress = compress
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.events = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.record_ns = 0
+        self.record_max_ns = 0
+        self.write_sec = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._thread = threading.Thread(target=self._run, name="session-journal", daemon=True)
+                self._thread.start()
+
+    def record(self, kind: str, **fields: Any) -> None:
+        """Queue one event; never blocks. Mutable values must not be changed afterwards."""
+        if self._thread is None:
+            return
+        started = time.perf_counter_ns()
+        event = {"ts": time.time(), "event": kind, **_session.get(), **fields}
+        try:
+            self._queue.put_nowait(event)
+            self.events += 1
+        except queue.Full:
+            self.dropped += 1
+        elapsed = time.perf_counter_ns() - started
+        self.record_ns += elapsed
+        if elapsed > self.record_max_ns:
+            self.record_max_ns = elapsed
+
+    def _rotated(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{index}" + (".gz" if self.compress else ""))
+
+    def _rotate(self) -> None:
+        for index in range(self.backups - 1, 0, -1):
+            if self._rotated(index).exists():
+                os.replace(self._rotated(index), self._rotated(index + 1))
+        if self.compress:
+            with open(self.path, "rb") as src, gzip.open(self._rotated(1), "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            self.path.unlink()
+        else:
+            os.replace(self.path, self._rotated(1))
+        self.rotations += 1
+
+    def _write(self, events: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        data = "".join(json.dumps(event, ensure_ascii=False, default=str) + "\n" for event in events).encode("utf-8")
+        size = self.path.stat().st_size if self.path.exists() else 0
+        if size and size + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "ab") as fh:
+            fh.write(data)
+        self.write_sec += time.perf_counter() - started
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: List[Dict[str, Any]] = []
+            while item is not _STOP:
+                batch.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write(batch)
+                except OSError:
+                    self.dropped += len(batch)
+            if item is _STOP:
+                return
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write what is queued and stop the writer thread."""
+        if not self.running:
+            return
+        assert self._thread is not None
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "events": float(self.events),
+            "dropped": float(self.dropped),
+            "queued": float(self._queue.qsize()),
+            "rotations": float(self.rotations),
+            "record_mean_us": self.record_ns / self.events / 1000 if self.events else 0.0,
+            "record_max_us": self.record_max_ns / 1000,
+            "write_sec": self.write_sec,
+        }
+
+
+_journal: Optional[SessionJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_journal() -> SessionJournal:
+    global _journal
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                _journal = SessionJournal()
+    return _journal
+
+
+def start_journal() -> None:
+    """Start recording in this process (no-op with ``SESSION_JOURNAL=0``)."""
+    if SESSION_JOURNAL:
+        journal = get_journal()
+        journal.start()
+        atexit.register(journal.close)
+
+
+def journal_event(kind: str, **fields: Any) -> None:
+    get_journal().record(kind, **fields)
+
+
+def bench(events: int) -> Dict[str, float]:
+    """Record ``events`` turn-sized events into a scratch journal; returns its stats."""
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = SessionJournal(Path(tmp) / "requests.jsonl", max_bytes=8 * 1024 * 1024, queue_size=events + 1)
+        journal.start()
+        history = [{"role": "user", "content": "Traffic is not moving at all."}] * 6
+        bind_session(session_id="bench", participant_id="P00", turn_id="t")
+        started = time.perf_counter()
+        for index in range(events):
+            journal.record("llm", model="bench", user_prompt="Driver says: hello " * 10, history=history, latency_sec=index)
+        hot_sec = time.perf_counter() - started
+        journal.close(timeout=60)
+        result = journal.stats()
+        result["hot_path_sec"] = hot_sec
+        return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("bench", help="Measure the cost of recording events")
+    run.add_argument("--events", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    result = bench(args.events)
+    print(
+        f"{int(result['events'])} events: record() mean {result['record_mean_us']:.1f} us, "
+        f"max {result['record_max_us']:.0f} us; writer {result['write_sec']:.2f}s, "
+        f"{int(result['rotations'])} rotations, {int(result['dropped'])} dropped"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
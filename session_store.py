@@ -0,0 +1,186 @@
+"""Server-side conversation state per station.
+
+``gr.State`` only carries the session key; the chat histories and the fields of
+the last turn (needed by the save buttons and the debug section) stay here, so
+Gradio no longer copies the whole conversation with every event.
+
+A history is a chain of ``TurnRecord``s (one per exchange and condition, with
+``__slots__``). Appending a turn adds one record that points at the previous
+one; earlier turns are shared, never copied. Sessions idle for longer than
+``SESSION_IDLE_SEC`` are dropped, and while the estimated size of all sessions
+exceeds ``SESSION_STORE_MAX_MB`` the least recently used ones are dropped
+(never the session being served). A dropped session starts over with an empty
+history.
+"""
+import collections
+import logging
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from settings import SESSION_IDLE_SEC, SESSION_STORE_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+_RECORD_BYTES = 72  # TurnRecord with four slots
+_SESSION_BYTES = 400  # Session object, its dicts and the store entry
+
+
+class TurnRecord:
+    """One exchange of a condition; ``prev`` links to the exchange before it."""
+
+    __slots__ = ("user", "assistant", "prev", "depth")
+
+    def __init__(self, user: str, assistant: str, prev: Optional["TurnRecord"]) -> None:
+        self.user = user
+        self.assistant = assistant
+        self.prev = prev
+        self.depth = prev.depth + 1 if prev is not None else 1
+
+
+def history_messages(tail: Optional[TurnRecord]) -> List[Dict[str, str]]:
+    """The chain as role/content messages, oldest first (LLM and ``gr.Chatbot`` format)."""
+    messages: List[Dict[str, str]] = []
+    while tail is not None:
+        messages.append({"role": "assistant", "content": tail.assistant})
+        messages.append({"role": "user", "content": tail.user})
+        tail = tail.prev
+    messages.reverse()
+    return messages
+
+
+def _estimate(value: Any) -> int:
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate(k) + _estimate(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate(v) for v in value)
+    return 32
+
+
+class Session:
+    __slots__ = ("key", "histories", "last_turn", "touched", "nbytes", "_last_turn_bytes")
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.histories: Dict[str, Optional[TurnRecord]] = {}
+        self.last_turn: Dict[str, Any] = {}
+        self.touched = time.monotonic()
+        self.nbytes = _SESSION_BYTES
+        self._last_turn_bytes = 0
+
+    def history(self, condition: str) -> Optional[TurnRecord]:
+        return self.histories.get(condition)
+
+    def messages(self, condition: str) -> List[Dict[str, str]]:
+        return history_messages(self.histories.get(condition))
+
+    def append(self, condition: str, user: str, assistant: str) -> int:
+        """Add an exchange; returns the bytes it added."""
+        self.histories[condition] = TurnRecord(user, assistant, self.histories.get(condition))
+        added = _RECORD_BYTES + sys.getsizeof(user) + sys.getsizeof(assistant)
+        self.nbytes += added
+        return added
+
+    def set_last_turn(self, fields: Dict[str, Any]) -> int:
+        """Replace the last turn's fields; returns the change in bytes."""
+        size = _estimate(fields)
+        delta = size - self._last_turn_bytes
+        self.last_turn = fields
+        self._last_turn_bytes = size
+        self.nbytes += delta
+        return delta
+
+
+class SessionStore:
+    def __init__(self, idle_sec: float = SESSION_IDLE_SEC, max_mb: float = SESSION_STORE_MAX_MB) -> None:
+        self.idle_sec = idle_sec
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._sessions: "collections.OrderedDict[str, Session]" = collections.OrderedDict()  # least recent first
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self.evicted_idle = 0
+        self.evicted_memory = 0
+
+    def get(self, key: Optional[str]) -> Session:
+        """The session for this key, created if missing (or dropped); marks it as used."""
+        key = key or uuid.uuid4().hex
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = Session(key)
+                self._sessions[key] = session
+                self._nbytes += session.nbytes
+            else:
+                self._sessions.move_to_end(key)
+            session.touched = time.monotonic()
+            self._evict(keep=key)
+        return session
+
+    def lookup(self, key: Optional[str]) -> Optional[Session]:
+        """The session if it is still held, without creating or touching it."""
+        with self._lock:
+            return self._sessions.get(key) if key else None
+
+    def append(self, session: Session, condition: str, user: str, assistant: str) -> None:
+        with self._lock:
+            added = session.append(condition, user, assistant)
+            if self._sessions.get(session.key) is session:
+                self._nbytes += added
+                self._evict(keep=session.key)
+
+    def set_last_turn(self, session: Session, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            delta = session.set_last_turn(fields)
+            if self._sessions.get(session.key) is session:
+                self._nbytes += delta
+                self._evict(keep=session.key)
+
+    def _evict(self, keep: str) -> None:
+        cutoff = time.monotonic() - self.idle_sec
+        while self._sessions:
+            key, oldest = next(iter(self._sessions.items()))
+            if key == keep or oldest.touched >= cutoff:
+                break
+            self._drop(key)
+            self.evicted_idle += 1
+            logger.info("Dropped idle session %s", key)
+        if self.max_bytes <= 0:
+            return
+        for key in list(self._sessions):
+            if self._nbytes <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._drop(key)
+            self.evicted_memory += 1
+            logger.warning("Dropped session %s: session store above %d MB", key, self.max_bytes // (1024 * 1024))
+
+    def _drop(self, key: str) -> None:
+        session = self._sessions.pop(key)
+        self._nbytes -= session.nbytes
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "mb": self._nbytes / (1024 * 1024),
+                "evicted_idle": self.evicted_idle,
+                "evicted_memory": self.evicted_memory,
+            }
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SessionStore()
+    return _store
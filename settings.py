@@ -1,3 +1,5 @@
+import json
+import os
 from pathlib import Path
 
 # Paths
@@ -13,7 +15,144 @@ DEFAULT_ENDPOINT = "http://localhost:11434"
 DEFAULT_MODEL = "llama2:7b-chat"
 LANG_CHOICES = ["de", "en"]
 
+# Results writer: background batching of results rows; fsync "always", "batch" or "never"
+# Backend "csv" (results.csv), "sqlite" (RESULTS_DB_PATH) or "both"
+RESULTS_BACKEND = os.getenv("RESULTS_BACKEND", "csv").lower()
+RESULTS_DB_PATH = Path(os.getenv("RESULTS_DB_PATH", str(BASE_DIR / "results.db")))
+RESULTS_FSYNC = os.getenv("RESULTS_FSYNC", "batch").lower()
+RESULTS_BATCH_SIZE = int(os.getenv("RESULTS_BATCH_SIZE", "32"))
+RESULTS_FLUSH_SEC = float(os.getenv("RESULTS_FLUSH_SEC", "0.5"))
+
+# Session journal: every ASR/LLM/TTS request appended to requests.jsonl, rotated by size
+SESSION_JOURNAL = os.getenv("SESSION_JOURNAL", "1").lower() in ("1", "true", "yes")
+SESSION_JOURNAL_PATH = Path(os.getenv("SESSION_JOURNAL_PATH", str(BASE_DIR / "requests.jsonl")))
+SESSION_JOURNAL_MAX_MB = float(os.getenv("SESSION_JOURNAL_MAX_MB", "50"))
+SESSION_JOURNAL_BACKUPS = int(os.getenv("SESSION_JOURNAL_BACKUPS", "5"))
+SESSION_JOURNAL_COMPRESS = os.getenv("SESSION_JOURNAL_COMPRESS", "1").lower() in ("1", "true", "yes")
+
+# Session store: conversation state per station, dropped when idle or while all sessions exceed the ceiling
+SESSION_IDLE_SEC = float(os.getenv("SESSION_IDLE_SEC", "7200"))
+SESSION_STORE_MAX_MB = float(os.getenv("SESSION_STORE_MAX_MB", "256"))  # 0 = no ceiling
+
+# Metrics: serve /metrics (Prometheus text format) next to the UI; host/port follow Gradio's variables
+METRICS = os.getenv("METRICS", "0").lower() in ("1", "true", "yes")
+SERVER_NAME = os.getenv("GRADIO_SERVER_NAME", "127.0.0.1")
+SERVER_PORT = int(os.getenv("GRADIO_SERVER_PORT", "7860"))
+
+# Multi-station deployment: STATIONS sizes the Gradio queue and the workers per event type;
+# EVENT_CONCURRENCY="run=4,checkin=2,save=2,stream=4,warmup=1" overrides single event types
+STATIONS = int(os.getenv("STATIONS", "1"))
+QUEUE_MAX_SIZE = int(os.getenv("QUEUE_MAX_SIZE", str(max(8, 4 * STATIONS))))
+EVENT_CONCURRENCY = {
+    "run": STATIONS,
+    "checkin": STATIONS,
+    "stream": STATIONS,
+    "save": 2,
+    "warmup": 1,
+    **{
+        event.strip(): int(count)
+        for event, _, count in (item.partition("=") for item in os.getenv("EVENT_CONCURRENCY", "").split(","))
+        if event.strip() and count.strip().isdigit()
+    },
+}
+
+# Profiling: sampling CPU profile + tracemalloc for handle_run/handle_checkin (see profiler.py)
+PROFILE_TURNS = os.getenv("PROFILE_TURNS", "0").lower() in ("1", "true", "yes")
+PROFILE_EVERY = int(os.getenv("PROFILE_EVERY", "1"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(BASE_DIR / "profiles")))
+
+# Logging (see log_config.py): root level, per-module levels ("handlers=DEBUG,audio_io=WARNING"), text or json
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_FILE = os.getenv("LOG_FILE", "")  # empty = stderr
+LOG_RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", "20"))  # records per message template and window; 0 = off
+LOG_RATE_WINDOW_SEC = float(os.getenv("LOG_RATE_WINDOW_SEC", "10"))
+
 # LLM parameters
 MAX_GENERATION_TOKENS = 90
 DEFAULT_TEMPERATURE = 0.6
 DEFAULT_TOP_P = 0.9
+
+# TTS worker pool (0 = synthesize inside the Gradio process)
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "0"))
+TTS_SHM_SECONDS = float(os.getenv("TTS_SHM_SECONDS", "30"))
+
+# Sentence-split TTS: render each sentence separately and join the clips (in parallel only on the worker pool)
+TTS_SPLIT_SENTENCES = os.getenv("TTS_SPLIT_SENTENCES", "0").lower() in ("1", "true", "yes")
+TTS_SENTENCE_JOIN = os.getenv("TTS_SENTENCE_JOIN", "crossfade")  # "crossfade" or "silence"
+TTS_CROSSFADE_MS = float(os.getenv("TTS_CROSSFADE_MS", "40"))
+TTS_SENTENCE_GAP_MS = float(os.getenv("TTS_SENTENCE_GAP_MS", "120"))
+
+# Streaming push-to-talk ASR (energy VAD + incremental Whisper decoding)
+ASR_STREAMING = os.getenv("ASR_STREAMING", "0").lower() in ("1", "true", "yes")
+ASR_VAD_THRESHOLD_DB = float(os.getenv("ASR_VAD_THRESHOLD_DB", "-42"))
+ASR_VAD_SILENCE_MS = float(os.getenv("ASR_VAD_SILENCE_MS", "500"))
+ASR_END_OF_SPEECH_MS = float(os.getenv("ASR_END_OF_SPEECH_MS", "1200"))
+ASR_PARTIAL_INTERVAL_MS = float(os.getenv("ASR_PARTIAL_INTERVAL_MS", "1000"))
+
+# Whisper serving (shared by all stations)
+ASR_NUM_WORKERS = int(os.getenv("ASR_NUM_WORKERS", "2"))
+ASR_QUEUE_SIZE = int(os.getenv("ASR_QUEUE_SIZE", "32"))
+
+# Whisper model profile: written by `python asr_tune.py`, env vars override it
+ASR_PROFILE_PATH = Path(os.getenv("ASR_PROFILE_PATH", str(BASE_DIR / "asr_profile.json")))
+try:
+    _ASR_PROFILE = json.loads(ASR_PROFILE_PATH.read_text(encoding="utf-8")) if ASR_PROFILE_PATH.exists() else {}
+except (OSError, ValueError):
+    _ASR_PROFILE = {}
+ASR_MODEL_SIZE = os.getenv("ASR_MODEL_SIZE", str(_ASR_PROFILE.get("model_size", "base")))
+ASR_COMPUTE_TYPE = os.getenv("ASR_COMPUTE_TYPE", str(_ASR_PROFILE.get("compute_type", "int8")))
+ASR_BEAM_SIZE = int(os.getenv("ASR_BEAM_SIZE", str(_ASR_PROFILE.get("beam_size", 5))))
+ASR_CPU_THREADS = int(os.getenv("ASR_CPU_THREADS", str(_ASR_PROFILE.get("cpu_threads", 0))))  # 0 = CTranslate2 default
+
+# Whisper model pool: per-language model routes ("en=base.en,de=small") under a memory budget
+ASR_MODEL_ROUTES = {
+    lang.strip(): size.strip()
+    for lang, _, size in (item.partition("=") for item in os.getenv("ASR_MODEL_ROUTES", "").split(","))
+    if lang.strip() and size.strip()
+}
+ASR_MEMORY_BUDGET_MB = float(os.getenv("ASR_MEMORY_BUDGET_MB", "1500"))
+
+# ASR pre-stage: trim silence, normalize loudness and reject empty clips before Whisper
+ASR_PREPROCESS = os.getenv("ASR_PREPROCESS", "1").lower() in ("1", "true", "yes")
+ASR_TRIM_PAD_MS = float(os.getenv("ASR_TRIM_PAD_MS", "150"))
+ASR_TARGET_RMS_DB = float(os.getenv("ASR_TARGET_RMS_DB", "-20"))
+ASR_MIN_SPEECH_MS = float(os.getenv("ASR_MIN_SPEECH_MS", "250"))
+ASR_VAD_FLOOR_MARGIN_DB = float(os.getenv("ASR_VAD_FLOOR_MARGIN_DB", "10"))  # voiced: this far above the clip's noise floor
+
+# CPU performance profile for XTTS: inference mode, thread tuning, int8 GPT, cached speaker latents
+TTS_CPU_PROFILE = os.getenv("TTS_CPU_PROFILE", "0").lower() in ("1", "true", "yes")
+TTS_QUANTIZE = os.getenv("TTS_QUANTIZE", "1").lower() in ("1", "true", "yes")
+TTS_TORCH_THREADS = int(os.getenv("TTS_TORCH_THREADS", "0"))  # 0 = all cores (in-process mode only)
+
+# TTS delivery format for remote stations: wav, ogg (Vorbis), opus, flac or mp3
+TTS_OUTPUT_FORMAT = os.getenv("TTS_OUTPUT_FORMAT", "wav").lower()
+
+# Model warmup: start loading in the background at launch and lock the run buttons until models are hot
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "1").lower() in ("1", "true", "yes")
+WARMUP_GATE = os.getenv("WARMUP_GATE", "1").lower() in ("1", "true", "yes")
+
+# CPU thread budget per stage ("asr=4,tts=8,llm=4"); CPU_AFFINITY=1 pins stages to disjoint cores
+CPU_BUDGET = {
+    stage.strip(): int(count)
+    for stage, _, count in (item.partition("=") for item in os.getenv("CPU_BUDGET", "").split(","))
+    if stage.strip() and count.strip().isdigit()
+}
+CPU_AFFINITY = os.getenv("CPU_AFFINITY", "0").lower() in ("1", "true", "yes")
+
+# Model governor: unload idle models and shed models under memory pressure (0 = off)
+MODEL_IDLE_UNLOAD_SEC = float(os.getenv("MODEL_IDLE_UNLOAD_SEC", "0"))
+MODEL_MIN_AVAILABLE_MB = float(os.getenv("MODEL_MIN_AVAILABLE_MB", "0"))
+MODEL_GOVERNOR_INTERVAL_SEC = float(os.getenv("MODEL_GOVERNOR_INTERVAL_SEC", "15"))
+
+# Offline model bundle (python model_bundle.py build): load models only from this directory
+MODEL_BUNDLE_DIR = os.getenv("MODEL_BUNDLE_DIR", "")
+MODEL_BUNDLE_VERIFY = os.getenv("MODEL_BUNDLE_VERIFY", "full")  # full (sha256), size or off
+
+# Optional model server (python model_server.py): "host:port" or a socket path; empty = load models in-process
+MODEL_SERVER_ADDRESS = os.getenv("MODEL_SERVER_ADDRESS", "")
+# Shared secret: MODEL_SERVER_AUTHKEY, or a random key the server writes to MODEL_SERVER_KEY_FILE (mode 0600)
+MODEL_SERVER_AUTHKEY = os.getenv("MODEL_SERVER_AUTHKEY", "").encode("utf-8")
+MODEL_SERVER_KEY_FILE = Path(os.getenv("MODEL_SERVER_KEY_FILE", str(BASE_DIR / ".model_server.key")))
@@ -0,0 +1,110 @@
+"""Per-stage span timing for a turn, shown as a waterfall in the debug section.
+
+A handler opens a trace with ``start_trace()``; code anywhere below it wraps a
+stage in ``with span("name"):``. The trace lives in a context variable, so
+stages in helper modules need no extra arguments, and work submitted with a
+copied context (the TTS executor) lands in the same trace. Outside a trace
+``span`` only costs a context-variable lookup.
+"""
+import contextlib
+import contextvars
+import html
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+_trace: "contextvars.ContextVar[Optional[Trace]]" = contextvars.ContextVar("span_trace", default=None)
+_depth: "contextvars.ContextVar[int]" = contextvars.ContextVar("span_depth", default=0)
+
+
+class Trace:
+    """Spans of one turn: (name, start, end, depth) relative to the trace start."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = time.perf_counter()
+        self.ended: Optional[float] = None
+        self._spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start: float, end: float, depth: int) -> None:
+        with self._lock:
+            self._spans.append({"name": name, "start": start, "end": end, "depth": depth})
+
+    def finish(self) -> None:
+        self.ended = time.perf_counter()
+
+    def stages(self) -> List[Dict[str, Any]]:
+        """Spans in start order as ``{name, start_ms, duration_ms, depth}``, the whole trace first."""
+        end = self.ended or time.perf_counter()
+        with self._lock:
+            spans = sorted(self._spans, key=lambda s: (s["start"], s["depth"]))
+        rows = [{"name": self.name, "start_ms": 0.0, "duration_ms": (end - self.started) * 1000, "depth": 0}]
+        for item in spans:
+            rows.append(
+                {
+                    "name": item["name"],
+                    "start_ms": (item["start"] - self.started) * 1000,
+                    "duration_ms": (item["end"] - item["start"]) * 1000,
+                    "depth": item["depth"],
+                }
+            )
+        return rows
+
+
+def start_trace(name: str) -> Trace:
+    """Open a trace for the current context (replacing any earlier one)."""
+    trace = Trace(name)
+    _trace.set(trace)
+    _depth.set(1)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+@contextlib.contextmanager
+def span(name: str) -> Iterator[None]:
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, start, time.perf_counter(), depth)
+        _depth.reset(token)
+
+
+def add_span(name: str, start: float, end: float) -> None:
+    """Record a stage measured elsewhere (``perf_counter`` timestamps), e.g. a queue wait."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(name, start, end, _depth.get())
+
+
+def render_waterfall(stages: Optional[List[Dict[str, Any]]]) -> str:
+    """HTML waterfall; stages taking a quarter of the turn or more are drawn in red."""
+    if not stages:
+        return ""
+    total = max(stages[0]["duration_ms"], 1e-6)
+    rows = []
+    for stage in stages:
+        left = 100.0 * stage["start_ms"] / total
+        width = max(0.3, 100.0 * stage["duration_ms"] / total)
+        color = "#d9534f" if stage["depth"] and stage["duration_ms"] >= 0.25 * total else "#5b8def"
+        rows.append(
+            '<div style="display:flex;align-items:center;gap:8px;font:12px monospace;margin:2px 0">'
+            f'<span style="width:200px;padding-left:{12 * stage["depth"]}px;white-space:nowrap;overflow:hidden">'
+            f'{html.escape(stage["name"])}</span>'
+            '<div style="flex:1;position:relative;height:12px;background:#eee">'
+            f'<div style="position:absolute;left:{left:.2f}%;width:{width:.2f}%;height:100%;background:{color}"></div>'
+            "</div>"
+            f'<span style="width:80px;text-align:right">{stage["duration_ms"]:.0f} ms</span>'
+            "</div>"
+        )
+    return "<div>" + "".join(rows) + "</div>"
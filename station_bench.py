@@ -0,0 +1,134 @@
+"""Load benchmark: concurrent stations against a running app, p95 turn latency per station count.
+
+Usage:
+    STATIONS=4 python app.py                      # in another shell
+    python station_bench.py --stations 1 2 4 8 --turns 5 --out station_bench.json
+
+Every simulated station is its own Gradio client (own session, own
+conversation history) and sends ``--turns`` typed turns one after another
+through the ``run_turn`` API, the same handler the run button uses. All
+stations of a level start together. Per level the table shows the time to the
+first output (LLM texts), the time until the turn is complete (TTS clips
+delivered) and the turns that failed or were turned away by a full queue.
+Compare levels to choose ``STATIONS`` / ``EVENT_CONCURRENCY``: once p95 grows
+faster than the station count, turns are waiting for a worker.
+"""
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from asr_tune import percentile
+from data import SCENARIO_LABEL_TO_ID
+from settings import DEFAULT_ENDPOINT, DEFAULT_MODEL
+
+UTTERANCES = {
+    "en": ["Why is the car slowing down?", "Is it safe to overtake now?", "How long until we arrive?"],
+    "de": ["Warum bremst das Auto?", "Kann ich jetzt sicher überholen?", "Wie lange fahren wir noch?"],
+}
+
+
+def _station(
+    url: str, index: int, turns: int, args: argparse.Namespace, barrier: threading.Barrier, out: List[Dict[str, Any]]
+) -> None:
+    from gradio_client import Client  # type: ignore[import-untyped]
+
+    client = Client(url, verbose=False)
+    scenario = args.scenario or next(iter(SCENARIO_LABEL_TO_ID))
+    utterances = UTTERANCES[args.language]
+    barrier.wait()
+    for turn in range(turns):
+        started = time.perf_counter()
+        first: Optional[float] = None
+        error = None
+        try:
+            job = client.submit(
+                f"bench-{index:02d}",
+                scenario,
+                3, 3, 3, 3, 3,  # Big Five
+                3, 3, 3,  # DBQ
+                3, 3, 3, 3,  # BSSS
+                3, 3,  # ERQ
+                args.run_mode,
+                args.language,
+                args.endpoint,
+                args.model,
+                None,
+                utterances[turn % len(utterances)],
+                api_name="/run_turn",
+            )
+            for _ in job:
+                if first is None:
+                    first = time.perf_counter() - started
+            job.result()
+        except Exception as exc:  # queue full, connection lost, handler error
+            error = str(exc)
+        total = time.perf_counter() - started
+        out.append({"station": index, "turn": turn, "first_sec": first or total, "turn_sec": total, "error": error})
+
+
+def run_level(url: str, stations: int, args: argparse.Namespace) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    barrier = threading.Barrier(stations)
+    threads = [
+        threading.Thread(target=_station, args=(url, i, args.turns, args, barrier, results), daemon=True)
+        for i in range(stations)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    ok = [r for r in results if not r["error"]]
+    return {
+        "stations": stations,
+        "turns": len(results),
+        "errors": len(results) - len(ok),
+        "first_p50_sec": percentile([r["first_sec"] for r in ok], 50),
+        "first_p95_sec": percentile([r["first_sec"] for r in ok], 95),
+        "turn_p50_sec": percentile([r["turn_sec"] for r in ok], 50),
+        "turn_p95_sec": percentile([r["turn_sec"] for r in ok], 95),
+        "turns_per_min": 60.0 * len(ok) / elapsed if elapsed else 0.0,
+        "sample_errors": sorted({r["error"] for r in results if r["error"]})[:3],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:7860/")
+    parser.add_argument("--stations", type=int, nargs="+", default=[1, 2, 4], help="Station counts to test")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per station and level")
+    parser.add_argument("--endpoint", default=DEFAULT_ENDPOINT)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--scenario", help="Scenario label (default: the first one)")
+    parser.add_argument("--run-mode", default="both", choices=["both", "personalized", "non_personalized"])
+    parser.add_argument("--language", default="en", choices=["en", "de"])
+    parser.add_argument("--out", type=Path, help="Write the levels as JSON")
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'stations':>8} {'turns':>6} {'errors':>7} {'first p50':>10} {'first p95':>10} "
+        f"{'turn p50':>9} {'turn p95':>9} {'turns/min':>10}"
+    )
+    levels = []
+    for stations in args.stations:
+        row = run_level(args.url, stations, args)
+        levels.append(row)
+        print(
+            f"{row['stations']:>8} {row['turns']:>6} {row['errors']:>7} {row['first_p50_sec']:>9.2f}s "
+            f"{row['first_p95_sec']:>9.2f}s {row['turn_p50_sec']:>8.2f}s {row['turn_p95_sec']:>8.2f}s "
+            f"{row['turns_per_min']:>10.1f}"
+        )
+        for error in row["sample_errors"]:
+            print(f"         error: {error}")
+    if args.out:
+        args.out.write_text(json.dumps(levels, indent=2), encoding="utf-8")
+        print(f"Saved to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,56 @@
+import threading
+
+import numpy as np
+import pytest
+
+audio_io = pytest.importorskip("audio_io")  # needs torch, faster-whisper and TTS
+
+
+def test_split_sentences_keeps_punctuation():
+    text = "  Das Auto bremst. Ist es sicher?  Ja!Sofort  "
+    assert audio_io.split_sentences(text) == ["Das Auto bremst.", "Ist es sicher?", "Ja!Sofort"]
+    assert audio_io.split_sentences("   ") == []
+
+
+def test_join_pcm_crossfade_overlaps_the_clips():
+    a = np.ones(1000, dtype=np.float32)
+    b = np.full(1000, 0.5, dtype=np.float32)
+    out = audio_io.join_pcm([a, b], 1000, mode="crossfade", crossfade_ms=100)
+    assert len(out) == 1900
+    assert np.all(out[:900] == 1.0)
+    assert np.all(out[1000:] == 0.5)
+    fade = out[900:1000]
+    assert fade[0] == pytest.approx(1.0) and fade[-1] == pytest.approx(0.5)
+    assert np.all(np.diff(fade) <= 0)
+
+
+def test_join_pcm_silence_inserts_gaps():
+    a = np.ones(10, dtype=np.float32)
+    out = audio_io.join_pcm([a, None, a, np.zeros(0)], 1000, mode="silence", gap_ms=5)
+    assert out.tolist() == [1.0] * 10 + [0.0] * 5 + [1.0] * 10
+
+
+def test_join_pcm_clip_shorter_than_the_fade():
+    out = audio_io.join_pcm([np.ones(100), np.full(20, 0.5)], 1000, mode="crossfade", crossfade_ms=50)
+    assert len(out) == 100
+    assert out[-1] == pytest.approx(0.5)
+    assert audio_io.join_pcm([], 1000).size == 0
+
+
+def test_render_sentences_in_process_runs_one_at_a_time(monkeypatch):
+    running = []
+    overlap = threading.Event()
+
+    def fake_render(text, language):
+        running.append(text)
+        if len(running) > 1:
+            overlap.set()
+        running.remove(text)
+        return np.full(100, len(text), dtype=np.float32), 1000
+
+    monkeypatch.setattr(audio_io, "get_tts_pool", lambda: None)
+    monkeypatch.setattr(audio_io, "synthesize_pcm", fake_render)
+    pcm, sample_rate = audio_io._render_sentences(["Eins.", "Zwei zwei."], "de")
+    assert sample_rate == 1000
+    assert not overlap.is_set()
+    assert pcm[0] == 5.0 and pcm[-1] == 10.0
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from audio_preproc import TARGET_SAMPLE_RATE, prepare_samples, to_mono_16k
+from settings import ASR_TARGET_RMS_DB, ASR_TRIM_PAD_MS, ASR_VAD_THRESHOLD_DB
+
+
+def _tone(freq, sample_rate, seconds=1.0, amplitude=0.5):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def _level_db(samples):
+    core = samples[len(samples) // 10 : -len(samples) // 10]  # skip the filter edges
+    return 20 * np.log10(np.sqrt(np.mean(core**2)) + 1e-12)
+
+
+def test_to_mono_16k_converts_int16_stereo():
+    left = (_tone(440, 16000) * 32767).astype(np.int16)
+    stereo = np.stack([left, left], axis=1)
+    out = to_mono_16k(16000, stereo)
+    assert out.dtype == np.float32
+    assert out.shape == (16000,)
+    assert np.allclose(out, left / 32767.0, atol=1e-4)
+
+
+@pytest.mark.parametrize("sample_rate", [44100, 48000])
+def test_to_mono_16k_keeps_speech_band(sample_rate):
+    out = to_mono_16k(sample_rate, _tone(1000, sample_rate))
+    assert len(out) == TARGET_SAMPLE_RATE
+    assert _level_db(out) == pytest.approx(_level_db(_tone(1000, TARGET_SAMPLE_RATE)), abs=0.5)
+
+
+@pytest.mark.parametrize("sample_rate", [44100, 48000])
+@pytest.mark.parametrize("freq", [9000, 12000, 20000])
+def test_to_mono_16k_does_not_alias_content_above_8k(sample_rate, freq):
+    out = to_mono_16k(sample_rate, _tone(freq, sample_rate))
+    assert _level_db(out) < -60
+
+
+def _noise(seconds, level_db, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(TARGET_SAMPLE_RATE * seconds)) * 10 ** (level_db / 20)).astype(np.float32)
+
+
+def _utterance(speech_db, noise_db, lead=1.0, speech=1.0, tail=1.0):
+    """Noise, a voiced 200 Hz burst at ``speech_db`` RMS, noise."""
+    voiced = _tone(200, TARGET_SAMPLE_RATE, speech, amplitude=np.sqrt(2) * 10 ** (speech_db / 20))
+    return np.concatenate([_noise(lead, noise_db, 1), voiced + _noise(speech, noise_db, 2), _noise(tail, noise_db, 3)])
+
+
+def test_prepare_samples_trims_and_normalizes_speech():
+    clip = prepare_samples(_utterance(-25, -70))
+    assert not clip.empty and clip.gated
+    assert clip.speech_sec == pytest.approx(1.0, abs=0.06)
+    assert clip.kept_sec == pytest.approx(1.0 + 2 * ASR_TRIM_PAD_MS / 1000, abs=0.1)
+    assert clip.saved_sec == pytest.approx(3.0 - clip.kept_sec)
+    voiced_db = _level_db(clip.samples[int(0.2 * TARGET_SAMPLE_RATE) : -int(0.2 * TARGET_SAMPLE_RATE)])
+    assert voiced_db == pytest.approx(ASR_TARGET_RMS_DB, abs=1.0)
+
+
+def test_prepare_samples_finds_quiet_speech_below_the_absolute_gate():
+    clip = prepare_samples(_utterance(ASR_VAD_THRESHOLD_DB - 12, ASR_VAD_THRESHOLD_DB - 35))
+    assert not clip.empty and clip.gated
+    assert clip.speech_sec == pytest.approx(1.0, abs=0.06)
+
+
+def test_prepare_samples_decodes_whole_clip_when_nothing_passes_the_gate():
+    samples = _noise(2.0, -65)
+    clip = prepare_samples(samples)
+    assert not clip.empty and not clip.gated
+    assert len(clip.samples) == len(samples)
+    assert _level_db(clip.samples) == pytest.approx(ASR_TARGET_RMS_DB, abs=1.0)
+
+
+def test_prepare_samples_rejects_short_bursts():
+    clip = prepare_samples(_utterance(-25, -70, speech=0.1))
+    assert clip.empty
+
+
+def test_prepare_samples_rejects_empty_clip():
+    clip = prepare_samples(np.zeros(100, dtype=np.float32))
+    assert clip.empty
+    assert len(clip.samples) == 0
@@ -0,0 +1,47 @@
+import json
+
+from batch_transcribe import collect_inputs, completed_paths
+
+
+def _record(audio, **fields):
+    return json.dumps({"audio": audio, "text": "Grüß Gott", **fields}, ensure_ascii=False) + "\n"
+
+
+def test_completed_paths_skips_failed_records(tmp_path):
+    output = tmp_path / "transcripts.jsonl"
+    output.write_text(_record("a.wav") + _record("b.wav", error="corrupt"), encoding="utf-8")
+    assert completed_paths(output) == {"a.wav"}
+
+
+def test_completed_paths_missing_file(tmp_path):
+    assert completed_paths(tmp_path / "transcripts.jsonl") == set()
+
+
+def test_resume_after_torn_line_keeps_the_next_record(tmp_path):
+    output = tmp_path / "transcripts.jsonl"
+    torn = _record("b.wav").encode("utf-8")
+    torn = torn[: torn.index("ü".encode("utf-8")) + 1]  # cut inside a multi-byte character
+    output.write_bytes(_record("a.wav").encode("utf-8") + torn)
+
+    assert completed_paths(output) == {"a.wav"}
+    with open(output, "a", encoding="utf-8") as fh:  # what run_batch does next
+        fh.write(_record("b.wav"))
+    assert completed_paths(output) == {"a.wav", "b.wav"}
+
+
+def test_collect_inputs_from_directory_and_manifest(tmp_path):
+    (tmp_path / "de").mkdir()
+    (tmp_path / "de" / "p01.wav").write_bytes(b"")
+    (tmp_path / "p02.flac").write_bytes(b"")
+    (tmp_path / "notes.txt").write_text("", encoding="utf-8")
+    assert collect_inputs(tmp_path) == [
+        {"audio": str(tmp_path / "de" / "p01.wav"), "language": "de"},
+        {"audio": str(tmp_path / "p02.flac"), "language": None},
+    ]
+
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text('{"audio": "de/p01.wav", "language": "de"}\n\n/abs/p03.wav\n', encoding="utf-8")
+    assert collect_inputs(manifest) == [
+        {"audio": str(tmp_path / "de" / "p01.wav"), "language": "de"},
+        {"audio": "/abs/p03.wav", "language": None},
+    ]
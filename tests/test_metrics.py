@@ -0,0 +1,43 @@
+import pytest
+
+from metrics import Counter, Histogram
+
+
+def _series(lines):
+    return dict(line.rsplit(" ", 1) for line in lines if not line.startswith("#"))
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    hist = Histogram("test_seconds", "Test latency", buckets=(0.1, 1.0, 5.0))
+    for value in (0.05, 0.1, 0.5, 1.0, 7.0):
+        hist.observe(value)
+    series = _series(hist.render())
+    assert series['test_seconds_bucket{le="0.1"}'] == "2"  # le is an upper bound, inclusive
+    assert series['test_seconds_bucket{le="1"}'] == "4"
+    assert series['test_seconds_bucket{le="5"}'] == "4"
+    assert series['test_seconds_bucket{le="+Inf"}'] == "5"
+    assert series["test_seconds_count"] == "5"
+    assert float(series["test_seconds_sum"]) == pytest.approx(8.65)
+
+
+def test_histogram_keeps_one_series_per_label_set():
+    hist = Histogram("llm_seconds", "LLM latency", ["model"], buckets=(1.0,))
+    hist.observe(0.5, "llama3")
+    hist.observe(2.0, "qwen")
+    series = _series(hist.render())
+    assert series['llm_seconds_bucket{model="llama3",le="1"}'] == "1"
+    assert series['llm_seconds_bucket{model="qwen",le="1"}'] == "0"
+    assert series['llm_seconds_count{model="qwen"}'] == "1"
+
+
+def test_histogram_renders_header_without_observations():
+    lines = Histogram("idle_seconds", "Nothing yet").render()
+    assert lines == ["# HELP idle_seconds Nothing yet", "# TYPE idle_seconds histogram"]
+
+
+def test_counter_escapes_label_values_and_defaults_to_zero():
+    assert _series(Counter("plain_total", "No labels").render()) == {"plain_total": "0"}
+    errors = Counter("errors_total", "Errors", ["stage"])
+    errors.inc('a"b\\c\n')
+    errors.inc('a"b\\c\n', amount=2)
+    assert _series(errors.render()) == {'errors_total{stage="a\\"b\\\\c\\n"}': "3"}
@@ -0,0 +1,76 @@
+import csv
+import json
+
+import pytest
+
+from results_writer import RESULTS_COLUMNS, CsvSink, ResultsWriter, _complete_length, serialize_row
+
+
+def _row(i, transcript="Warum bremst das Auto?"):
+    return {"participant_id": f"P{i:02d}", "condition": "personalized", "driver_transcript": transcript}
+
+
+def _read_rows(path):
+    with open(path, newline="", encoding="utf-8") as fh:
+        return list(csv.reader(fh))
+
+
+def test_complete_length_keeps_whole_records():
+    text = serialize_row(_row(1)) + serialize_row(_row(2))
+    assert _complete_length(text) == len(text)
+
+
+def test_complete_length_cuts_partial_record():
+    whole = serialize_row(_row(1))
+    assert _complete_length(whole + "2026-10-19,P02,sc") == len(whole)
+
+
+def test_complete_length_cuts_unclosed_multiline_quote():
+    whole = serialize_row(_row(1, transcript="zwei\nZeilen"))
+    assert _complete_length(whole + '2026,P02,"offen\nnoch offen') == len(whole)
+
+
+def test_prepare_writes_header_and_truncates_torn_record(tmp_path):
+    path = tmp_path / "results.csv"
+    sink = CsvSink(path, fsync="never")
+    sink.prepare()
+    sink.write([_row(1, "Straße"), _row(2, "Überholen")])
+    with open(path, "ab") as fh:
+        fh.write('2026,P03,"über\n'.encode("utf-8"))
+    sink.prepare()
+    rows = _read_rows(path)
+    assert rows[0] == RESULTS_COLUMNS
+    assert [r[1] for r in rows[1:]] == ["P01", "P02"]
+
+
+@pytest.mark.parametrize("padding", [0, 1])
+def test_missing_reads_tail_inside_multibyte_character(tmp_path, padding):
+    path = tmp_path / "results.csv"
+    sink = CsvSink(path, fsync="never")
+    sink.prepare()
+    with open(path, "ab") as fh:
+        fh.write(b"x" * padding)
+    sink.write([_row(i, "ä" * 500) for i in range(400)])
+    journaled = [_row(398, "ä" * 500), _row(399, "ä" * 500), _row(400, "Bremsen, bitte")]
+    assert sink.missing(journaled) == [journaled[2]]
+
+
+def test_writer_recovers_journal_with_non_ascii_rows(tmp_path):
+    path = tmp_path / "results.csv"
+    journal = tmp_path / "results.pending.jsonl"
+    rows = [{**_row(i, "Überholen auf der Landstraße"), "row_uid": str(i)} for i in range(3)]
+    sink = CsvSink(path, fsync="never")
+    sink.prepare()
+    sink.write(rows[:1])
+    # A crash while writing the second row: its record is torn, the journal holds all three rows.
+    with open(path, "ab") as fh:
+        fh.write(serialize_row(rows[1]).encode("utf-8")[:25])
+    journal.write_text("".join(json.dumps(row) + "\n" for row in rows) + '{"torn": ', encoding="utf-8")
+
+    writer = ResultsWriter([sink], journal_path=journal, fsync="never", flush_sec=0.0)
+    writer.start()
+    writer.close()
+    assert [r[1] for r in _read_rows(path)[1:]] == ["P00", "P01", "P02"]
+    assert writer.recovered == 2
+    assert writer.error() is None
+    assert journal.read_text(encoding="utf-8") == ""
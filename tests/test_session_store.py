@@ -0,0 +1,75 @@
+from session_store import SessionStore, history_messages
+
+
+def test_history_is_a_shared_chain():
+    store = SessionStore(idle_sec=3600, max_mb=0)
+    session = store.get("a")
+    store.append(session, "personalized", "Hallo", "Hi!")
+    first = session.history("personalized")
+    store.append(session, "personalized", "Warum bremst das Auto?", "Ein Fußgänger.")
+    assert session.history("personalized").prev is first
+    assert session.history("personalized").depth == 2
+    assert history_messages(session.history("personalized")) == [
+        {"role": "user", "content": "Hallo"},
+        {"role": "assistant", "content": "Hi!"},
+        {"role": "user", "content": "Warum bremst das Auto?"},
+        {"role": "assistant", "content": "Ein Fußgänger."},
+    ]
+    assert session.messages("non_personalized") == []
+
+
+def test_get_creates_and_lookup_does_not():
+    store = SessionStore(idle_sec=3600, max_mb=0)
+    assert store.lookup("a") is None
+    session = store.get("a")
+    assert store.get("a") is session
+    assert store.lookup("a") is session
+    assert store.get(None).key not in ("", "a")
+
+
+def test_idle_sessions_are_dropped_but_not_the_one_being_served():
+    store = SessionStore(idle_sec=60, max_mb=0)
+    old = store.get("old")
+    store.append(old, "personalized", "u", "a")
+    old.touched -= 120
+    served = store.get("served")
+    served.touched -= 120
+    store.get("served")
+    assert store.lookup("old") is None
+    assert store.lookup("served") is served
+    assert store.stats()["evicted_idle"] == 1
+    # A dropped session starts over with an empty history.
+    assert store.get("old").messages("personalized") == []
+
+
+def test_memory_ceiling_drops_least_recently_used_first():
+    store = SessionStore(idle_sec=3600, max_mb=0.01)  # ~10 KB
+    for key in ("a", "b", "c"):
+        store.append(store.get(key), "personalized", "x" * 2000, "y" * 1000)
+    store.get("a")  # "b" is now the least recently used
+    store.append(store.get("d"), "personalized", "x" * 2000, "y" * 1000)
+    assert store.lookup("b") is None
+    assert store.lookup("a") is not None and store.lookup("d") is not None
+    stats = store.stats()
+    assert stats["evicted_memory"] >= 1
+    assert stats["mb"] * 1024 * 1024 <= store.max_bytes
+
+
+def test_oversized_session_being_served_is_kept():
+    store = SessionStore(idle_sec=3600, max_mb=0.001)
+    store.get("other")
+    big = store.get("big")
+    store.append(big, "personalized", "x" * 5000, "y" * 5000)
+    assert store.lookup("big") is big
+    assert store.lookup("other") is None
+
+
+def test_last_turn_replacement_updates_the_size():
+    store = SessionStore(idle_sec=3600, max_mb=0)
+    session = store.get("a")
+    empty_mb = store.stats()["mb"]
+    store.set_last_turn(session, {"transcript": "x" * 10000})
+    assert store.stats()["mb"] > empty_mb + 0.009
+    store.set_last_turn(session, {"transcript": ""})
+    assert store.stats()["mb"] < empty_mb + 0.001
+    assert session.last_turn == {"transcript": ""}
@@ -0,0 +1,226 @@
+"""CPU thread budget shared by Whisper, XTTS and a co-located LLM.
+
+``CPU_BUDGET="asr=4,tts=8,llm=4"`` assigns cores per stage:
+
+- Whisper gets ``asr / ASR_NUM_WORKERS`` CTranslate2 threads per decode;
+- XTTS gets ``tts`` torch threads in-process, or ``tts / TTS_WORKERS`` per pool worker;
+- Ollama receives ``options.num_thread = llm`` with every request.
+
+With ``CPU_AFFINITY=1`` the stages are also pinned to disjoint core sets in the
+order asr, tts, llm: the app process to its ASR (and in-process TTS) cores,
+every TTS worker to its slice of the TTS cores. Ollama runs outside the app;
+``python thread_budget.py show`` prints the ``taskset`` line for it.
+
+Usage:
+    python thread_budget.py show
+    python thread_budget.py bench --endpoint http://localhost:11434 --model llama2:7b-chat --concurrency 2
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from settings import ASR_CPU_THREADS, ASR_NUM_WORKERS, CPU_AFFINITY, CPU_BUDGET, TTS_TORCH_THREADS
+
+STAGES = ("asr", "tts", "llm")
+
+
+def available_cores() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def core_sets(budget: Dict[str, int] = CPU_BUDGET) -> Dict[str, List[int]]:
+    """Disjoint core lists per stage, assigned in the order asr, tts, llm."""
+    cores = available_cores()
+    sets: Dict[str, List[int]] = {}
+    start = 0
+    for stage in STAGES:
+        count = budget.get(stage, 0)
+        sets[stage] = cores[start : start + count]
+        start += count
+    return sets
+
+
+def asr_cpu_threads() -> int:
+    """CTranslate2 threads per decode (explicit ``ASR_CPU_THREADS`` wins; 0 = library default)."""
+    if ASR_CPU_THREADS or "asr" not in CPU_BUDGET:
+        return ASR_CPU_THREADS
+    return max(1, CPU_BUDGET["asr"] // max(1, ASR_NUM_WORKERS))
+
+
+def tts_threads(num_workers: int = 1) -> int:
+    """Torch threads per XTTS process (explicit ``TTS_TORCH_THREADS`` wins; 0 = not budgeted)."""
+    total = TTS_TORCH_THREADS or CPU_BUDGET.get("tts", 0)
+    return max(1, total // max(1, num_workers)) if total else 0
+
+
+def llm_threads() -> int:
+    return CPU_BUDGET.get("llm", 0)
+
+
+def _pin(cores: List[int]) -> bool:
+    if not cores or not hasattr(os, "sched_setaffinity"):
+        return False
+    os.sched_setaffinity(0, cores)
+    return True
+
+
+def pin_app_process(include_tts: bool) -> bool:
+    """Pin the calling thread (and every thread it starts later) to the ASR (+TTS) cores.
+
+    Call this before the UI or any model starts its threads.
+    """
+    if not CPU_AFFINITY:
+        return False
+    sets = core_sets()
+    return _pin(sets["asr"] + (sets["tts"] if include_tts else []))
+
+
+def pin_tts_worker(worker_id: int, num_workers: int) -> bool:
+    """Pin a TTS worker process to its slice of the TTS cores."""
+    if not CPU_AFFINITY:
+        return False
+    cores = core_sets()["tts"]
+    share = max(1, len(cores) // max(1, num_workers))
+    return _pin(cores[worker_id * share : (worker_id + 1) * share] or cores)
+
+
+def format_budget() -> str:
+    if not CPU_BUDGET:
+        return "No CPU budget set: every stage sizes its thread pool to all cores."
+    sets = core_sets()
+    lines = [
+        f"{stage}: {CPU_BUDGET.get(stage, 0)} cores" + (f" {sets[stage]}" if CPU_AFFINITY else "") for stage in STAGES
+    ]
+    lines.append(f"Whisper threads per decode: {asr_cpu_threads()} (x{ASR_NUM_WORKERS} concurrent decodes)")
+    cores = len(available_cores())
+    if sum(CPU_BUDGET.values()) > cores:
+        lines.append(f"Warning: budget of {sum(CPU_BUDGET.values())} cores exceeds the {cores} available.")
+    if CPU_AFFINITY and sets["llm"]:
+        lines.append(f"Pin Ollama: taskset -c {','.join(str(c) for c in sets['llm'])} ollama serve")
+    return "\n".join(lines)
+
+
+def candidate_splits(total: int, step: int) -> List[Tuple[int, int, int]]:
+    splits = []
+    for asr in range(step, total, step):
+        for tts in range(step, total - asr, step):
+            llm = total - asr - tts
+            if llm >= step:
+                splits.append((asr, tts, llm))
+    return splits
+
+
+def bench(
+    endpoint: str,
+    model: str,
+    splits: List[Tuple[int, int, int]],
+    concurrency: int,
+    turns: int,
+    language: str,
+) -> List[Dict[str, Any]]:
+    """Run full turns (ASR -> LLM -> TTS) concurrently for every split; returns latency figures."""
+    import torch  # type: ignore[import-untyped]
+    from faster_whisper import WhisperModel  # type: ignore[import-untyped]
+
+    from asr_tune import percentile
+    from audio_io import get_tts, synthesize_pcm
+    from audio_preproc import to_mono_16k
+    from data import SCENARIOS, get_scenario_text
+    from llm_client import call_llm
+    from settings import ASR_BEAM_SIZE, ASR_COMPUTE_TYPE, ASR_MODEL_SIZE
+
+    get_tts()
+    prompt = get_scenario_text(SCENARIOS[0]["id"], language)
+    pcm, sample_rate = synthesize_pcm(prompt, language)
+    clip = to_mono_16k(sample_rate, pcm)
+
+    results: List[Dict[str, Any]] = []
+    for asr, tts, llm in splits:
+        whisper = WhisperModel(
+            ASR_MODEL_SIZE,
+            device="cpu",
+            compute_type=ASR_COMPUTE_TYPE,
+            cpu_threads=max(1, asr // concurrency),
+            num_workers=concurrency,
+        )
+        torch.set_num_threads(tts)
+        system = "You are a calm in-car assistant. Answer in one short sentence."
+        call_llm(endpoint, model, system, "Hi.", max_tokens=5, num_thread=llm)  # Ollama reloads on a new num_thread
+        stage_times: Dict[str, List[float]] = {"asr": [], "llm": [], "tts": [], "turn": []}
+        lock = threading.Lock()
+
+        def turn(_: int) -> None:
+            started = time.perf_counter()
+            segments, _info = whisper.transcribe(clip, beam_size=ASR_BEAM_SIZE, language=language)
+            text = " ".join(seg.text.strip() for seg in segments)
+            t_asr = time.perf_counter()
+            reply, _err = call_llm(endpoint, model, system, text, num_thread=llm)
+            t_llm = time.perf_counter()
+            synthesize_pcm(reply or text, language)
+            done = time.perf_counter()
+            with lock:
+                stage_times["asr"].append(t_asr - started)
+                stage_times["llm"].append(t_llm - t_asr)
+                stage_times["tts"].append(done - t_llm)
+                stage_times["turn"].append(done - started)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(turn, range(turns)))
+        row: Dict[str, Any] = {"asr": asr, "tts": tts, "llm": llm}
+        for stage, values in stage_times.items():
+            row[f"{stage}_p50_sec"] = percentile(values, 50)
+            row[f"{stage}_p95_sec"] = percentile(values, 95)
+        results.append(row)
+        print(
+            f"asr={asr:<2} tts={tts:<2} llm={llm:<2} turn p50 {row['turn_p50_sec']:.2f}s p95 {row['turn_p95_sec']:.2f}s "
+            f"(asr {row['asr_p50_sec']:.2f} / llm {row['llm_p50_sec']:.2f} / tts {row['tts_p50_sec']:.2f})"
+        )
+    return results
+
+
+def _parse_splits(value: str) -> List[Tuple[int, int, int]]:
+    splits = []
+    for item in value.split(";"):
+        parts = [int(p) for p in item.split(",") if p.strip()]
+        if len(parts) == 3:
+            splits.append((parts[0], parts[1], parts[2]))
+    return splits
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help="Print the effective budget")
+    run = sub.add_parser("bench", help="Find the split with the lowest end-to-end turn latency")
+    run.add_argument("--endpoint", required=True)
+    run.add_argument("--model", required=True)
+    run.add_argument("--splits", help='Explicit "asr,tts,llm;asr,tts,llm" candidates')
+    run.add_argument("--step", type=int, default=0, help="Core granularity of generated splits (0 = cores/8)")
+    run.add_argument("--concurrency", type=int, default=2, help="Stations running turns at the same time")
+    run.add_argument("--turns", type=int, default=6, help="Turns per split")
+    run.add_argument("--language", default="en", choices=["en", "de"])
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        print(format_budget())
+        return 0
+    total = len(available_cores())
+    splits = _parse_splits(args.splits) if args.splits else candidate_splits(total, args.step or max(1, total // 8))
+    if not splits:
+        parser.error(f"No candidate splits for {total} cores.")
+    results = bench(args.endpoint, args.model, splits, args.concurrency, args.turns, args.language)
+    best = min(results, key=lambda r: (r["turn_p95_sec"], r["turn_p50_sec"]))
+    print(
+        f"Best split (turn p95 {best['turn_p95_sec']:.2f}s): "
+        f"CPU_BUDGET=asr={best['asr']},tts={best['tts']},llm={best['llm']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+"""Compare XTTS default settings against the CPU profile (``tts_cpu.py``).
+
+Usage:
+    python tts_bench.py                       # all scenario texts, EN + DE
+    python tts_bench.py --limit 3 --out bench_wavs/ --report tts_bench.json
+
+Every text is rendered once per mode after a warmup render. The report lists
+the real-time factor (synthesis time / audio duration) and p95 latency. Audio
+quality is measured as intelligibility: Whisper transcribes each clip and the
+word error rate against the input text is reported. ``--out`` keeps the clips
+for listening tests.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from asr_tune import percentile, word_error_rate
+from audio_preproc import to_mono_16k
+from settings import TTS_CPU_PROFILE
+
+Render = Callable[[str, str], Tuple[np.ndarray, int]]
+
+
+def load_texts(limit: Optional[int], languages: List[str]) -> List[Tuple[str, str, str]]:
+    from data import SCENARIOS
+
+    items: List[Tuple[str, str, str]] = []
+    for scenario in SCENARIOS[:limit]:
+        for lang in languages:
+            text = str(scenario.get("text_de" if lang == "de" else "text") or "").strip()
+            if text:
+                items.append((str(scenario["id"]), lang, text))
+    return items
+
+
+def run_mode(
+    name: str, render: Render, items: List[Tuple[str, str, str]], whisper: Any, out_dir: Optional[Path]
+) -> Dict[str, Any]:
+    render(items[0][2], items[0][1])  # warmup: first-call allocations are not part of the measurement
+    latencies: List[float] = []
+    errors: List[float] = []
+    audio_total = 0.0
+    for scenario_id, lang, text in items:
+        started = time.perf_counter()
+        pcm, sample_rate = render(text, lang)
+        latencies.append(time.perf_counter() - started)
+        audio_total += len(pcm) / float(sample_rate)
+        segments, _ = whisper.transcribe(to_mono_16k(sample_rate, pcm), language=lang, beam_size=5)
+        errors.append(word_error_rate(text, " ".join(seg.text.strip() for seg in segments)))
+        if out_dir is not None:
+            import soundfile as sf  # type: ignore[import-untyped]
+
+            out_dir.mkdir(parents=True, exist_ok=True)
+            sf.write(str(out_dir / f"{name}_{scenario_id}_{lang}.wav"), pcm, sample_rate)
+    return {
+        "mode": name,
+        "utterances": len(items),
+        "rtf": sum(latencies) / audio_total if audio_total else 0.0,
+        "p50_sec": percentile(latencies, 50),
+        "p95_sec": percentile(latencies, 95),
+        "wer": sum(errors) / len(errors) if errors else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=None, help="Number of scenarios to render")
+    parser.add_argument("--languages", default="en,de")
+    parser.add_argument("--no-quantize", action="store_true", help="Profile without int8 quantization")
+    parser.add_argument("--whisper-model", default="small", help="Whisper model used to score intelligibility")
+    parser.add_argument("--out", type=Path, help="Keep the rendered clips in this directory")
+    parser.add_argument("--report", type=Path, help="Write the results as JSON")
+    args = parser.parse_args(argv)
+    if TTS_CPU_PROFILE:
+        parser.error("Unset TTS_CPU_PROFILE: the benchmark loads defaults first and applies the profile itself.")
+
+    from faster_whisper import WhisperModel  # type: ignore[import-untyped]
+
+    from audio_io import _speaker_kwargs, get_tts
+    from tts_cpu import apply_cpu_profile, render_fast
+
+    items = load_texts(args.limit, [lang.strip() for lang in args.languages.split(",") if lang.strip()])
+    if not items:
+        parser.error("No scenario texts found.")
+    whisper = WhisperModel(args.whisper_model, device="cpu", compute_type="int8")
+    tts, speaker = get_tts()
+    kwargs = _speaker_kwargs(tts, speaker)
+
+    def render_default(text: str, lang: str) -> Tuple[np.ndarray, int]:
+        wav = tts.tts(text=text, language=lang, **kwargs)
+        return np.asarray(wav, dtype=np.float32), int(tts.synthesizer.output_sample_rate)
+
+    def render_profile(text: str, lang: str) -> Tuple[np.ndarray, int]:
+        return render_fast(tts, text, lang, **kwargs)
+
+    print(f"Rendering {len(items)} utterances per mode")
+    results = [run_mode("default", render_default, items, whisper, args.out)]
+    applied = apply_cpu_profile(tts, quantize=not args.no_quantize)  # in place, so defaults run first
+    print(f"CPU profile: {applied}")
+    results.append(run_mode("cpu_profile", render_profile, items, whisper, args.out))
+
+    print(f"{'mode':<12} {'RTF':>6} {'p50 s':>7} {'p95 s':>7} {'WER':>6}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['rtf']:>6.3f} {r['p50_sec']:>7.2f} {r['p95_sec']:>7.2f} {r['wer']:>6.3f}")
+    base, tuned = results
+    if tuned["rtf"]:
+        print(f"Speed-up x{base['rtf'] / tuned['rtf']:.2f}, WER change {tuned['wer'] - base['wer']:+.3f}")
+    if args.report:
+        args.report.write_text(json.dumps({"profile": applied, "results": results}, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
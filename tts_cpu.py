@@ -0,0 +1,111 @@
+"""Opt-in CPU performance profile for XTTS (``TTS_CPU_PROFILE=1``).
+
+- inference runs under ``torch.inference_mode()``;
+- intra-op threads follow the TTS thread budget (in-process mode only, pool
+  workers already split the cores) and inter-op threads to 1, since the
+  autoregressive GPT decodes one token at a time;
+- the GPT part, where most of the CPU time goes, gets dynamic int8
+  quantization of its Linear layers (``TTS_QUANTIZE``). The HiFi-GAN vocoder
+  stays float32, which keeps the audio quality;
+- speaker conditioning latents are computed once per speaker and reused
+  instead of being rebuilt for every utterance.
+
+``python tts_bench.py`` compares real-time factor and intelligibility against
+the default settings.
+"""
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import torch
+
+from metrics import CACHE
+from settings import TTS_QUANTIZE
+from thread_budget import tts_threads
+
+_GENERATION_KEYS = ("temperature", "length_penalty", "repetition_penalty", "top_k", "top_p")
+
+
+def _conv1d_to_linear(module: torch.nn.Module) -> int:
+    """Swap HF GPT-2 ``Conv1D`` layers (``x @ W + b``) for equivalent ``nn.Linear`` so they can be quantized."""
+    replaced = 0
+    for name, child in list(module.named_children()):
+        if type(child).__name__ == "Conv1D" and hasattr(child, "nf"):
+            linear = torch.nn.Linear(child.weight.shape[0], child.nf)
+            with torch.no_grad():
+                linear.weight.copy_(child.weight.t())
+                linear.bias.copy_(child.bias)
+            setattr(module, name, linear)
+            replaced += 1
+        else:
+            replaced += _conv1d_to_linear(child)
+    return replaced
+
+
+def apply_cpu_profile(tts: Any, set_threads: bool = True, quantize: bool = TTS_QUANTIZE) -> Dict[str, Any]:
+    """Tune torch threading and quantize the XTTS GPT in place. Returns what was applied."""
+    report: Dict[str, Any] = {}
+    if set_threads:
+        threads = tts_threads() or os.cpu_count() or 1
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # only settable before the first parallel region
+        report["threads"] = torch.get_num_threads()
+    model = tts.synthesizer.tts_model
+    gpt = getattr(model, "gpt", None)
+    if quantize and gpt is not None:
+        report["conv1d_converted"] = _conv1d_to_linear(gpt)
+        torch.ao.quantization.quantize_dynamic(gpt, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        report["quantized"] = True
+    model.eval()
+    return report
+
+
+_latents: Dict[str, Tuple[Any, Any]] = {}
+_latents_lock = threading.Lock()
+
+
+def _conditioning(model: Any, speaker: Optional[str], speaker_wav: Optional[str]) -> Optional[Tuple[Any, Any]]:
+    """Cached (gpt_cond_latent, speaker_embedding); a named speaker wins over a reference wav, as in XTTS."""
+    key = f"speaker:{speaker}" if speaker else f"wav:{speaker_wav}" if speaker_wav else ""
+    if not key:
+        return None
+    with _latents_lock:
+        cached = _latents.get(key)
+    if cached is not None:
+        CACHE.inc("xtts_latents", "hit")
+        return cached
+    CACHE.inc("xtts_latents", "miss")
+    with torch.inference_mode():
+        if speaker:
+            speakers = getattr(model.speaker_manager, "speakers", None) or {}
+            if speaker not in speakers:
+                return None
+            entry = speakers[speaker]
+            latents = (entry["gpt_cond_latent"], entry["speaker_embedding"])
+        else:
+            latents = model.get_conditioning_latents(audio_path=[speaker_wav])
+    with _latents_lock:
+        _latents[key] = latents
+    return latents
+
+
+def render_fast(
+    tts: Any, text: str, language: str, speaker: Optional[str] = None, speaker_wav: Optional[str] = None
+) -> Tuple[np.ndarray, int]:
+    """Render with cached latents under inference mode. Returns (float32 samples, sample rate)."""
+    sample_rate = int(tts.synthesizer.output_sample_rate)
+    model = tts.synthesizer.tts_model
+    latents = _conditioning(model, speaker, speaker_wav)
+    with torch.inference_mode():
+        if latents is None:
+            wav: Any = tts.tts(text=text, language=language, speaker=speaker, speaker_wav=speaker_wav)
+        else:
+            params = {k: getattr(model.config, k) for k in _GENERATION_KEYS if hasattr(model.config, k)}
+            wav = model.inference(text, language, latents[0], latents[1], enable_text_splitting=True, **params)["wav"]
+    if isinstance(wav, torch.Tensor):
+        wav = wav.detach().cpu().numpy()
+    return np.asarray(wav, dtype=np.float32).reshape(-1), sample_rate
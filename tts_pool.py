@@ -0,0 +1,327 @@
+"""Multi-process XTTS worker pool.
+
+Each worker process loads the TTS model once, takes jobs from a shared request
+queue and hands the rendered PCM back through a per-worker shared-memory slot,
+so audio never travels as a pickled payload or a temporary file.
+"""
+import atexit
+import itertools
+import multiprocessing as mp
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from model_governor import rss_mb
+from settings import TTS_SHM_SECONDS, TTS_WORKERS
+from thread_budget import pin_tts_worker, tts_threads
+
+# XTTS v2 renders at 24 kHz; slots are sized for this rate.
+_SLOT_SAMPLE_RATE = 24000
+_STATS_WINDOW = 200
+
+
+def torch_threads_per_worker(num_workers: int) -> int:
+    """Split the TTS core budget (default: all cores) evenly across the worker processes."""
+    budgeted = tts_threads(num_workers)
+    if budgeted:
+        return budgeted
+    cores = os.cpu_count() or 1
+    return max(1, cores // max(1, num_workers))
+
+
+def _worker_main(
+    worker_id: int,
+    num_workers: int,
+    torch_threads: int,
+    slot_name: str,
+    slot_samples: int,
+    slot_free: Any,
+    requests: Any,
+    results: Any,
+) -> None:
+    """Worker loop: load XTTS once, then render jobs until a ``None`` sentinel arrives."""
+    pin_tts_worker(worker_id, num_workers)
+    try:
+        import torch  # type: ignore[import-untyped]
+
+        torch.set_num_threads(torch_threads)
+        torch.set_num_interop_threads(1)
+    except Exception:
+        pass
+
+    from audio_io import get_tts, synthesize_pcm
+
+    slot = shared_memory.SharedMemory(name=slot_name)
+    buffer = np.ndarray((slot_samples,), dtype=np.float32, buffer=slot.buf)
+    try:
+        get_tts()
+        results.put(("ready", worker_id, None, None))
+    except Exception as exc:
+        results.put(("ready", worker_id, None, f"{exc}"))
+        slot.close()
+        return
+
+    while True:
+        job = requests.get()
+        if job is None:
+            break
+        job_id, text, language = job
+        started = time.perf_counter()
+        try:
+            pcm, sample_rate = synthesize_pcm(text, language)
+        except Exception as exc:  # pragma: no cover - runtime safeguard
+            results.put(("done", worker_id, (job_id, None, 0, 0, time.perf_counter() - started), f"{exc}"))
+            continue
+        service_sec = time.perf_counter() - started
+        slot_free.wait()
+        slot_free.clear()
+        if pcm.size <= slot_samples:
+            buffer[: pcm.size] = pcm
+            payload: Optional[np.ndarray] = None
+        else:
+            # Longer than the slot: fall back to sending the samples through the queue.
+            slot_free.set()
+            payload = pcm
+        results.put(("done", worker_id, (job_id, payload, int(pcm.size), sample_rate, service_sec), None))
+    slot.close()
+
+
+class TTSWorkerPool:
+    """Pool of XTTS worker processes with shared-memory PCM handoff."""
+
+    def __init__(self, num_workers: int, slot_seconds: float = TTS_SHM_SECONDS) -> None:
+        self.num_workers = max(1, num_workers)
+        self.torch_threads = torch_threads_per_worker(self.num_workers)
+        self._slot_samples = int(slot_seconds * _SLOT_SAMPLE_RATE)
+        self._ctx = mp.get_context("spawn")
+        self._requests: Any = None
+        self._results: Any = None
+        self._processes: List[Any] = []
+        self._slots: List[shared_memory.SharedMemory] = []
+        self._slot_free: List[Any] = []
+        self._futures: Dict[int, Tuple[Future, float]] = {}
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._ready_count = 0
+        self._init_error: Optional[str] = None
+        self._collector: Optional[threading.Thread] = None
+        self._service_times: Deque[float] = deque(maxlen=_STATS_WINDOW)
+        self._queue_waits: Deque[float] = deque(maxlen=_STATS_WINDOW)
+        self._completed = 0
+        self._failed = 0
+        self._started = False
+        self.last_used = time.monotonic()
+
+    def start(self) -> None:
+        """Spawn the worker processes (idempotent)."""
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        """Spawn the workers unless running; the caller holds ``_lock``."""
+        if self._started:
+            return
+        self._started = True
+        self._ready.clear()
+        self._ready_count = 0
+        self._init_error = None
+        self._requests = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._processes, self._slots, self._slot_free = [], [], []
+        for worker_id in range(self.num_workers):
+            slot = shared_memory.SharedMemory(create=True, size=self._slot_samples * 4)
+            slot_free = self._ctx.Event()
+            slot_free.set()
+            proc = self._ctx.Process(
+                target=_worker_main,
+                args=(
+                    worker_id,
+                    self.num_workers,
+                    self.torch_threads,
+                    slot.name,
+                    self._slot_samples,
+                    slot_free,
+                    self._requests,
+                    self._results,
+                ),
+                name=f"tts-worker-{worker_id}",
+                daemon=True,
+            )
+            proc.start()
+            self._slots.append(slot)
+            self._slot_free.append(slot_free)
+            self._processes.append(proc)
+        # The collector is bound to this generation's queue and slots, so a pool
+        # restarted right after a shutdown never shares them with the old one.
+        self._collector = threading.Thread(
+            target=self._collect,
+            args=(self._results, self._slots, self._slot_free),
+            name="tts-pool-collector",
+            daemon=True,
+        )
+        self._collector.start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Block until every worker has loaded the model. Returns an error string on failure."""
+        self.start()
+        if not self._ready.wait(timeout):
+            return "TTS workers not ready (timeout)."
+        return self._init_error
+
+    def submit(self, text: str, language: str) -> "Future[Tuple[np.ndarray, int]]":
+        """Queue a synthesis job; the future resolves to ``(pcm_float32, sample_rate)``.
+
+        Starting the pool, registering the future and enqueueing happen under
+        ``_lock``, so a concurrent ``shutdown()`` either fails this job or runs
+        before it, in which case the job starts a fresh pool.
+        """
+        future: "Future[Tuple[np.ndarray, int]]" = Future()
+        job_id = next(self._job_ids)
+        with self._lock:
+            self._start_locked()
+            self.last_used = time.monotonic()
+            self._futures[job_id] = (future, time.perf_counter())
+            self._requests.put((job_id, text, language))
+        return future
+
+    def synthesize(self, text: str, language: str, timeout: Optional[float] = None) -> Tuple[np.ndarray, int]:
+        return self.submit(text, language).result(timeout)
+
+    def _collect(self, results: Any, slots: List[shared_memory.SharedMemory], slot_free: List[Any]) -> None:
+        while True:
+            try:
+                kind, worker_id, body, error = results.get()
+            except (EOFError, OSError):
+                return
+            if kind == "stop":
+                return
+            if kind == "ready":
+                with self._lock:
+                    self._ready_count += 1
+                    if error and not self._init_error:
+                        self._init_error = f"TTS worker {worker_id} failed to load: {error}"
+                    if self._ready_count >= self.num_workers:
+                        self._ready.set()
+                continue
+            job_id, payload, n_samples, sample_rate, service_sec = body
+            with self._lock:
+                future, submitted = self._futures.pop(job_id, (None, 0.0))
+            if error:
+                with self._lock:
+                    self._failed += 1
+                if future is not None:
+                    future.set_exception(RuntimeError(error))
+                continue
+            if payload is None:
+                view = np.ndarray((n_samples,), dtype=np.float32, buffer=slots[worker_id].buf)
+                pcm = view.copy()
+                del view
+                slot_free[worker_id].set()
+            else:
+                pcm = payload
+            elapsed = time.perf_counter() - submitted
+            with self._lock:
+                self._completed += 1
+                self._service_times.append(service_sec)
+                self._queue_waits.append(max(0.0, elapsed - service_sec))
+            if future is not None:
+                future.set_result((pcm, int(sample_rate)))
+
+    def stats(self) -> Dict[str, float]:
+        """Queue depth and service-time figures over the recent window."""
+        with self._lock:
+            service = sorted(self._service_times)
+            waits = list(self._queue_waits)
+            in_flight = len(self._futures)
+            completed = self._completed
+            failed = self._failed
+        busy = min(in_flight, self.num_workers)
+        return {
+            "workers": float(self.num_workers),
+            "torch_threads": float(self.torch_threads),
+            "queue_depth": float(max(0, in_flight - busy)),
+            "in_flight": float(in_flight),
+            "completed": float(completed),
+            "failed": float(failed),
+            "service_mean_sec": sum(service) / len(service) if service else 0.0,
+            "service_p95_sec": service[int(0.95 * (len(service) - 1))] if service else 0.0,
+            "queue_wait_mean_sec": sum(waits) / len(waits) if waits else 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._started
+
+    def rss_mb(self) -> float:
+        """Combined resident memory of the worker processes."""
+        return sum(rss_mb(proc.pid) for proc in self._processes if proc.pid)
+
+    def shutdown(self, idle_only: bool = False) -> bool:
+        """Stop the workers and release the shared-memory slots.
+
+        Under ``_lock`` the running pool is detached and its pending jobs are
+        taken over, so no submission can land on the queue being closed; a
+        later ``submit()`` starts a new pool. With ``idle_only`` nothing happens
+        while jobs are in flight. Returns whether a pool was stopped.
+        """
+        with self._lock:
+            if not self._started or (idle_only and self._futures):
+                return False
+            self._started = False
+            requests, results, collector = self._requests, self._results, self._collector
+            processes, slots = self._processes, self._slots
+            pending = list(self._futures.values())
+            self._futures.clear()
+            self._processes, self._slots, self._slot_free = [], [], []
+            self._collector = None
+        for future, _ in pending:
+            future.set_exception(RuntimeError("TTS pool shut down."))
+        for _ in processes:
+            requests.put(None)
+        for proc in processes:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        results.put(("stop", -1, None, None))
+        if collector is not None:
+            collector.join(timeout=5)
+        for slot in slots:
+            try:
+                slot.close()
+                slot.unlink()
+            except Exception:
+                pass
+        return True
+
+
+_pool: Optional[TTSWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_tts_pool() -> Optional[TTSWorkerPool]:
+    """Return the process-wide pool, or ``None`` when ``TTS_WORKERS`` is 0."""
+    global _pool
+    if TTS_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TTSWorkerPool(TTS_WORKERS)
+                atexit.register(_pool.shutdown)
+    return _pool
+
+
+def format_pool_stats(stats: Dict[str, float]) -> str:
+    return (
+        f"TTS pool: {int(stats['workers'])} workers x {int(stats['torch_threads'])} threads, "
+        f"queue={int(stats['queue_depth'])}, in flight={int(stats['in_flight'])}, "
+        f"service mean={stats['service_mean_sec']:.2f}s p95={stats['service_p95_sec']:.2f}s, "
+        f"wait mean={stats['queue_wait_mean_sec']:.2f}s"
+    )
@@ -0,0 +1,209 @@
+"""Eager, parallel model warmup with a readiness state.
+
+Every model (each routed Whisper checkpoint and XTTS) is loaded on its own
+thread and then runs one short dummy inference, so first-call kernel selection
+and allocator growth happen before the first participant speaks. Load and
+inference times are recorded per stage; the UI keeps the run buttons locked
+until every stage is hot.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Generator, List, Optional, Tuple
+
+import numpy as np
+
+from audio_io import AudioModels, get_tts, synthesize_pcm
+from model_bundle import get_bundle
+from model_governor import format_governor_status, get_governor
+from model_server import get_model_client
+from settings import ASR_BEAM_SIZE
+from tts_pool import format_pool_stats, get_tts_pool
+from whisper_pool import ModelKey, format_pool_status
+
+_DUMMY_TEXT = "Hello."
+_POLL_SEC = 1.0
+
+
+@dataclass
+class Stage:
+    name: str
+    status: str = "pending"  # pending | loading | warming | ready | failed
+    load_sec: float = 0.0
+    infer_sec: float = 0.0
+    error: Optional[str] = None
+
+    def describe(self) -> str:
+        if self.status == "failed":
+            return f"✗ {self.name}: {self.error}"
+        if self.status == "ready":
+            return f"✓ {self.name}: load {self.load_sec:.1f}s, first inference {self.infer_sec:.2f}s"
+        return f"… {self.name}: {self.status}"
+
+
+def _warm_whisper(key: ModelKey) -> Tuple[Callable[[], None], Callable[[], None]]:
+    pool = AudioModels.get_instance().get_whisper_pool()
+    holder: Dict[str, object] = {}
+
+    def load() -> None:
+        holder["model"] = pool.get(key)
+
+    def infer() -> None:
+        # Low-level noise instead of digital silence so the decoder actually runs.
+        noise = (np.random.default_rng(0).standard_normal(16000) * 0.01).astype(np.float32)
+        segments, _ = holder["model"].transcribe(noise, beam_size=ASR_BEAM_SIZE, language=key[1])  # type: ignore[attr-defined]
+        list(segments)
+
+    return load, infer
+
+
+def _warm_tts() -> Tuple[Callable[[], None], Callable[[], None]]:
+    pool = get_tts_pool()
+
+    def load() -> None:
+        if pool is None:
+            get_tts()
+            return
+        error = pool.wait_ready()
+        if error:
+            raise RuntimeError(error)
+
+    def infer() -> None:
+        if pool is None:
+            synthesize_pcm(_DUMMY_TEXT, "en")
+            return
+        # One job per worker; the shared queue may hand two to the fastest one.
+        jobs = [pool.submit(_DUMMY_TEXT, "en") for _ in range(pool.num_workers)]
+        for job in jobs:
+            job.result()
+
+    return load, infer
+
+
+def _warm_model_server() -> Tuple[Callable[[], None], Callable[[], None]]:
+    client = get_model_client()
+
+    def load() -> None:
+        client.call("ping")  # type: ignore[union-attr]
+
+    def infer() -> None:
+        client.call("wait_warm")  # type: ignore[union-attr]
+
+    return load, infer
+
+
+class Warmup:
+    """Runs warmup stages concurrently and tracks whether everything is hot."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Stage] = {}
+        self._plan: Dict[str, Tuple[Callable[[], None], Callable[[], None]]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def _build_plan(self) -> Dict[str, Tuple[Callable[[], None], Callable[[], None]]]:
+        if get_model_client() is not None:
+            return {"Model server": _warm_model_server()}
+        plan = {}
+        for key in AudioModels.get_instance().get_whisper_pool().routed_keys():
+            plan[f"Whisper {key[0]}/{key[2]}"] = _warm_whisper(key)
+        plan["XTTS"] = _warm_tts()
+        return plan
+
+    def start(self) -> None:
+        """Start all pending or failed stages in the background (idempotent)."""
+        with self._lock:
+            if self._executor is None:
+                self._plan = self._build_plan()
+                self._executor = ThreadPoolExecutor(max_workers=len(self._plan), thread_name_prefix="warmup")
+            todo = [
+                name
+                for name in self._plan
+                if name not in self._stages or self._stages[name].status == "failed"
+            ]
+            if not todo:
+                return
+            for name in todo:
+                self._stages[name] = Stage(name)
+            self.started_at = time.perf_counter()
+            self.finished_at = None
+        for name in todo:
+            self._executor.submit(self._run, name, *self._plan[name])
+
+    def _run(self, name: str, load: Callable[[], None], infer: Callable[[], None]) -> None:
+        stage = self._stages[name]
+        try:
+            stage.status = "loading"
+            started = time.perf_counter()
+            load()
+            stage.load_sec = time.perf_counter() - started
+            stage.status = "warming"
+            started = time.perf_counter()
+            infer()
+            stage.infer_sec = time.perf_counter() - started
+            stage.status = "ready"
+        except Exception as exc:  # pragma: no cover - runtime safeguard
+            stage.error = str(exc)
+            stage.status = "failed"
+        with self._lock:
+            if self.done() and self.finished_at is None:
+                self.finished_at = time.perf_counter()
+
+    def stages(self) -> List[Stage]:
+        return list(self._stages.values())
+
+    def done(self) -> bool:
+        stages = self.stages()
+        return bool(stages) and all(s.status in ("ready", "failed") for s in stages)
+
+    def ready(self) -> bool:
+        stages = self.stages()
+        return bool(stages) and all(s.status == "ready" for s in stages)
+
+    def format_status(self) -> str:
+        stages = self.stages()
+        if not stages:
+            return "Warmup not started."
+        lines = [s.describe() for s in stages]
+        if self.ready() and self.started_at is not None and self.finished_at is not None:
+            lines.append(f"Models ready in {self.finished_at - self.started_at:.1f}s (wall clock).")
+            client = get_model_client()
+            if client is not None:
+                lines.append(client.call("status"))
+            else:
+                bundle = get_bundle()
+                if bundle is not None:
+                    lines.append(f"Offline model bundle {bundle.root} verified in {bundle.verify_sec:.1f}s.")
+                lines.append(format_pool_status(AudioModels.get_instance().get_whisper_pool().status()))
+                pool = get_tts_pool()
+                if pool is not None:
+                    lines.append(format_pool_stats(pool.stats()))
+                governor = get_governor()
+                if governor.enabled:
+                    lines.append(format_governor_status(governor.status()))
+        elif self.done():
+            lines.append(
+                "Warmup incomplete: the run buttons are unlocked, but turns run without the failed models "
+                "(no speech output without XTTS). Press 'Warmup starten' to retry the failed stages."
+            )
+        return "\n".join(lines)
+
+
+_warmup = Warmup()
+
+
+def get_warmup() -> Warmup:
+    return _warmup
+
+
+def warm_up_models() -> Generator[str, None, None]:
+    """Start (or retry) the warmup and stream its progress to the UI."""
+    _warmup.start()
+    while True:
+        yield _warmup.format_status()
+        if _warmup.done():
+            return
+        time.sleep(_POLL_SEC)
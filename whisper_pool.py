@@ -0,0 +1,178 @@
+"""Pool of Whisper models keyed on (size, language specialization, compute type).
+
+Each response language is routed to a model size (e.g. ``en`` -> ``base.en``,
+``de`` -> ``small``). Models load lazily on first use and the least recently
+used idle model is unloaded when the estimated footprint exceeds the memory
+budget. Routes can be changed at runtime, so the operator can swap models
+between participants without restarting the app.
+"""
+import contextlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from faster_whisper import WhisperModel  # type: ignore[import-untyped]
+
+from metrics import CACHE
+from model_bundle import resolve_whisper
+from model_governor import rss_mb
+from settings import (
+    ASR_COMPUTE_TYPE,
+    ASR_MEMORY_BUDGET_MB,
+    ASR_MODEL_ROUTES,
+    ASR_MODEL_SIZE,
+    ASR_NUM_WORKERS,
+)
+from thread_budget import asr_cpu_threads
+
+ModelKey = Tuple[str, Optional[str], str]
+
+# Approximate parameter counts (millions) used to estimate resident size.
+_PARAMS_M = {"tiny": 39, "base": 74, "small": 244, "medium": 769, "large": 1550}
+_BYTES_PER_PARAM = {"int8": 1.0, "int8_float32": 1.0, "int8_float16": 1.0, "float16": 2.0, "float32": 4.0}
+
+
+def make_key(size: str, compute_type: str = ASR_COMPUTE_TYPE) -> ModelKey:
+    """English-only checkpoints (``*.en``) are specialized; everything else is multilingual."""
+    specialization = "en" if size.endswith(".en") else None
+    return size, specialization, compute_type
+
+
+def estimate_mb(key: ModelKey) -> float:
+    size, _, compute_type = key
+    family = size.split(".")[0].split("-")[0]
+    params = _PARAMS_M.get(family, _PARAMS_M["large"])
+    return params * _BYTES_PER_PARAM.get(compute_type, 4.0) * 1.2
+
+
+class WhisperPool:
+    """Lazy, LRU-bounded set of loaded Whisper models."""
+
+    def __init__(self, memory_budget_mb: float = ASR_MEMORY_BUDGET_MB) -> None:
+        self.memory_budget_mb = memory_budget_mb
+        self._models: "OrderedDict[ModelKey, WhisperModel]" = OrderedDict()
+        self._in_use: Dict[ModelKey, int] = {}
+        self._loading: Dict[ModelKey, threading.Lock] = {}
+        self._last_used: Dict[ModelKey, float] = {}
+        self._rss_mb: Dict[ModelKey, float] = {}
+        self._lock = threading.Lock()
+        self._routes: Dict[str, ModelKey] = {
+            lang: make_key(size) for lang, size in ASR_MODEL_ROUTES.items()
+        }
+        self._default = make_key(ASR_MODEL_SIZE)
+
+    def key_for_language(self, language: Optional[str]) -> ModelKey:
+        with self._lock:
+            return self._routes.get(language or "", self._default)
+
+    def get(self, key: ModelKey) -> WhisperModel:
+        """Return a loaded model, loading it (once) if needed."""
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self._last_used[key] = time.monotonic()
+                CACHE.inc("whisper_model", "hit")
+                return model
+            load_lock = self._loading.setdefault(key, threading.Lock())
+        with load_lock:
+            with self._lock:
+                model = self._models.get(key)
+            if model is None:
+                CACHE.inc("whisper_model", "miss")
+                size, _, compute_type = key
+                source, local_only = resolve_whisper(size)
+                rss_before = rss_mb()
+                model = WhisperModel(
+                    source,
+                    device="cpu",
+                    compute_type=compute_type,
+                    cpu_threads=asr_cpu_threads(),
+                    num_workers=ASR_NUM_WORKERS,
+                    local_files_only=local_only,
+                )
+                with self._lock:
+                    self._models[key] = model
+                    self._rss_mb[key] = max(0.0, rss_mb() - rss_before)
+                    self._last_used[key] = time.monotonic()
+                    self._evict_locked(keep=key)
+        return model
+
+    @contextlib.contextmanager
+    def use(self, language: Optional[str]) -> Iterator[WhisperModel]:
+        """Pin the model routed for ``language`` so it is not unloaded mid-decode."""
+        key = self.key_for_language(language)
+        model = self.get(key)
+        with self._lock:
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+        try:
+            yield model
+        finally:
+            with self._lock:
+                self._in_use[key] -= 1
+                if not self._in_use[key]:
+                    del self._in_use[key]
+                self._evict_locked()
+
+    def _evict_locked(self, keep: Optional[ModelKey] = None) -> None:
+        total = sum(estimate_mb(k) for k in self._models)
+        for key in list(self._models):
+            if total <= self.memory_budget_mb:
+                break
+            if key == keep or key in self._in_use:
+                continue
+            del self._models[key]
+            total -= estimate_mb(key)
+
+    def loaded(self) -> List[Tuple[ModelKey, float, bool, float]]:
+        """(key, last used, in use, RSS growth at load in MB) for every loaded model."""
+        with self._lock:
+            return [
+                (key, self._last_used.get(key, 0.0), key in self._in_use, self._rss_mb.get(key, estimate_mb(key)))
+                for key in self._models
+            ]
+
+    def unload(self, key: ModelKey) -> bool:
+        with self._lock:
+            if key in self._in_use:
+                return False
+            return self._models.pop(key, None) is not None
+
+    def swap(self, language: str, size: str, compute_type: str = ASR_COMPUTE_TYPE, preload: bool = True) -> ModelKey:
+        """Route ``language`` to another model. The previous model is unloaded once idle."""
+        new_key = make_key(size, compute_type)
+        if preload:
+            self.get(new_key)
+        with self._lock:
+            old_key = self._routes.get(language)
+            self._routes[language] = new_key
+            still_routed = old_key in self._routes.values() or old_key == self._default
+        if old_key and old_key != new_key and not still_routed:
+            self.unload(old_key)
+        return new_key
+
+    def routed_keys(self) -> List[ModelKey]:
+        with self._lock:
+            keys = list(dict.fromkeys(list(self._routes.values()) + [self._default]))
+        return keys
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "routes": {lang: list(key) for lang, key in self._routes.items()},
+                "default": list(self._default),
+                "loaded": [list(key) for key in self._models],
+                "in_use": {"/".join(str(p) for p in key): n for key, n in self._in_use.items()},
+                "estimated_mb": sum(estimate_mb(k) for k in self._models),
+                "budget_mb": self.memory_budget_mb,
+            }
+
+
+def format_pool_status(status: Dict[str, Any]) -> str:
+    routes = ", ".join(f"{lang}→{key[0]}/{key[2]}" for lang, key in status["routes"].items()) or "-"
+    loaded = ", ".join(f"{key[0]}/{key[2]}" for key in status["loaded"]) or "-"
+    return (
+        f"Routes: {routes}; default: {status['default'][0]}/{status['default'][2]}. "
+        f"Loaded: {loaded} (~{status['estimated_mb']:.0f}/{status['budget_mb']:.0f} MB)"
+    )